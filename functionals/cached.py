@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from typing import Union
+from functionals.functional import DifferentiableFunctional, Functional, LeastSquaresFunctional
+from functions.abcfunction import Function
+from functions.bound import BoundFunction
+from mathtypes.linalg import vector, matrix, sparsematrix, bandmatrix
+
+CACHE_SIZE = 128
+
+
+class CachedFunctional(Functional):
+    """
+    Functional that remembers its values at the last maxsize parameter vectors (least recently used are dropped).\n
+    The key is the float64 buffer of the parameters of the function, so a revisited point
+    (the last probe of a line search, a rejected move of simulated annealing) is not evaluated again.
+    The cache serves one function: it is cleared when a function with another parent is passed.
+    hits and misses count the evaluations served from the cache and passed to the functional.
+
+    """
+
+    def __init__(self, functional: Functional, maxsize: int = CACHE_SIZE) -> None:
+        if not isinstance(functional, Functional):
+            raise TypeError(f"functional must be Functional not {type(functional)}")
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, but {maxsize}")
+        self.functional = functional
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._function = None
+        self._entries = OrderedDict()
+
+    @classmethod
+    def create(cls, functional: Functional, maxsize: int = CACHE_SIZE) -> "CachedFunctional":
+        """Cached functional of the class matching the wrapped one: least squares, differentiable or plain."""
+        if isinstance(functional, LeastSquaresFunctional) and isinstance(functional, DifferentiableFunctional):
+            return CachedLeastSquaresFunctional(functional, maxsize)
+        if isinstance(functional, DifferentiableFunctional):
+            return CachedDifferentiableFunctional(functional, maxsize)
+        return CachedFunctional(functional, maxsize)
+
+    def cache_clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def _entry(self, function: Function) -> tuple[bytes, list]:
+        """Key of the parameters of function and its entry [value, gradient], an empty entry on a miss."""
+        parent = function.function if isinstance(function, BoundFunction) else function
+        if parent is not self._function:
+            self._entries.clear()
+            self._function = parent
+        key = function.parameters.tobytes()
+        entry = self._entries.get(key)
+        if entry is None:
+            return key, [None, None]
+        self._entries.move_to_end(key)
+        return key, entry
+
+    def _store(self, key: bytes, entry: list) -> None:
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def value(self, function: Function) -> float:
+        key, entry = self._entry(function)
+        if entry[0] is not None:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        entry[0] = self.functional.value(function)
+        self._store(key, entry)
+        return entry[0]
+
+
+class CachedDifferentiableFunctional(CachedFunctional, DifferentiableFunctional):
+    """Cached functional that also remembers the gradients, they are returned as copies."""
+
+    def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        key, entry = self._entry(function)
+        if entry[1] is not None:
+            self.hits += 1
+            return entry[0], entry[1].copy()
+        self.misses += 1
+        entry[0], entry[1] = self.functional.value_and_gradient(function)
+        self._store(key, entry)
+        return entry[0], entry[1].copy()
+
+
+class CachedLeastSquaresFunctional(CachedDifferentiableFunctional, LeastSquaresFunctional):
+    """Cached least squares functional. Residuals, jacobians and normal equations are passed to the functional."""
+
+    def residual(self, function: Function) -> vector:
+        return self.functional.residual(function)
+
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
+        return self.functional.jacobian(function)
+
+    def normal_equations(self, function: Function) -> tuple[Union[matrix, bandmatrix], vector]:
+        return self.functional.normal_equations(function)
@@ -1,6 +1,8 @@
 from abc import ABCMeta, abstractmethod
+from typing import Union
 from functions.abcfunction import Function
-from mathtypes.linalg import vector, matrix
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix, bandmatrix
 
 class Functional(metaclass = ABCMeta):
 
@@ -14,6 +16,10 @@ class DifferentiableFunctional(metaclass = ABCMeta):
     def gradient(self, function: Function) -> vector:
         pass
 
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        """Value and gradient of the functional. Functionals override it to compute both in one pass."""
+        return self.value(function), self.gradient(function)
+
 class LeastSquaresFunctional(metaclass = ABCMeta):
 
     @abstractmethod
@@ -21,5 +27,27 @@ class LeastSquaresFunctional(metaclass = ABCMeta):
         pass
 
     @abstractmethod
-    def jacobian(self, function: Function) -> matrix:
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
         pass
+
+    def normal_equations(self, function: Function) -> tuple[Union[matrix, bandmatrix], vector]:
+        """
+        Matrix J^T J and right side J^T r of the normal equations of the least squares step.
+        Functionals override it to accumulate both without building the whole jacobian.
+
+        """
+        jacobian = self.jacobian(function)
+        return jacobian.gram(), jacobian.tmultiply(self.residual(function))
+
+
+def dataset(x: Union[list[vector], Dataset], f: vector = None) -> Dataset:
+    """
+    The training points of a functional. A Dataset is used by reference, a list of points
+    with the vector of function values is validated and packed into a new Dataset once.
+
+    """
+    if isinstance(x, Dataset):
+        if f is not None:
+            raise ValueError("Function values are taken from the dataset, f must not be passed")
+        return x
+    return Dataset(x, f)
@@ -0,0 +1,96 @@
+from math import sqrt
+from typing import Union
+from functionals.functional import LeastSquaresFunctional
+from functionals.l1 import L1
+from functions.abcfunction import DifferentiableFunction, Function
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix, bandmatrix
+
+LOSSES = ("l1", "huber")
+
+
+class IRLS(L1, LeastSquaresFunctional):
+    """
+    Robust metrics minimized by iteratively reweighted least squares.\n
+    loss="l1" is the sum of the modules of the residuals (default), loss="huber" is the Huber loss:
+    r^2 / 2 for |r| <= delta and delta * (|r| - delta / 2) beyond, so outliers count linearly.
+    The residuals and the jacobian are weighted by sqrt(w) with the weights w of the current residuals
+    (1 / |r| for l1, min(1, delta / |r|) for huber), so every step of GaussNewtonMethod is a weighted
+    least squares solve and the weights are renewed on the next one. Residuals smaller than epsilon are
+    weighted as epsilon to keep the weights finite.
+
+    """
+
+    def __init__(self, x: Union[list[vector], Dataset], f: vector = None, loss: str = "l1",
+                 delta: float = 1.0, epsilon: float = 1e-6) -> None:
+        super().__init__(x, f)
+        if loss not in LOSSES:
+            raise ValueError(f"loss must be one of {LOSSES} not {loss!r}")
+        if delta <= 0 or epsilon <= 0:
+            raise ValueError("delta and epsilon must be positive")
+        self.loss = loss
+        self.delta = delta
+        self.epsilon = epsilon
+
+    def value(self, function: Function) -> float:
+        if self.loss == "l1":
+            return super().value(function)
+        return self.huber(self.errors(function))
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        if self.loss == "l1":
+            return super().value_and_gradient(function)
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in IRLS functional. The function must implement the abstract class DifferentiableFunction")
+        residuals = self.errors(function)
+        functional_value = self.huber(residuals)
+        # the derivative of the huber loss is the residual clipped to [-delta, delta]
+        clipped = vector([max(-self.delta, min(self.delta, residual)) for residual in residuals])
+        gradient = function.gradient_batch(self.x).tmultiply(clipped)
+        gradient *= -1
+        return functional_value, gradient
+
+    def huber(self, residuals: vector) -> float:
+        """The Huber loss of the residuals."""
+        functional_value = 0
+        for residual in residuals:
+            module = abs(residual)
+            functional_value += residual ** 2 / 2 if module <= self.delta else self.delta * (module - self.delta / 2)
+        return functional_value
+
+    def errors(self, function: Function) -> vector:
+        """The residuals f - function without weights."""
+        return vector([f_value - function_value
+                       for f_value, function_value in zip(self.f, function.value_batch(self.x))])
+
+    def weights(self, residuals: vector) -> vector:
+        """The square roots of the weights of the residuals."""
+        if self.loss == "l1":
+            return vector([1 / sqrt(max(abs(residual), self.epsilon)) for residual in residuals])
+        return vector([sqrt(min(1.0, self.delta / max(abs(residual), self.epsilon))) for residual in residuals])
+
+    def residual(self, function: Function) -> vector:
+        residuals = self.errors(function)
+        for i, weight in enumerate(self.weights(residuals)):
+            residuals[i] *= weight
+        return residuals
+
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
+        """Jacobian of the weighted residuals, the weights are constant within a step."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in IRLS functional. The function must implement the abstract class DifferentiableFunction")
+        weights = self.weights(self.errors(function))
+        weights *= -1
+        return function.gradient_batch(self.x).scale_rows(weights)
+
+    def normal_equations(self, function: Function) -> tuple[Union[matrix, bandmatrix], vector]:
+        """J^T W J and J^T W r, the residuals are computed once."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in IRLS functional. The function must implement the abstract class DifferentiableFunction")
+        residuals = self.errors(function)
+        weights = self.weights(residuals)
+        for i, weight in enumerate(weights):
+            residuals[i] *= weight
+        weights *= -1
+        jacobian = function.gradient_batch(self.x).scale_rows(weights)
+        return jacobian.gram(), jacobian.tmultiply(residuals)
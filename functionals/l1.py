@@ -1,5 +1,7 @@
-from functionals.functional import Functional, DifferentiableFunctional
+from typing import Union
+from functionals.functional import Functional, DifferentiableFunctional, dataset
 from functions.abcfunction import Function, DifferentiableFunction
+from mathtypes.dataset import Dataset
 from mathtypes.linalg import vector
 
 class L1(Functional, DifferentiableFunctional):
@@ -9,40 +11,30 @@ class L1(Functional, DifferentiableFunctional):
 
     """
     
-    def __init__(self, x: list[vector], f: vector) -> None:
-        if isinstance(x, list) and all(isinstance(xi, vector) for xi in x):
-            if isinstance(f, vector):
-                if f and len(x):
-                    if len(x) == f.length:
-                        self.x = x.copy()
-                        self.f = f.copy()
-                    else:
-                        raise ValueError(f"len(x) must be equals f.length = {f.length}, but {len(x)}")
-                else:
-                    raise ValueError("An empty argument(s) was passed")
-            else:
-                raise TypeError(f"f must be vector not {type(f)}")
-        else:
-            raise TypeError(f"x must be list of vectors not {type(x)}")
+    def __init__(self, x: Union[list[vector], Dataset], f: vector = None) -> None:
+        # a dataset is shared by reference, points passed as a list are packed into one once
+        self.x = dataset(x, f)
+        self.f = self.x.f
 
     def value(self, function: Function) -> float:
         functional_value = 0
-        for i in range(self.f.length):
-            functional_value += abs(self.f[i] - function.value(self.x[i]))
+        for f_value, function_value in zip(self.f, function.value_batch(self.x)):
+            functional_value += abs(f_value - function_value)
         return functional_value
 
     def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        """The values of the function are computed once and give both the value and the gradient."""
         if not isinstance(function, DifferentiableFunction):
             raise TypeError("Unable to use this function in L1 functional. The function must implement the abstract class DifferentiableFunction")
-        function_gradient = []
-        for i in range(len(self.x)):
-            function_gradient.append(function.gradient(self.x[i]))
-        gradient = vector(function_gradient[0].length)
-        for i in range(gradient.length):
-            for j in range(len(self.x)):
-                gradient[i] += sign(function.value(self.x[j]) -
-                                    self.f[j]) * function_gradient[j][i]
-        return gradient
+        functional_value = 0
+        signs = vector(self.f.length)
+        for j, (f_value, function_value) in enumerate(zip(self.f, function.value_batch(self.x))):
+            functional_value += abs(f_value - function_value)
+            signs[j] = sign(function_value - f_value)
+        return functional_value, function.gradient_batch(self.x).tmultiply(signs)
 
 
 def sign(value: float) -> int:
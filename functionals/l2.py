@@ -1,7 +1,9 @@
 from math import sqrt
-from functionals.functional import DifferentiableFunctional, Functional, LeastSquaresFunctional
+from typing import Union
+from functionals.functional import DifferentiableFunctional, Functional, LeastSquaresFunctional, dataset
 from functions.abcfunction import DifferentiableFunction, Function
-from mathtypes.linalg import vector, matrix
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix
 
 class L2(Functional, DifferentiableFunctional, LeastSquaresFunctional):
     """
@@ -11,56 +13,44 @@ class L2(Functional, DifferentiableFunctional, LeastSquaresFunctional):
 
     """
     
-    def __init__(self, x: list[vector], f: vector) -> None:
-        if isinstance(x, list) and all(isinstance(xi, vector) for xi in x):
-            if isinstance(f, vector):
-                if f and len(x):
-                    if len(x) == f.length:
-                        self.x = x.copy()
-                        self.f = f.copy()
-                    else:
-                        raise ValueError(f"len(x) must be equals f.length = {f.length}, but {len(x)}")
-                else:
-                    raise ValueError("An empty argument(s) was passed")
-            else:
-                raise TypeError(f"f must be vector not {type(f)}")
-        else:
-            raise TypeError(f"x must be list of vectors not {type(x)}")
+    def __init__(self, x: Union[list[vector], Dataset], f: vector = None) -> None:
+        # a dataset is shared by reference, points passed as a list are packed into one once
+        self.x = dataset(x, f)
+        self.f = self.x.f
 
     def value(self, function: Function) -> float:
-        functional_value = 0
-        for i in range(self.f.length):
-            functional_value += (self.f[i] - function.value(self.x[i])) ** 2
-        return sqrt(functional_value)
+        return norm(self.residual(function))
 
     def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        """The residuals are computed once and give both the value and the gradient."""
         if not isinstance(function, DifferentiableFunction):
             raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
-        function_gradients = []
-        for i in range(len(self.x)):
-            function_gradients.append(function.gradient(self.x[i]))
-        gradient = vector(function_gradients[0].length)
-        y_value = self.value(function)
-        for i in range(gradient.length):
-            for j in range(len(self.x)):
-                delta = self.f[j] - function.value(self.x[j])
-                gradient[i] -= (2 * delta * function_gradients[j][i]) / sqrt(y_value)
-        return gradient
+        residuals = self.residual(function)
+        y_value = norm(residuals)
+        # -2 * sum(residual * gradient) / sqrt(value), a sparse gradient visits only its stored entries
+        gradient = function.gradient_batch(self.x).tmultiply(residuals)
+        gradient *= -2 / sqrt(y_value)
+        return y_value, gradient
 
     def residual(self, function: Function) -> vector:
-        residuals = vector()
-        for i in range(self.f.length):
-            residuals.append(self.f[i] - function.value(self.x[i]))
-        return residuals
+        return vector([f_value - function_value
+                       for f_value, function_value in zip(self.f, function.value_batch(self.x))])
 
-    def jacobian(self, function: Function) -> matrix:
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
+        """Jacobian of residuals. It is returned as a sparsematrix if the function has a sparse gradient."""
         if not isinstance(function, DifferentiableFunction):
             raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
-        jac_values = [-function.gradient(point) for point in self.x]
-        rows = len(jac_values)
-        cols = jac_values[0].length
-        jac = matrix(rows, cols)
-        for i in range(rows):
-            for j in range(cols):
-                jac[i, j] = jac_values[i][j]
+        jac = function.gradient_batch(self.x)
+        # the residual is f - function, so the gradients are negated in place
+        jac *= -1
         return jac
+
+
+def norm(residuals: vector) -> float:
+    functional_value = 0
+    for residual in residuals:
+        functional_value += residual ** 2
+    return sqrt(functional_value)
@@ -1,5 +1,7 @@
-from functionals.functional import Functional
+from typing import Union
+from functionals.functional import Functional, dataset
 from functions.abcfunction import Function
+from mathtypes.dataset import Dataset
 from mathtypes.linalg import vector
 
 class LInf(Functional):
@@ -9,26 +11,16 @@ class LInf(Functional):
     
     """
     
-    def __init__(self, x: list[vector], f: vector) -> None:
-        if isinstance(x, list) and all(isinstance(xi, vector) for xi in x):
-            if isinstance(f, vector):
-                if f and len(x):
-                    if len(x) == f.length:
-                        self.x = x.copy()
-                        self.f = f.copy()
-                    else:
-                        raise ValueError(f"len(x) must be equals f.length = {f.length}, but {len(x)}")
-                else:
-                    raise ValueError("An empty argument(s) was passed")
-            else:
-                raise TypeError(f"f must be vector not {type(f)}")
-        else:
-            raise TypeError(f"x must be list of vectors not {type(x)}")
+    def __init__(self, x: Union[list[vector], Dataset], f: vector = None) -> None:
+        # a dataset is shared by reference, points passed as a list are packed into one once
+        self.x = dataset(x, f)
+        self.f = self.x.f
 
     def value(self, function: Function) -> float:
-        max_value = abs(self.f[0] - function.value(self.x[0]))
+        values = function.value_batch(self.x)
+        max_value = abs(self.f[0] - values[0])
         for i in range(1, self.f.length):
-            value = abs(self.f[i] - function.value(self.x[i]))
+            value = abs(self.f[i] - values[i])
             if value > max_value:
                 max_value = value
-        return max_value
\ No newline at end of file
+        return max_value
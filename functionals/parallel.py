@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import sqrt
+from multiprocessing import shared_memory
+from typing import Callable, Union
+import os
+import pickle
+import weakref
+from functionals.functional import DifferentiableFunctional, Functional, LeastSquaresFunctional, dataset
+from functionals.l1 import sign
+from functionals.streaming import add_normal_matrix, stack
+from functions.abcfunction import DifferentiableFunction, Function
+from functions.bound import BoundFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix, bandmatrix
+
+# state of a worker process: the shards attached on start and the last function loaded with the name of its block
+_memory = None
+_shards = []
+_function = (None, None)
+
+
+class ParallelFunctional(Functional):
+    """
+    Functional evaluated by a pool of worker processes, every process works on its shard of the points.\n
+    The points are copied once into shared memory, one block in the binary dataset format per shard.
+    The workers attach the blocks on start, so the points are never pickled. A new function is pickled once
+    into a shared memory block of its own and the workers load it on their first task with it,
+    so an evaluation sends only the name of the block and the parameters; the workers return partial sums over their shards
+    (sum of squares, gradient, J^T J, J^T r) and they are reduced in this process.
+    workers is the number of processes, the number of CPUs by default.
+    close() (or leaving a with block) stops the workers and frees the shared memory.
+
+    """
+
+    def __init__(self, x: Union[list[vector], Dataset], f: vector = None, workers: int = None) -> None:
+        points = dataset(x, f)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"workers must be positive, but {workers}")
+        self.shards = min(workers, points.rows)
+        bounds = [points.rows * k // self.shards for k in range(self.shards + 1)]
+        blocks = [points.tobytes(start, stop) for start, stop in zip(bounds, bounds[1:])]
+        memory = shared_memory.SharedMemory(create=True, size=sum(len(block) for block in blocks))
+        layout, offset = [], 0
+        for block in blocks:
+            memory.buf[offset:offset + len(block)] = block
+            layout.append((offset, len(block)))
+            offset += len(block)
+        executor = ProcessPoolExecutor(self.shards, initializer=_attach, initargs=(memory.name, layout))
+        # the points and the state of the current function, freed together with the workers
+        self._blocks = [memory]
+        self._release = weakref.finalize(self, _release, executor, self._blocks)
+        self._executor = executor
+        self._function = None
+
+    def close(self) -> None:
+        self._release()
+
+    def __enter__(self) -> "ParallelFunctional":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def partials(self, kernel: Callable, function: Function) -> list:
+        """Results of kernel(function, shard) for every shard, computed by the workers in the order of the shards."""
+        parent = function.function if isinstance(function, BoundFunction) else function
+        if parent is not self._function:
+            # no task holds the block of the previous function, map() has returned all results
+            state = pickle.dumps(parent)
+            block = shared_memory.SharedMemory(create=True, size=len(state))
+            block.buf[:len(state)] = state
+            _free(self._blocks[1:])
+            self._blocks[1:] = [block]
+            self._function = parent
+        return list(self._executor.map(_run, repeat(kernel), range(self.shards), repeat(self._blocks[1].name),
+                                       repeat(function.parameters)))
+
+
+class ParallelL1(ParallelFunctional, DifferentiableFunctional):
+    """L1 metrics evaluated by worker processes. Implements the calculation of the gradient of the functional."""
+
+    def value(self, function: Function) -> float:
+        return sum(self.partials(absolute_sum, function))
+
+    def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L1 functional. The function must implement the abstract class DifferentiableFunction")
+        partials = self.partials(absolute_gradient, function)
+        gradient = partials[0][1]
+        for _, shard_gradient in partials[1:]:
+            gradient.axpy(1.0, shard_gradient)
+        return sum(value for value, _ in partials), gradient
+
+
+class ParallelL2(ParallelFunctional, DifferentiableFunctional, LeastSquaresFunctional):
+    """
+    L2 metrics evaluated by worker processes. Implements the calculation of the gradient of the functional
+    and of the normal equations of the least squares step.\n
+    residual() and jacobian() return the values of all shards to this process.
+
+    """
+
+    def value(self, function: Function) -> float:
+        return sqrt(sum(self.partials(squares, function)))
+
+    def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        partials = self.partials(squares_gradient, function)
+        weighted = partials[0][1]
+        for _, shard_weighted in partials[1:]:
+            weighted.axpy(1.0, shard_weighted)
+        # the same scaling as L2: -2 * sum(residual * gradient) / sqrt(value)
+        y_value = sqrt(sum(value for value, _ in partials))
+        weighted *= -2 / sqrt(y_value)
+        return y_value, weighted
+
+    def normal_equations(self, function: Function) -> tuple[Union[matrix, bandmatrix], vector]:
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        normal_matrix, right_side = None, None
+        for shard_matrix, shard_side in self.partials(normal_equations, function):
+            normal_matrix = add_normal_matrix(normal_matrix, shard_matrix)
+            right_side = shard_side if right_side is None else right_side.axpy(1.0, shard_side)
+        # J = -gradients, so J^T r = -gradients^T r
+        right_side *= -1
+        return normal_matrix, right_side
+
+    def residual(self, function: Function) -> vector:
+        residuals = vector()
+        for shard_residuals in self.partials(residuals_of, function):
+            for residual in shard_residuals:
+                residuals.append(residual)
+        return residuals
+
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
+        """Jacobian of residuals. It is returned as a sparsematrix if the function has a sparse gradient."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        jac = stack(self.partials(gradients_of, function))
+        jac *= -1
+        return jac
+
+
+class ParallelLInf(ParallelFunctional):
+    """Linf metrics evaluated by worker processes. Does not implement the calculation of the functional gradient."""
+
+    def value(self, function: Function) -> float:
+        return max(self.partials(absolute_maximum, function))
+
+
+def residuals_of(function: Function, shard: Dataset) -> vector:
+    return vector([f_value - function_value for f_value, function_value in zip(shard.f, function.value_batch(shard))])
+
+
+def gradients_of(function: Function, shard: Dataset) -> Union[matrix, sparsematrix]:
+    return function.gradient_batch(shard)
+
+
+def absolute_sum(function: Function, shard: Dataset) -> float:
+    functional_value = 0
+    for residual in residuals_of(function, shard):
+        functional_value += abs(residual)
+    return functional_value
+
+
+def absolute_maximum(function: Function, shard: Dataset) -> float:
+    functional_value = 0
+    for residual in residuals_of(function, shard):
+        functional_value = max(functional_value, abs(residual))
+    return functional_value
+
+
+def absolute_gradient(function: Function, shard: Dataset) -> tuple[float, vector]:
+    functional_value = 0
+    signs = vector(shard.rows)
+    for j, residual in enumerate(residuals_of(function, shard)):
+        functional_value += abs(residual)
+        signs[j] = sign(-residual)
+    return functional_value, function.gradient_batch(shard).tmultiply(signs)
+
+
+def squares(function: Function, shard: Dataset) -> float:
+    functional_value = 0
+    for residual in residuals_of(function, shard):
+        functional_value += residual ** 2
+    return functional_value
+
+
+def squares_gradient(function: Function, shard: Dataset) -> tuple[float, vector]:
+    residuals = residuals_of(function, shard)
+    functional_value = 0
+    for residual in residuals:
+        functional_value += residual ** 2
+    return functional_value, function.gradient_batch(shard).tmultiply(residuals)
+
+
+def normal_equations(function: Function, shard: Dataset) -> tuple[Union[matrix, bandmatrix], vector]:
+    gradients = function.gradient_batch(shard)
+    return gradients.gram(), gradients.tmultiply(residuals_of(function, shard))
+
+
+def _attach(name: str, layout: list[tuple[int, int]]) -> None:
+    """Initializer of a worker process: attaches the shards in shared memory."""
+    global _memory, _shards
+    _memory = shared_memory.SharedMemory(name)
+    _shards = [Dataset.frombuffer(_memory.buf[offset:offset + size]) for offset, size in layout]
+
+
+def _run(kernel: Callable, shard: int, token: str, parameters: vector):
+    """Task of a worker process: token is the name of the block with the pickled function, it is loaded once."""
+    global _function
+    if _function[0] != token:
+        block = shared_memory.SharedMemory(token)
+        try:
+            _function = token, pickle.loads(block.buf)
+        finally:
+            block.close()
+    return kernel(_function[1].bind(parameters, copy=False), _shards[shard])
+
+
+def _free(blocks: list[shared_memory.SharedMemory]) -> None:
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def _release(executor: ProcessPoolExecutor, blocks: list[shared_memory.SharedMemory]) -> None:
+    executor.shutdown()
+    _free(blocks)
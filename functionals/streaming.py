@@ -0,0 +1,221 @@
+from math import sqrt
+from typing import Callable, Iterable, Iterator, Union
+from functionals.functional import DifferentiableFunctional, Functional, LeastSquaresFunctional
+from functionals.l1 import sign
+from functions.abcfunction import DifferentiableFunction, Function
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix, bandmatrix
+
+Chunk = Union[Dataset, tuple[list[vector], vector]]
+
+
+class StreamingFunctional(Functional):
+    """
+    Functional over training points that come in chunks and are never held in memory at once.\n
+    chunks is a collection that can be iterated several times (a list of memory-mapped datasets)
+    or a function that returns a new iterator on every call (a generator reading a log file).
+    A chunk is a Dataset or a pair (list of points, vector of function values); the functional is
+    accumulated chunk by chunk, so the memory does not depend on the number of points.\n
+    With batch_size every evaluation uses only the next batch_size chunks of the stream, the stream starts over
+    when it ends. This is the mini-batch mode for stochastic optimizers. The batch changes with the parameters
+    of the function, evaluations at the same parameters (the residual and the jacobian of one step) share it.
+
+    """
+
+    def __init__(self, chunks: Union[Iterable[Chunk], Callable[[], Iterator[Chunk]]], batch_size: int = None) -> None:
+        if callable(chunks):
+            self.chunks = chunks
+        elif isinstance(chunks, Iterable):
+            if iter(chunks) is chunks:
+                raise TypeError("An iterator can be passed only once, pass a function returning a new iterator")
+            self.chunks = chunks.__iter__
+        else:
+            raise TypeError(f"chunks must be iterable or callable not {type(chunks)}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be positive, but {batch_size}")
+        self.batch_size = batch_size
+        self._stream, self._key, self._batch = None, None, None
+
+    def batch(self, function: Function) -> Iterator[tuple[Union[list[vector], Dataset], vector]]:
+        """
+        Points and function values of the chunks used by one evaluation of function.
+        The tables the function caches for a Dataset chunk are dropped once the chunk is evaluated.
+
+        """
+        for x, f in self.chunks_of(function):
+            yield x, f
+            if isinstance(x, Dataset):
+                function.cache_discard(x)
+
+    def chunks_of(self, function: Function) -> Iterable[tuple[Union[list[vector], Dataset], vector]]:
+        if self.batch_size is None:
+            count = 0
+            for chunk in self.chunks():
+                count += 1
+                yield self.unpack(chunk)
+            if count == 0:
+                raise ValueError("An empty stream of chunks was passed")
+            return
+        # the residual and the jacobian of one step are evaluated at the same parameters and must see the same batch
+        key = function.parameters.tobytes()
+        if key != self._key:
+            self._key, self._batch = key, self.next_batch()
+        yield from self._batch
+
+    def next_batch(self) -> list[tuple[Union[list[vector], Dataset], vector]]:
+        """The next batch_size chunks of the stream, it starts over when it ends."""
+        batch, fresh = [], False
+        while len(batch) < self.batch_size:
+            if self._stream is None:
+                self._stream, fresh = self.chunks(), True
+            chunk = next(self._stream, None)
+            if chunk is None:
+                if fresh:
+                    raise ValueError("An empty stream of chunks was passed")
+                self._stream = None
+                continue
+            fresh = False
+            batch.append(self.unpack(chunk))
+        return batch
+
+    @classmethod
+    def unpack(cls, chunk: Chunk) -> tuple[Union[list[vector], Dataset], vector]:
+        if isinstance(chunk, Dataset):
+            return chunk, chunk.f
+        if isinstance(chunk, tuple) and len(chunk) == 2:
+            x, f = chunk
+            if not isinstance(x, list) or not isinstance(f, vector):
+                raise TypeError("A chunk must be a pair of a list of vectors and a vector")
+            if len(x) != f.length:
+                raise ValueError(f"len(x) must be equals f.length = {f.length}, but {len(x)}")
+            return x, f
+        raise TypeError(f"chunk must be Dataset or tuple not {type(chunk)}")
+
+
+class StreamingL1(StreamingFunctional, DifferentiableFunctional):
+    """L1 metrics over a stream of chunks. Implements the calculation of the gradient of the functional."""
+
+    def value(self, function: Function) -> float:
+        functional_value = 0
+        for x, f in self.batch(function):
+            for f_value, function_value in zip(f, function.value_batch(x)):
+                functional_value += abs(f_value - function_value)
+        return functional_value
+
+    def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L1 functional. The function must implement the abstract class DifferentiableFunction")
+        functional_value, gradient = 0, None
+        for x, f in self.batch(function):
+            signs = vector(f.length)
+            for j, (f_value, function_value) in enumerate(zip(f, function.value_batch(x))):
+                functional_value += abs(f_value - function_value)
+                signs[j] = sign(function_value - f_value)
+            chunk_gradient = function.gradient_batch(x).tmultiply(signs)
+            gradient = chunk_gradient if gradient is None else gradient.axpy(1.0, chunk_gradient)
+        return functional_value, gradient
+
+
+class StreamingL2(StreamingFunctional, DifferentiableFunctional, LeastSquaresFunctional):
+    """
+    L2 metrics over a stream of chunks. Implements the calculation of the gradient of the functional
+    and of the normal equations of the least squares step, accumulated chunk by chunk.\n
+    residual() and jacobian() concatenate the chunks, they need memory for all points of the batch.
+
+    """
+
+    def value(self, function: Function) -> float:
+        functional_value = 0
+        for x, f in self.batch(function):
+            for f_value, function_value in zip(f, function.value_batch(x)):
+                functional_value += (f_value - function_value) ** 2
+        return sqrt(functional_value)
+
+    def gradient(self, function: Function) -> vector:
+        return self.value_and_gradient(function)[1]
+
+    def value_and_gradient(self, function: Function) -> tuple[float, vector]:
+        """The sum of squares and the sum of the gradients weighted by the residuals are accumulated in one pass."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        squares, weighted = 0, None
+        for x, f in self.batch(function):
+            residuals = vector([f_value - function_value for f_value, function_value in zip(f, function.value_batch(x))])
+            for residual in residuals:
+                squares += residual ** 2
+            chunk_gradient = function.gradient_batch(x).tmultiply(residuals)
+            weighted = chunk_gradient if weighted is None else weighted.axpy(1.0, chunk_gradient)
+        # the same scaling as L2: -2 * sum(residual * gradient) / sqrt(value)
+        y_value = sqrt(squares)
+        weighted *= -2 / sqrt(y_value)
+        return y_value, weighted
+
+    def normal_equations(self, function: Function) -> tuple[Union[matrix, bandmatrix], vector]:
+        """J^T J and J^T r summed over the chunks, the jacobian of one chunk is held at a time."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        normal_matrix, right_side = None, None
+        for x, f in self.batch(function):
+            gradients = function.gradient_batch(x)
+            residuals = vector([f_value - function_value for f_value, function_value in zip(f, function.value_batch(x))])
+            # J = -gradients, so J^T J = gradients^T gradients and J^T r = -gradients^T r
+            normal_matrix = add_normal_matrix(normal_matrix, gradients.gram())
+            chunk_side = gradients.tmultiply(residuals)
+            right_side = chunk_side if right_side is None else right_side.axpy(1.0, chunk_side)
+        right_side *= -1
+        return normal_matrix, right_side
+
+    def residual(self, function: Function) -> vector:
+        residuals = vector()
+        for x, f in self.batch(function):
+            for f_value, function_value in zip(f, function.value_batch(x)):
+                residuals.append(f_value - function_value)
+        return residuals
+
+    def jacobian(self, function: Function) -> Union[matrix, sparsematrix]:
+        """Jacobian of residuals of all chunks of the batch. It is a sparsematrix if the function has a sparse gradient."""
+        if not isinstance(function, DifferentiableFunction):
+            raise TypeError("Unable to use this function in L2 functional. The function must implement the abstract class DifferentiableFunction")
+        jac = stack([function.gradient_batch(x) for x, _ in self.batch(function)])
+        jac *= -1
+        return jac
+
+
+class StreamingLInf(StreamingFunctional):
+    """Linf metrics over a stream of chunks. Does not implement the calculation of the functional gradient."""
+
+    def value(self, function: Function) -> float:
+        functional_value = 0
+        for x, f in self.batch(function):
+            for f_value, function_value in zip(f, function.value_batch(x)):
+                functional_value = max(functional_value, abs(f_value - function_value))
+        return functional_value
+
+
+def add_normal_matrix(total: Union[matrix, bandmatrix, None], term: Union[matrix, bandmatrix]) -> Union[matrix, bandmatrix]:
+    """Sum of two Gram matrices: band matrices stay in band storage of the larger bandwidth."""
+    if total is None:
+        return term
+    if isinstance(total, bandmatrix) and isinstance(term, bandmatrix):
+        if term.bandwidth > total.bandwidth:
+            total, term = term, total
+        total += term
+        return total
+    if isinstance(total, bandmatrix):
+        total, term = term, total
+    total += term
+    return total
+
+
+def stack(blocks: list[Union[matrix, sparsematrix]]) -> Union[matrix, sparsematrix]:
+    """The rows of the gradient matrices of several chunks as one matrix, sparse if the blocks are sparse."""
+    if isinstance(blocks[0], sparsematrix):
+        stacked = sparsematrix(blocks[0].cols)
+        for block in blocks:
+            for k in range(block.rows):
+                stacked.append(*block.row(k))
+        return stacked
+    return matrix([list(block.row(k)) for block in blocks for k in range(block.rows)])
@@ -1,19 +1,111 @@
 from abc import ABCMeta, abstractmethod
-from mathtypes.linalg import vector
+from typing import Sequence, Union
+from weakref import WeakKeyDictionary
+from functions.frozen import FrozenFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix
 
 class Function(metaclass = ABCMeta):
 
+    __slots__ = ()
+
     @abstractmethod
-    def bind(self, parameters: vector) -> 'Function':
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> 'Function':
+        """
+        Sets the parameters of the function and returns it.\n
+        By default the parameters are copied. With copy=False the function keeps a reference to the caller's vector
+        and binding allocates nothing: the caller owns the buffer, changes to it are seen by the function,
+        and after changing it the function must be bound again before use, because values precomputed
+        on bind (the slopes of a cubic spline) are not updated.\n
+        With immutable=True the function itself is not changed: a new BoundFunction with the parameters
+        is returned, so several parameter sets of one function can be evaluated at once, also from threads.
+
+        """
         pass
 
     @abstractmethod
     def value(self, point: vector) -> float:
         pass
 
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        """Values at all points. Functions override it with a faster implementation."""
+        return vector([self.value(point) for point in points])
+
+    def freeze(self, parameters: vector) -> FrozenFunction:
+        """Immutable evaluator of the function with the given parameters for serving predictions."""
+        raise TypeError(f"{type(self).__name__} does not support freezing")
+
+    def cache_discard(self, points: Dataset) -> None:
+        """Drops the tables cached for the dataset, so datasets passed only once do not accumulate in the caches."""
+        for cache in getattr(self, '__dict__', {}).values():
+            if isinstance(cache, WeakKeyDictionary):
+                cache.pop(points.points_key, None)
+
+    def __getstate__(self) -> tuple[dict, list[str]]:
+        """The caches keyed by datasets belong to this process, a function is pickled without them."""
+        state = {name: value for name, value in self.__dict__.items() if not isinstance(value, WeakKeyDictionary)}
+        return state, [name for name in self.__dict__ if name not in state]
+
+    def __setstate__(self, state: tuple[dict, list[str]]) -> None:
+        state, caches = state
+        self.__dict__.update(state)
+        for name in caches:
+            self.__dict__[name] = WeakKeyDictionary()
+
 
 class DifferentiableFunction(metaclass = ABCMeta):
 
+    __slots__ = ()
+
     @abstractmethod
     def gradient(self, point: vector) -> vector:
         pass
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> matrix:
+        """Gradients at all points as rows of a matrix. Functions override it with a faster implementation."""
+        gradients = None
+        for i, point in enumerate(points):
+            gradient = self.gradient(point)
+            if gradients is None:
+                gradients = matrix(len(points), gradient.length)
+            gradients.row(i).assign(gradient)
+        return gradients
+
+
+class SparseDifferentiableFunction(DifferentiableFunction):
+    """A function whose gradient by parameters has only a few non-zero entries at every point."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def sparseGradient(self, point: vector) -> tuple[list[int], list[float]]:
+        """Returns indices and values of the non-zero entries of the gradient at a point."""
+        pass
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> sparsematrix:
+        """Gradients at all points as rows of a sparse matrix."""
+        gradients = sparsematrix(self.parameters.length)
+        for point in points:
+            gradients.append(*self.sparseGradient(point))
+        return gradients
+
+
+class LinearInParameters(metaclass = ABCMeta):
+    """
+    Marker of the functions whose values are linear in the parameters: value = gradient * parameters + offset
+    at every point, the gradient and the offset do not depend on the parameters (linear function, polynomial, splines).
+
+    """
+
+    __slots__ = ()
+
+
+def coordinates(points: Union[list[vector], Dataset]) -> Sequence[float]:
+    """The coordinates of one-dimensional points. The column of a Dataset is used without copying."""
+    if isinstance(points, Dataset):
+        if points.dimension != 1:
+            raise ValueError("The number of elements of the vector point must be equal to 1")
+        return points.column(0)
+    if any(point.length != 1 for point in points):
+        raise ValueError("The number of elements of the vector point must be equal to 1")
+    return [point[0] for point in points]
@@ -0,0 +1,98 @@
+from types import FunctionType, MethodType
+from typing import Union
+from functions.abcfunction import DifferentiableFunction, Function, SparseDifferentiableFunction
+from functions.frozen import FrozenFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix
+
+# attributes computed lazily by the methods of the parent that a bound function may set on it
+LAZY_CACHES = ('_slope_matrix',)
+
+
+class BoundFunction(Function):
+    """
+    Immutable function with fixed parameters, returned by bind(parameters, immutable=True).\n
+    It keeps only its parameters (and the derivatives at the nodes for a cubic spline), everything else -
+    nodes, cached intervals, design matrices and other private tables - is shared with the parent function.
+    The methods of the parent class run with the bound function as self, so the parent is never modified
+    and any number of bound functions of one parent can be evaluated at once from different threads.
+
+    """
+
+    __slots__ = ('function', 'parameters', 'derivative_parameters')
+
+    def __init__(self, function: Function, parameters: vector, derivative_parameters: vector = None) -> None:
+        object.__setattr__(self, 'function', function)
+        object.__setattr__(self, 'parameters', parameters)
+        object.__setattr__(self, 'derivative_parameters', derivative_parameters)
+
+    @classmethod
+    def create(cls, function: Function, parameters: vector, derivative_parameters: vector = None) -> "BoundFunction":
+        """Bound function of the class matching the parent: differentiable, sparse or plain."""
+        if isinstance(function, SparseDifferentiableFunction):
+            return BoundSparseDifferentiableFunction(function, parameters, derivative_parameters)
+        if isinstance(function, DifferentiableFunction):
+            return BoundDifferentiableFunction(function, parameters, derivative_parameters)
+        return BoundFunction(function, parameters, derivative_parameters)
+
+    def __getattr__(self, name: str):
+        if name == 'function' or name.startswith('__'):
+            raise AttributeError(name)
+        # only attributes missing on the bound function get here: methods of the parent class are bound
+        # to this object, so they read its parameters; the other attributes are shared with the parent
+        attribute = getattr(type(self.function), name, None)
+        if isinstance(attribute, FunctionType):
+            return MethodType(attribute, self)
+        return getattr(self.function, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        # the methods of the parent fill its lazy caches, they depend only on the parent and are shared with it
+        if name in LAZY_CACHES:
+            setattr(self.function, name, value)
+            return
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # a bound function has no __dict__, it is pickled and copied as its parent with the parameters
+        return BoundFunction.create, (self.function, self.parameters, self.derivative_parameters)
+
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = True) -> "BoundFunction":
+        """A bound function can not be changed, binding it returns a new bound function of the same parent."""
+        return self.function.bind(parameters, copy, immutable=True)
+
+    def value(self, point: vector) -> float:
+        return type(self.function).value(self, point)
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        return type(self.function).value_batch(self, points)
+
+    def cache_discard(self, points: Dataset) -> None:
+        self.function.cache_discard(points)
+
+    def freeze(self, parameters: vector = None) -> FrozenFunction:
+        return self.function.freeze(self.parameters if parameters is None else parameters)
+
+    def __str__(self) -> str:
+        return type(self.function).__str__(self)
+
+
+class BoundDifferentiableFunction(BoundFunction, DifferentiableFunction):
+
+    __slots__ = ()
+
+    def gradient(self, point: vector) -> vector:
+        return type(self.function).gradient(self, point)
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> Union[matrix, sparsematrix]:
+        return type(self.function).gradient_batch(self, points)
+
+
+class BoundSparseDifferentiableFunction(BoundDifferentiableFunction, SparseDifferentiableFunction):
+
+    __slots__ = ()
+
+    def sparseGradient(self, point: vector) -> tuple[list[int], list[float]]:
+        return type(self.function).sparseGradient(self, point)
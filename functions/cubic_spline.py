@@ -1,23 +1,140 @@
-from functions.abcfunction import Function, DifferentiableFunction
-from mathtypes.linalg import vector
+from array import array
+from typing import Sequence, Union
+from functions.abcfunction import Function
+from functions.bound import BoundFunction
+from functions.frozen import FrozenSpline, hermite_coefficients
+from functions.spline import Spline
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix, sparsematrix
 
-class CubicSpline(Function, DifferentiableFunction):
+BOUNDARIES = ("natural", "clamped", "not-a-knot")
+
+
+class CubicSpline(Spline):
     """
     Cubic spline for one-dimensional space. Implements the calculation of the gradient at a point.
-    Nodes and function values (parameters) are passed to them in ascending order of node value.
+    Nodes and function values (parameters) are passed to them in ascending order of node value.\n
+    The derivatives at the nodes make the spline twice continuously differentiable. They are found on bind()
+    from a tridiagonal system solved by the Thomas algorithm in O(n); its elimination depends only on the nodes
+    and is done once. End conditions: "natural" (zero second derivative at the ends, default),
+    "clamped" (the derivatives at the ends are end_slopes) and "not-a-knot" (a continuous third derivative
+    at the second and the penultimate nodes, at least 4 nodes).\n
+    The derivatives depend on all parameters, so the gradient of the spline is dense.
 
     """
 
-    def __init__(self, nodes: list):       
-        self.nodes = list(map(float, nodes))
+    def __init__(self, nodes: list, boundary: str = "natural", end_slopes: tuple[float, float] = (0.0, 0.0)) -> None:
+        super().__init__(nodes)
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"boundary must be one of {BOUNDARIES} not {boundary!r}")
+        if len(self.nodes) < 2:
+            raise ValueError("A spline must have at least 2 nodes")
+        if boundary == "not-a-knot" and len(self.nodes) < 4:
+            raise ValueError("The not-a-knot end conditions require at least 4 nodes")
+        self.boundary = boundary
+        self.end_slopes = tuple(map(float, end_slopes))
+        self.derivative_parameters = vector(len(self.nodes))
+        self._slope_matrix = None
+        self._factorize()
+
+    def _factorize(self) -> None:
+        """Builds the tridiagonal system for the derivatives and runs the forward elimination of the Thomas algorithm."""
+        nodes, n = self.nodes, len(self.nodes)
+        h = array('d', [nodes[i + 1] - nodes[i] for i in range(n - 1)])
+        lower, diagonal, upper = array('d', bytes(8 * n)), array('d', bytes(8 * n)), array('d', bytes(8 * n))
+        for i in range(1, n - 1):
+            lower[i], diagonal[i], upper[i] = h[i], 2 * (h[i - 1] + h[i]), h[i - 1]
+        if self.boundary == "natural":
+            diagonal[0], upper[0] = 2, 1
+            lower[-1], diagonal[-1] = 1, 2
+        elif self.boundary == "clamped":
+            diagonal[0] = diagonal[-1] = 1
+        else:
+            diagonal[0], upper[0] = h[1], h[0] + h[1]
+            lower[-1], diagonal[-1] = h[-2] + h[-1], h[-2]
+        pivots, ratios = array('d', bytes(8 * n)), array('d', bytes(8 * n))
+        pivots[0] = diagonal[0]
+        ratios[0] = upper[0] / pivots[0]
+        for i in range(1, n):
+            pivots[i] = diagonal[i] - lower[i] * ratios[i - 1]
+            ratios[i] = upper[i] / pivots[i]
+        self._steps = h
+        self._lower, self._pivots, self._ratios = lower, pivots, ratios
+        self._deltas = array('d', bytes(8 * (n - 1)))
+        self._rhs = array('d', bytes(8 * n))
 
-    def bind(self, parameters: vector) -> Function:
-        self.parameters = parameters.copy()
-        self.derivative_parameters = vector(self.parameters.length)
-        self.derivative_parameters[0] = 0.5 * (
-            self.parameters[1] - self.parameters[0]) / (self.nodes[1] - self.nodes[0])
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        if parameters.length != len(self.nodes):
+            raise ValueError(f"The number of parameters must be equal to the number of nodes {len(self.nodes)}")
+        if immutable:
+            parameters = parameters.copy() if copy else parameters
+            slopes = self.slopes(parameters, vector(len(self.nodes)), *self.end_slopes, workspace=self.workspace())
+            return BoundFunction.create(self, parameters, slopes)
+        self.parameters = parameters.copy() if copy else parameters
+        self.slopes(self.parameters, self.derivative_parameters, *self.end_slopes)
         return self
 
+    def workspace(self) -> tuple[array, array]:
+        """New buffers for slopes(), used where the buffers of the spline may be in use by another thread."""
+        n = len(self.nodes)
+        return array('d', bytes(8 * (n - 1))), array('d', bytes(8 * n))
+
+    def slopes(self, parameters: vector, out: vector, start: float = 0.0, end: float = 0.0,
+               workspace: tuple[array, array] = None) -> vector:
+        """
+        Derivatives at the nodes of the spline with the values parameters, written into out.
+        start and end are the derivatives at the ends for the clamped spline.
+        The buffers preallocated by the spline are used unless a workspace is given.
+
+        """
+        n, h = len(self.nodes), self._steps
+        deltas, rhs = (self._deltas, self._rhs) if workspace is None else workspace
+        for i in range(n - 1):
+            deltas[i] = (parameters[i + 1] - parameters[i]) / h[i]
+        for i in range(1, n - 1):
+            rhs[i] = 3 * (h[i] * deltas[i - 1] + h[i - 1] * deltas[i])
+        if self.boundary == "natural":
+            rhs[0], rhs[-1] = 3 * deltas[0], 3 * deltas[-1]
+        elif self.boundary == "clamped":
+            rhs[0], rhs[-1] = start, end
+        else:
+            rhs[0] = ((h[0] + 2 * (h[0] + h[1])) * h[1] * deltas[0] + h[0] ** 2 * deltas[1]) / (h[0] + h[1])
+            rhs[-1] = (h[-1] ** 2 * deltas[-2] + (2 * (h[-2] + h[-1]) + h[-1]) * h[-2] * deltas[-1]) / (h[-2] + h[-1])
+        lower, pivots, ratios = self._lower, self._pivots, self._ratios
+        rhs[0] /= pivots[0]
+        for i in range(1, n):
+            rhs[i] = (rhs[i] - lower[i] * rhs[i - 1]) / pivots[i]
+        for i in range(n - 2, -1, -1):
+            rhs[i] -= ratios[i] * rhs[i + 1]
+        return out.assign(rhs)
+
+    def __getstate__(self) -> tuple[dict, list[str]]:
+        """The slope matrix is derived from the nodes, it is computed again after unpickling when needed."""
+        state, caches = super().__getstate__()
+        state['_slope_matrix'] = None
+        return state, caches
+
+    def slopeMatrix(self) -> matrix:
+        """Derivatives of the slopes by the parameters. It depends only on the nodes and is computed once."""
+        if self._slope_matrix is None:
+            n = len(self.nodes)
+            slope_matrix = matrix(n, n)
+            unit, column, workspace = vector(n), vector(n), self.workspace()
+            for j in range(n):
+                unit[j] = 1
+                slope_matrix.col(j).assign(self.slopes(unit, column, workspace=workspace))
+                unit[j] = 0
+            # the matrix is published only when it is complete, bound functions may read it from other threads
+            self._slope_matrix = slope_matrix
+        return self._slope_matrix
+
+    def freeze(self, parameters: vector) -> FrozenSpline:
+        """Evaluator with the coefficients of the cubic polynomials of every interval."""
+        if parameters.length != len(self.nodes):
+            raise ValueError(f"The number of parameters must be equal to the number of nodes {len(self.nodes)}")
+        slopes = self.slopes(parameters, vector(len(self.nodes)), *self.end_slopes, workspace=self.workspace())
+        return FrozenSpline(array('d', self.nodes), hermite_coefficients(self.nodes, parameters, slopes), 3)
+
     def basicFunction(self, point: float, numFunc: int, index: int) -> float:
         """Returns the value of the basis function at point."""
         h = self.nodes[index + 1] - self.nodes[index]
@@ -31,18 +148,11 @@ class CubicSpline(Function, DifferentiableFunction):
         else:
             return h * (-ksi ** 2 + ksi ** 3)
 
-    def getIntervalNumber(self, point: float) -> int:
-        """Returns the index of the left node of the interval in which point falls"""
-        for index in range(len(self.nodes) - 1):
-            if point <= self.nodes[index + 1]:
-                break
-        return index
-
     def value(self, point: vector) -> float:
         cur_point = float(point)
         index = self.getIntervalNumber(cur_point)
         value = self.parameters[index] * self.basicFunction(cur_point, 0, index) + \
-            self.derivative_parameters[index + 1] * self.basicFunction(cur_point, 1, index) + \
+            self.derivative_parameters[index] * self.basicFunction(cur_point, 1, index) + \
             self.parameters[index + 1] * self.basicFunction(cur_point, 2, index) + \
             self.derivative_parameters[index + 1] * \
             self.basicFunction(cur_point, 3, index)
@@ -52,6 +162,40 @@ class CubicSpline(Function, DifferentiableFunction):
         cur_point = float(point)
         grad = vector(self.parameters.length)
         index = self.getIntervalNumber(cur_point)
-        grad[index] = self.basicFunction(cur_point, 0, index)
-        grad[index + 1] = self.basicFunction(cur_point, 2, index)
+        slope_matrix = self.slopeMatrix()
+        grad.axpy(self.basicFunction(cur_point, 1, index), slope_matrix.row(index))
+        grad.axpy(self.basicFunction(cur_point, 3, index), slope_matrix.row(index + 1))
+        grad[index] += self.basicFunction(cur_point, 0, index)
+        grad[index + 1] += self.basicFunction(cur_point, 2, index)
         return grad
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        values, slopes = self.design(points)
+        return values.multiply(self.parameters) + slopes.multiply(self.derivative_parameters)
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> matrix:
+        values, slopes = self.design(points)
+        slope_matrix = self.slopeMatrix()
+        gradients = values.todense()
+        for k in range(gradients.rows):
+            row = gradients.row(k)
+            for index, value in zip(*slopes.row(k)):
+                row.axpy(value, slope_matrix.row(index))
+        return gradients
+
+    def assemble(self, x: Sequence[float], intervals: Sequence[int]) -> tuple[sparsematrix, sparsematrix]:
+        """
+        The basis functions multiplied by the values at the nodes and by the derivatives at the nodes.
+        The powers of ksi are computed once per point.
+
+        """
+        n = len(self.nodes)
+        values, slopes = sparsematrix(n), sparsematrix(n)
+        nodes = self.nodes
+        for cur_point, index in zip(x, intervals):
+            h = nodes[index + 1] - nodes[index]
+            ksi = (cur_point - nodes[index]) / h
+            ksi2, ksi3 = ksi ** 2, ksi ** 3
+            values.append([index, index + 1], [1 - 3 * ksi2 + 2 * ksi3, 3 * ksi2 - 2 * ksi3])
+            slopes.append([index, index + 1], [h * (ksi - 2 * ksi2 + ksi3), h * (-ksi2 + ksi3)])
+        return values, slopes
@@ -0,0 +1,147 @@
+from array import array
+from bisect import bisect_left
+from typing import Sequence, Union
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector
+
+
+class FrozenFunction:
+    """
+    Immutable evaluator of a function with fixed parameters, returned by freeze() of the functions.\n
+    The evaluators keep only flat float64 arrays (array('d') or memoryview) and take plain floats and buffers,
+    so a prediction does not allocate vectors or dispatch basis functions.
+
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **fields) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        """The fields are restored through _init, views into a model file are pickled as arrays."""
+        fields = {name: getattr(self, name) for name in type(self).__slots__}
+        for name, value in fields.items():
+            if isinstance(value, memoryview):
+                fields[name] = array('d', value)
+        return _restore, (type(self), fields)
+
+
+def _restore(cls: type, fields: dict) -> FrozenFunction:
+    frozen = cls.__new__(cls)
+    frozen._init(**fields)
+    return frozen
+
+
+class FrozenLinearFunction(FrozenFunction):
+    """Linear function: the dot product of the weights and the point plus the free member."""
+
+    __slots__ = ('weights', 'free_member')
+
+    def __init__(self, weights: Sequence[float], free_member: float) -> None:
+        self._init(weights=weights, free_member=float(free_member))
+
+    def __call__(self, point: Sequence[float]) -> float:
+        if len(point) != len(self.weights):
+            raise IndexError(f"The number of elements of the point must be equal to {len(self.weights)}")
+        value = 0
+        for weight, x in zip(self.weights, point):
+            value += weight * x
+        return value + self.free_member
+
+    def evaluate(self, points: Union[list[Sequence[float]], Dataset]) -> array:
+        """Values at many points, a Dataset is evaluated column by column."""
+        if isinstance(points, Dataset):
+            if points.dimension != len(self.weights):
+                raise IndexError(f"The dimension of the points must be equal to {len(self.weights)}")
+            values = [0] * points.rows
+            for weight, column in zip(self.weights, (points.column(j) for j in range(points.dimension))):
+                values = [value + weight * x for value, x in zip(values, column)]
+            free_member = self.free_member
+            return array('d', [value + free_member for value in values])
+        return array('d', [self(point) for point in points])
+
+
+class FrozenPolynomialFunction(FrozenFunction):
+    """Polynomial evaluated by the Horner scheme, coefficients go from the highest power to the free member."""
+
+    __slots__ = ('coefficients',)
+
+    def __init__(self, coefficients: Sequence[float]) -> None:
+        self._init(coefficients=coefficients)
+
+    def __call__(self, x: float) -> float:
+        coefficients = self.coefficients
+        value = coefficients[0]
+        for i in range(1, len(coefficients)):
+            value = value * x + coefficients[i]
+        return value
+
+    def evaluate(self, x: Sequence[float]) -> array:
+        """Values at all coordinates of a buffer (array, memoryview, vector, Dataset column)."""
+        return array('d', map(self, x))
+
+
+class FrozenSpline(FrozenFunction):
+    """
+    Piecewise polynomial in one-dimensional space. On the interval [nodes[i], nodes[i + 1]] the value is
+    coefficients[k] + coefficients[k + 1] * t + ... with t = x - nodes[i] and k = i * (degree + 1).
+    Points outside the nodes are evaluated by the polynomials of the edge intervals.
+
+    """
+
+    __slots__ = ('nodes', 'coefficients', 'degree')
+
+    def __init__(self, nodes: Sequence[float], coefficients: Sequence[float], degree: int) -> None:
+        if len(coefficients) != (len(nodes) - 1) * (degree + 1):
+            raise ValueError("The number of coefficients does not match the nodes and the degree")
+        self._init(nodes=nodes, coefficients=coefficients, degree=degree)
+
+    def __call__(self, x: float) -> float:
+        nodes, coefficients = self.nodes, self.coefficients
+        index = bisect_left(nodes, x, 1, len(nodes) - 1) - 1
+        t = x - nodes[index]
+        if self.degree == 3:
+            k = 4 * index
+            return ((coefficients[k + 3] * t + coefficients[k + 2]) * t + coefficients[k + 1]) * t + coefficients[k]
+        if self.degree == 1:
+            k = 2 * index
+            return coefficients[k + 1] * t + coefficients[k]
+        k = (self.degree + 1) * index
+        value = coefficients[k + self.degree]
+        for j in range(self.degree - 1, -1, -1):
+            value = value * t + coefficients[k + j]
+        return value
+
+    def evaluate(self, x: Sequence[float]) -> array:
+        """Values at all coordinates of a buffer (array, memoryview, vector, Dataset column)."""
+        return array('d', map(self, x))
+
+
+def linear_coefficients(nodes: Sequence[float], parameters: vector) -> array:
+    """Coefficients of the linear pieces: the value at the left node and the slope."""
+    coefficients = array('d')
+    for i in range(len(nodes) - 1):
+        coefficients.append(parameters[i])
+        coefficients.append((parameters[i + 1] - parameters[i]) / (nodes[i + 1] - nodes[i]))
+    return coefficients
+
+
+def hermite_coefficients(nodes: Sequence[float], parameters: vector, slopes: vector) -> array:
+    """Coefficients of the cubic pieces given by the values and the derivatives at the nodes."""
+    coefficients = array('d')
+    for i in range(len(nodes) - 1):
+        h = nodes[i + 1] - nodes[i]
+        delta = (parameters[i + 1] - parameters[i]) / h
+        coefficients.append(parameters[i])
+        coefficients.append(slopes[i])
+        coefficients.append((3 * delta - 2 * slopes[i] - slopes[i + 1]) / h)
+        coefficients.append((slopes[i] + slopes[i + 1] - 2 * delta) / h ** 2)
+    return coefficients
@@ -1,15 +1,22 @@
-from functions.abcfunction import DifferentiableFunction, Function
-from mathtypes.linalg import vector
+from array import array
+from typing import Union
+from functions.abcfunction import DifferentiableFunction, Function, LinearInParameters
+from functions.bound import BoundFunction
+from functions.frozen import FrozenLinearFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix
 
 
-class LinearFunction(Function, DifferentiableFunction):
+class LinearFunction(Function, DifferentiableFunction, LinearInParameters):
     """Linear n-dimensional function. Implements the calculation of the gradient at a point."""
     
     def __init__(self) -> None:
         self.parameters = vector()
 
-    def bind(self, parameters: vector) -> Function:
-        self.parameters = parameters.copy()
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        if immutable:
+            return BoundFunction.create(self, parameters.copy() if copy else parameters)
+        self.parameters = parameters.copy() if copy else parameters
         return self
 
     def value(self, point: vector) -> float:
@@ -39,6 +46,43 @@ class LinearFunction(Function, DifferentiableFunction):
                                 the number of function parameters without a free member""")
         else:
             raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        """Values at all points, accumulated column by column in the same order as value()."""
+        values = [0] * len(points)
+        for factor, column in zip(self.parameters, self.columns(points)):
+            values = [value + factor * x for value, x in zip(values, column)]
+        free_member = self.parameters[-1]
+        return vector([value + free_member for value in values])
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> matrix:
+        """Gradients at all points: the coordinates of the points and a column of ones."""
+        columns = self.columns(points)
+        gradients = matrix(len(points), self.parameters.length)
+        for j, column in enumerate(columns):
+            gradients.col(j).assign(column)
+        gradients.col(-1).assign([1.0] * len(points))
+        return gradients
+
+    def freeze(self, parameters: vector) -> FrozenLinearFunction:
+        if parameters.length == 0:
+            raise ValueError("An empty argument(s) was passed")
+        return FrozenLinearFunction(array('d', [parameters[i] for i in range(parameters.length - 1)]), parameters[-1])
+
+    def columns(self, points: Union[list[vector], Dataset]) -> list:
+        """Coordinates of the points by columns. The columns of a Dataset are used without copying."""
+        if self.parameters.length == 0:
+            raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
+        dimension = self.parameters.length - 1
+        if isinstance(points, Dataset):
+            if points.dimension != dimension:
+                raise IndexError("""The number of elements of the point vector must be equal to
+                            the number of function parameters without a free member""")
+            return [points.column(j) for j in range(dimension)]
+        if any(point.length != dimension for point in points):
+            raise IndexError("""The number of elements of the point vector must be equal to
+                            the number of function parameters without a free member""")
+        return [[point[j] for point in points] for j in range(dimension)]
     
     def __str__(self) -> str:
         if self.parameters.length != 0:
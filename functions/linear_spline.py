@@ -1,18 +1,23 @@
-from functions.abcfunction import Function, DifferentiableFunction
-from mathtypes.linalg import vector
+from array import array
+from typing import Sequence, Union
+from functions.abcfunction import Function, SparseDifferentiableFunction
+from functions.bound import BoundFunction
+from functions.frozen import FrozenSpline, linear_coefficients
+from functions.spline import Spline
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, sparsematrix
 
-class LinearSpline(Function, DifferentiableFunction):
+class LinearSpline(Spline, SparseDifferentiableFunction):
     """
-    Linear spline for one-dimensional space. Implements the calculation of the gradient at a point.
+    Linear spline for one-dimensional space. Implements the calculation of the gradient at a point, the gradient is sparse.
     Nodes and function values (parameters) are passed to them in ascending order of node value.
     
     """
 
-    def __init__(self, nodes: list) -> None:
-        self.nodes = list(map(float, nodes))
-
-    def bind(self, parameters: vector) -> Function:
-        self.parametes = parameters.copy()
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        if immutable:
+            return BoundFunction.create(self, parameters.copy() if copy else parameters)
+        self.parameters = parameters.copy() if copy else parameters
         return self
 
     def basicFunction(self, point: float, num_func: int, index: int) -> float:
@@ -26,21 +31,38 @@ class LinearSpline(Function, DifferentiableFunction):
     def value(self, point: vector) -> float:
         cur_point = float(point)
         index = self.getIntervalNumber(cur_point)
-        value = self.parametes[index] * self.basicFunction(cur_point, 0, index) + \
-            self.parametes[index + 1] * self.basicFunction(cur_point, 1, index)
+        value = self.parameters[index] * self.basicFunction(cur_point, 0, index) + \
+            self.parameters[index + 1] * self.basicFunction(cur_point, 1, index)
         return value
 
     def gradient(self, point: vector) -> vector:
         cur_point = float(point)
-        gradient = vector(self.parametes.length)
+        gradient = vector(self.parameters.length)
         index = self.getIntervalNumber(cur_point)
         gradient[index] = self.basicFunction(cur_point, 0, index)
         gradient[index + 1] = self.basicFunction(cur_point, 1, index)
         return gradient
 
-    def getIntervalNumber(self, point: float) -> int:
-        """Returns the index of the left node of the interval in which point falls"""
-        for index in range(self.nodes.length - 1):
-            if point <= self.nodes[index + 1]:
-                break
-        return index
+    def sparseGradient(self, point: vector) -> tuple[list[int], list[float]]:
+        cur_point = float(point)
+        index = self.getIntervalNumber(cur_point)
+        return [index, index + 1], [self.basicFunction(cur_point, 0, index), self.basicFunction(cur_point, 1, index)]
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        return self.design(points)[0].multiply(self.parameters)
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> sparsematrix:
+        return self.design(points)[0].copy()
+
+    def freeze(self, parameters: vector) -> FrozenSpline:
+        if parameters.length != len(self.nodes):
+            raise ValueError(f"The number of parameters must be equal to the number of nodes {len(self.nodes)}")
+        return FrozenSpline(array('d', self.nodes), linear_coefficients(self.nodes, parameters), 1)
+
+    def assemble(self, x: Sequence[float], intervals: Sequence[int]) -> tuple[sparsematrix]:
+        values = sparsematrix(len(self.nodes))
+        nodes = self.nodes
+        for cur_point, index in zip(x, intervals):
+            h = nodes[index + 1] - nodes[index]
+            values.append([index, index + 1], [1 - (cur_point - nodes[index]) / h, (cur_point - nodes[index]) / h])
+        return values,
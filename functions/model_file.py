@@ -0,0 +1,128 @@
+from array import array
+from typing import Sequence, SupportsIndex
+import mmap
+import struct
+import sys
+from functions.abcfunction import Function
+from functions.frozen import FrozenFunction, FrozenLinearFunction, FrozenPolynomialFunction, FrozenSpline
+from mathtypes.linalg import vector
+
+MAGIC = b"FAMF"
+VERSION = 1
+# magic, version, number of models
+HEADER = struct.Struct("<4sIQ")
+# model type, degree, byte offset of the data, number of nodes, parameters and coefficients
+ENTRY = struct.Struct("<IIQQQQ")
+
+LINEAR_FUNCTION = 1
+POLYNOMIAL_FUNCTION = 2
+SPLINE = 3
+
+
+class ModelFile(Sequence[FrozenFunction]):
+    """
+    Fitted models stored in one float64 buffer.\n
+    Binary layout: a fixed header (magic, version, number of models), a table of fixed-size entries
+    (model type, degree, data offset, number of nodes, parameters and coefficients) and the data of every model:
+    nodes, parameters and precomputed coefficients of its frozen evaluator, little-endian float64.
+    models[i] is the frozen evaluator of model i built on views into the buffer, so a memory-mapped file
+    is opened in constant time and only the model that is evaluated is ever read.
+
+    """
+
+    __slots__ = ('_source', '_bytes', 'count')
+
+    @classmethod
+    def frombuffer(cls, buffer) -> "ModelFile":
+        """Wraps a buffer in the binary model format (bytes, mmap, shared memory) without copying."""
+        if sys.byteorder != "little":
+            raise RuntimeError("Models are stored as little-endian float64 and require a little-endian platform")
+        if len(buffer) < HEADER.size:
+            raise ValueError("The buffer is too small to hold a model file header")
+        magic, version, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("The buffer does not contain models")
+        if version != VERSION:
+            raise ValueError(f"Unsupported model file version {version}")
+        if len(buffer) < HEADER.size + ENTRY.size * count:
+            raise ValueError("The model file buffer is truncated")
+        models = cls.__new__(cls)
+        models._source = buffer
+        models._bytes = memoryview(buffer).cast('B')
+        models.count = count
+        return models
+
+    @classmethod
+    def open(cls, path: str) -> "ModelFile":
+        """Memory-maps a model file read-only. The loading time does not depend on the number of models."""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.frombuffer(mapped)
+
+    @classmethod
+    def create(cls, path: str, models: list[tuple[Function, vector]]) -> "ModelFile":
+        """Writes functions with their fitted parameters into a model file at path and opens the result."""
+        entries, blocks = [], []
+        offset = HEADER.size + ENTRY.size * len(models)
+        for function, parameters in models:
+            frozen = function.freeze(parameters)
+            if isinstance(frozen, FrozenSpline):
+                model_type, degree, nodes, coefficients = SPLINE, frozen.degree, frozen.nodes, frozen.coefficients
+            elif isinstance(frozen, FrozenPolynomialFunction):
+                model_type, degree, nodes, coefficients = POLYNOMIAL_FUNCTION, 0, (), frozen.coefficients
+            elif isinstance(frozen, FrozenLinearFunction):
+                model_type, degree, nodes = LINEAR_FUNCTION, 1, ()
+                coefficients = array('d', frozen.weights)
+                coefficients.append(frozen.free_member)
+            else:
+                raise TypeError(f"Unable to store {type(function).__name__} in a model file")
+            block = array('d', nodes)
+            block.extend(parameters)
+            block.extend(coefficients)
+            entries.append(ENTRY.pack(model_type, degree, offset, len(nodes), parameters.length, len(coefficients)))
+            blocks.append(block)
+            offset += 8 * len(block)
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(models)))
+            for entry in entries:
+                file.write(entry)
+            for block in blocks:
+                block.tofile(file)
+        return cls.open(path)
+
+    def _entry(self, i: SupportsIndex) -> tuple[int, int, int, int, int, int]:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("model index out of range")
+        entry = ENTRY.unpack_from(self._bytes, HEADER.size + ENTRY.size * i)
+        if entry[2] + 8 * sum(entry[3:]) > len(self._bytes):
+            raise ValueError("The model file buffer is truncated")
+        return entry
+
+    def _view(self, offset: int, length: int) -> memoryview:
+        return self._bytes[offset:offset + 8 * length].cast('d')
+
+    def parameters(self, i: SupportsIndex) -> vector:
+        """Fitted parameters of model i as a vector view."""
+        _, _, offset, nodes, parameters, _ = self._entry(i)
+        return vector.frombuffer(self._view(offset + 8 * nodes, parameters))
+
+    def __getitem__(self, i: SupportsIndex) -> FrozenFunction:
+        """Frozen evaluator of model i on views into the buffer."""
+        model_type, degree, offset, nodes, parameters, coefficients = self._entry(i)
+        coefficient_view = self._view(offset + 8 * (nodes + parameters), coefficients)
+        if model_type == SPLINE:
+            return FrozenSpline(self._view(offset, nodes), coefficient_view, degree)
+        if model_type == POLYNOMIAL_FUNCTION:
+            return FrozenPolynomialFunction(coefficient_view)
+        if model_type == LINEAR_FUNCTION:
+            return FrozenLinearFunction(coefficient_view[:-1], coefficient_view[-1])
+        raise ValueError(f"Unknown model type {model_type}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
@@ -1,31 +1,99 @@
-from functions.abcfunction import Function
-from mathtypes.linalg import vector
+from array import array
+from typing import Sequence, Union
+from weakref import WeakKeyDictionary
+from functions.abcfunction import DifferentiableFunction, Function, LinearInParameters, coordinates
+from functions.bound import BoundFunction
+from functions.frozen import FrozenPolynomialFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, matrix
 
 
-class PolynomialFunction(Function):
-    """Polynomial in one-dimensional space. Does not implement gradient calculation."""
-    
+class PolynomialFunction(Function, DifferentiableFunction, LinearInParameters):
+    """
+    Polynomial in one-dimensional space, parameters are the coefficients from the highest power to the free member.\n
+    The value is computed by the Horner scheme. Implements the calculation of the gradient at a point:
+    the powers of x, generated one from another. The table of powers of the points of a Dataset is computed once
+    and reused while the degree does not change.
+
+    """
+
     def __init__(self) -> None:
         self.parameters = vector()
+        self._powers = WeakKeyDictionary()
 
-    def bind(self, parameters: vector) -> Function:
-        self.parameters = parameters.copy()
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        if immutable:
+            return BoundFunction.create(self, parameters.copy() if copy else parameters)
+        self.parameters = parameters.copy() if copy else parameters
         return self
 
     def value(self, point: vector) -> float:
         if self.parameters.length != 0:
             if point.length == 1:
-                value = 0
-                n = self.parameters.length - 1
-                for i in range(n):
-                    value += self.parameters[i] * point[0] ** (n-i)
-                value += self.parameters[-1]
+                x = point[0]
+                value = self.parameters[0]
+                for i in range(1, self.parameters.length):
+                    value = value * x + self.parameters[i]
                 return value
             else:
                 raise ValueError("The number of elements of the vector point must be equal to 1")
         else:
             raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
-    
+
+    def gradient(self, point: vector) -> vector:
+        """Gradient by parameters of function at a point"""
+        if self.parameters.length != 0:
+            if point.length == 1:
+                x = point[0]
+                grad = vector(self.parameters.length)
+                power = 1.0
+                for i in range(self.parameters.length - 1, -1, -1):
+                    grad[i] = power
+                    power *= x
+                return grad
+            else:
+                raise ValueError("The number of elements of the vector point must be equal to 1")
+        else:
+            raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        """Values at all points, the Horner scheme runs over all points at once."""
+        if self.parameters.length == 0:
+            raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
+        x = coordinates(points)
+        values = [self.parameters[0]] * len(x)
+        for i in range(1, self.parameters.length):
+            factor = self.parameters[i]
+            values = [value * xk + factor for value, xk in zip(values, x)]
+        return vector(values)
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> matrix:
+        """Gradients at all points, a copy of the table of powers of the points."""
+        if self.parameters.length == 0:
+            raise RuntimeError("Function parameters are not set. Use the bind() method to set parameters.")
+        if not isinstance(points, Dataset):
+            return self.powers(coordinates(points))
+        powers = self._powers.get(points.points_key)
+        if powers is None or powers.cols != self.parameters.length:
+            powers = self._powers[points.points_key] = self.powers(coordinates(points))
+        # the functionals negate the jacobian in place, so the cached table is not returned
+        return powers.copy()
+
+    def powers(self, x: Sequence[float]) -> matrix:
+        """Table of powers: row k is x[k]^n, ..., x[k], 1 for the current degree n."""
+        table = matrix(len(x), self.parameters.length)
+        power = [1.0] * len(x)
+        table.col(-1).assign(power)
+        for j in range(self.parameters.length - 2, -1, -1):
+            power = [value * xk for value, xk in zip(power, x)]
+            table.col(j).assign(power)
+        return table
+
+    def freeze(self, parameters: vector) -> FrozenPolynomialFunction:
+        if parameters.length == 0:
+            raise ValueError("An empty argument(s) was passed")
+        return FrozenPolynomialFunction(array('d', parameters))
+
     def __str__(self) -> str:
         if self.parameters.length != 0:
             result_str = "Polynomial function f(x) = "
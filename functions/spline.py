@@ -0,0 +1,55 @@
+from abc import abstractmethod
+from array import array
+from bisect import bisect_left
+from typing import Sequence, Union
+from weakref import WeakKeyDictionary
+from functions.abcfunction import DifferentiableFunction, Function, LinearInParameters, coordinates
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, sparsematrix
+
+class Spline(Function, DifferentiableFunction, LinearInParameters):
+    """
+    Common part of the one-dimensional splines: nodes and the search of the interval of a point.\n
+    A spline is linear in its parameters, so on fixed points its values are products of sparse design matrices
+    of basis function values and the coefficients. The intervals and the design matrices of the points of a Dataset
+    are computed once and reused by all later calls with the same dataset, so repeated evaluations during
+    optimization neither search the nodes nor compute basis functions again.
+
+    """
+
+    def __init__(self, nodes: list) -> None:
+        self.nodes = list(map(float, nodes))
+        self._intervals = WeakKeyDictionary()
+        self._designs = WeakKeyDictionary()
+
+    def getIntervalNumber(self, point: float) -> int:
+        """Returns the index of the left node of the interval in which point falls"""
+        # the first node k >= 1 with point <= nodes[k] closes the interval, points outside the nodes fall into the edge ones
+        return bisect_left(self.nodes, point, 1, len(self.nodes) - 1) - 1
+
+    def intervals(self, points: Union[list[vector], Dataset]) -> Sequence[int]:
+        """Interval numbers of all points, cached for a Dataset."""
+        if not isinstance(points, Dataset):
+            return self.locate(coordinates(points))
+        intervals = self._intervals.get(points.points_key)
+        if intervals is None:
+            intervals = self._intervals[points.points_key] = self.locate(coordinates(points))
+        return intervals
+
+    def locate(self, x: Sequence[float]) -> array:
+        nodes, hi = self.nodes, len(self.nodes) - 1
+        return array('q', [bisect_left(nodes, xk, 1, hi) - 1 for xk in x])
+
+    def design(self, points: Union[list[vector], Dataset]) -> tuple[sparsematrix, ...]:
+        """Design matrices of the points, cached for a Dataset. They must not be modified."""
+        if not isinstance(points, Dataset):
+            return self.assemble(coordinates(points), self.intervals(points))
+        design = self._designs.get(points.points_key)
+        if design is None:
+            design = self._designs[points.points_key] = self.assemble(coordinates(points), self.intervals(points))
+        return design
+
+    @abstractmethod
+    def assemble(self, x: Sequence[float], intervals: Sequence[int]) -> tuple[sparsematrix, ...]:
+        """Builds the design matrices: row k holds the basis functions at x[k], which lies in intervals[k]."""
+        pass
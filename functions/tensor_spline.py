@@ -0,0 +1,154 @@
+from bisect import bisect_left
+from itertools import product
+from math import ceil, isclose
+from typing import Union
+from weakref import WeakKeyDictionary
+from functions.abcfunction import Function, LinearInParameters, SparseDifferentiableFunction
+from functions.bound import BoundFunction
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector, sparsematrix
+
+KINDS = ("linear", "cubic")
+
+
+class GridAxis:
+    """
+    Nodes of a spline grid along one axis.\n
+    On a uniform axis the interval of a point is computed from the step in O(1),
+    on a non-uniform one it is found by binary search.
+
+    """
+
+    __slots__ = ('nodes', 'step', 'uniform')
+
+    def __init__(self, nodes: list) -> None:
+        self.nodes = list(map(float, nodes))
+        if len(self.nodes) < 2:
+            raise ValueError("A grid axis must have at least 2 nodes")
+        if any(right <= left for left, right in zip(self.nodes, self.nodes[1:])):
+            raise ValueError("The nodes of a grid axis must be strictly ascending")
+        self.step = (self.nodes[-1] - self.nodes[0]) / (len(self.nodes) - 1)
+        self.uniform = all(isclose(right - left, self.step, rel_tol=1e-9)
+                           for left, right in zip(self.nodes, self.nodes[1:]))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def getIntervalNumber(self, point: float) -> int:
+        """Returns the index of the left node of the interval in which point falls"""
+        nodes, last = self.nodes, len(self.nodes) - 2
+        if not self.uniform:
+            return bisect_left(nodes, point, 1, last + 1) - 1
+        index = min(max(ceil((point - nodes[0]) / self.step) - 1, 0), last)
+        # the rounding of the step may shift a point lying near a node into the neighbouring interval
+        if index > 0 and point <= nodes[index]:
+            index -= 1
+        elif index < last and point > nodes[index + 1]:
+            index += 1
+        return index
+
+    def linearWeights(self, point: float) -> list[tuple[int, float]]:
+        """Non-zero linear basis functions at point as pairs (node index, value)."""
+        index = self.getIntervalNumber(point)
+        ksi = (point - self.nodes[index]) / (self.nodes[index + 1] - self.nodes[index])
+        return [(index, 1 - ksi), (index + 1, ksi)]
+
+    def cubicWeights(self, point: float) -> list[tuple[int, float]]:
+        """
+        Non-zero basis functions of the local cubic (Catmull-Rom) interpolation at point as pairs (node index, value).
+        The derivative at a node is the central difference of its neighbours, one-sided at the ends,
+        so a value depends on at most 4 nodes.
+
+        """
+        nodes = self.nodes
+        index = self.getIntervalNumber(point)
+        h = nodes[index + 1] - nodes[index]
+        ksi = (point - nodes[index]) / h
+        ksi2, ksi3 = ksi ** 2, ksi ** 3
+        weights = {index: 1 - 3 * ksi2 + 2 * ksi3, index + 1: 3 * ksi2 - 2 * ksi3}
+        for node, factor in ((index, h * (ksi - 2 * ksi2 + ksi3)), (index + 1, h * (-ksi2 + ksi3))):
+            left, right = max(node - 1, 0), min(node + 1, len(nodes) - 1)
+            factor /= nodes[right] - nodes[left]
+            weights[right] = weights.get(right, 0.0) + factor
+            weights[left] = weights.get(left, 0.0) - factor
+        return sorted(weights.items())
+
+
+class TensorSpline(Function, SparseDifferentiableFunction, LinearInParameters):
+    """
+    Tensor-product spline on a rectangular grid in n-dimensional space (bilinear/trilinear or bicubic/tricubic).
+    Implements the calculation of the gradient at a point, the gradient is sparse.\n
+    axes are the nodes of the grid along every coordinate in ascending order. Parameters are the values
+    at the grid nodes in row-major order: the index of the last coordinate changes fastest.
+    kind="linear" is the product of linear splines, every value depends on 2^n nodes;
+    kind="cubic" is the product of local cubic (Catmull-Rom) splines, every value depends on at most 4^n nodes.
+    The design matrices of the points of a Dataset are computed once and reused.
+
+    """
+
+    def __init__(self, axes: list[list], kind: str = "linear") -> None:
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS} not {kind!r}")
+        if not axes:
+            raise ValueError("An empty argument(s) was passed")
+        self.axes = [GridAxis(nodes) for nodes in axes]
+        self.kind = kind
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.strides = [1] * len(self.axes)
+        for a in range(len(self.axes) - 2, -1, -1):
+            self.strides[a] = self.strides[a + 1] * self.shape[a + 1]
+        self.size = self.strides[0] * self.shape[0]
+        self._designs = WeakKeyDictionary()
+
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        if parameters.length != self.size:
+            raise ValueError(f"The number of parameters must be equal to the number of grid nodes {self.size}")
+        if immutable:
+            return BoundFunction.create(self, parameters.copy() if copy else parameters)
+        self.parameters = parameters.copy() if copy else parameters
+        return self
+
+    def sparseGradient(self, point: vector) -> tuple[list[int], list[float]]:
+        if point.length != len(self.axes):
+            raise ValueError(f"The number of elements of the vector point must be equal to {len(self.axes)}")
+        axis_weights = [axis.linearWeights(point[a]) if self.kind == "linear" else axis.cubicWeights(point[a])
+                        for a, axis in enumerate(self.axes)]
+        indices, values = [], []
+        for combination in product(*axis_weights):
+            index, value = 0, 1.0
+            for stride, (node, weight) in zip(self.strides, combination):
+                index += stride * node
+                value *= weight
+            indices.append(index)
+            values.append(value)
+        return indices, values
+
+    def value(self, point: vector) -> float:
+        value = 0
+        for index, weight in zip(*self.sparseGradient(point)):
+            value += self.parameters[index] * weight
+        return value
+
+    def gradient(self, point: vector) -> vector:
+        grad = vector(self.size)
+        for index, weight in zip(*self.sparseGradient(point)):
+            grad[index] = weight
+        return grad
+
+    def design(self, points: Union[list[vector], Dataset]) -> sparsematrix:
+        """Basis functions at the points as a sparse matrix, cached for a Dataset. It must not be modified."""
+        if isinstance(points, Dataset):
+            design = self._designs.get(points.points_key)
+            if design is None:
+                design = self._designs[points.points_key] = self.design(list(points))
+            return design
+        design = sparsematrix(self.size)
+        for point in points:
+            design.append(*self.sparseGradient(point))
+        return design
+
+    def value_batch(self, points: Union[list[vector], Dataset]) -> vector:
+        return self.design(points).multiply(self.parameters)
+
+    def gradient_batch(self, points: Union[list[vector], Dataset]) -> sparsematrix:
+        return self.design(points).copy()
@@ -0,0 +1,202 @@
+from typing import Sequence, SupportsIndex
+from array import array
+import csv
+import hashlib
+import mmap
+import struct
+import sys
+from mathtypes.linalg import vector
+
+MAGIC = b"FADS"
+VERSION = 1
+# magic, version, number of points, dimension of points
+HEADER = struct.Struct("<4sIQQ")
+
+
+class Dataset(Sequence[vector]):
+    """
+    Training points and function values stored column-wise in one float64 buffer.\n
+    Binary layout: a fixed header (magic, version, number of points, dimension) followed by
+    dimension columns of point coordinates and one column of function values, little-endian float64.
+    dataset[i] is the point i and dataset.f is the vector of function values,
+    both are views into the buffer, so a memory-mapped file is never copied.\n
+    A dataset is immutable, its buffer and attributes are read-only. The fingerprint is a hash of the dimension
+    and the values, computed once: datasets with equal fingerprints are equal and hash equally.
+    points_key hashes only the coordinates, the caches of functions (intervals, design matrices, powers)
+    are keyed by it, so they serve every dataset with the same points whatever its function values.
+
+    """
+
+    __slots__ = ('_columns', '_source', '_fingerprint', '_points_key', 'rows', 'dimension', 'f', '__weakref__')
+
+    def __init__(self, x: list[vector], f: vector) -> None:
+        if isinstance(x, list) and all(isinstance(xi, vector) for xi in x):
+            if isinstance(f, vector):
+                if f and len(x):
+                    if len(x) == f.length:
+                        dimension = x[0].length
+                        if any(xi.length != dimension for xi in x):
+                            raise ValueError("All points must have the same dimension")
+                        values = array('d')
+                        for j in range(dimension):
+                            values.extend(xi[j] for xi in x)
+                        values.extend(f)
+                        self._attach(values, len(x), dimension)
+                    else:
+                        raise ValueError(f"len(x) must be equals f.length = {f.length}, but {len(x)}")
+                else:
+                    raise ValueError("An empty argument(s) was passed")
+            else:
+                raise TypeError(f"f must be vector not {type(f)}")
+        else:
+            raise TypeError(f"x must be list of vectors not {type(x)}")
+
+    def _attach(self, source, rows: int, dimension: int, offset: int = 0) -> None:
+        """Uses the float64 columns that start at byte offset of source as the storage of the dataset."""
+        if sys.byteorder != "little":
+            raise RuntimeError("Datasets are stored as little-endian float64 and require a little-endian platform")
+        columns = memoryview(source).cast('B')[offset:offset + 8 * rows * (dimension + 1)].cast('d').toreadonly()
+        fields = dict(_columns=columns, _source=source, _fingerprint=None, _points_key=None,
+                      rows=rows, dimension=dimension, f=vector.frombuffer(columns[dimension * rows:]))
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def frombuffer(cls, buffer) -> "Dataset":
+        """Wraps a buffer in the binary dataset format (bytes, mmap, shared memory) without copying."""
+        if len(buffer) < HEADER.size:
+            raise ValueError("The buffer is too small to hold a dataset header")
+        magic, version, rows, dimension = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("The buffer does not contain a dataset")
+        if version != VERSION:
+            raise ValueError(f"Unsupported dataset version {version}")
+        if len(buffer) < HEADER.size + 8 * rows * (dimension + 1):
+            raise ValueError("The dataset buffer is truncated")
+        dataset = cls.__new__(cls)
+        dataset._attach(buffer, rows, dimension, HEADER.size)
+        return dataset
+
+    @classmethod
+    def open(cls, path: str) -> "Dataset":
+        """Memory-maps a binary dataset file read-only. The loading time does not depend on the file size."""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.frombuffer(mapped)
+
+    @classmethod
+    def fromcsv(cls, csv_path: str, path: str, delimiter: str = ",", skip_header: bool = False) -> "Dataset":
+        """
+        Converts a CSV file with rows x1, ..., xn, f into the binary format at path and opens the result.
+
+        """
+        with open(csv_path, newline="") as file:
+            reader = csv.reader(file, delimiter=delimiter)
+            if skip_header:
+                next(reader, None)
+            columns = None
+            for line, row in enumerate(reader, start=1):
+                if not row:
+                    continue
+                if columns is None:
+                    if len(row) < 2:
+                        raise ValueError("A CSV row must contain at least one coordinate and a function value")
+                    columns = [array('d') for _ in row]
+                elif len(row) != len(columns):
+                    raise ValueError(f"Row {line} has {len(row)} columns, expected {len(columns)}")
+                for column, value in zip(columns, row):
+                    column.append(float(value))
+        if not columns:
+            raise ValueError("An empty CSV file was passed")
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(columns[0]), len(columns) - 1))
+            for column in columns:
+                column.tofile(file)
+        return cls.open(path)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.rows, self.dimension))
+            file.write(self._columns)
+
+    def tobytes(self, start: int = 0, stop: int = None) -> bytes:
+        """The points start, ..., stop - 1 with their function values in the binary dataset format."""
+        start, stop, _ = slice(start, stop).indices(self.rows)
+        rows = max(stop - start, 0)
+        data = bytearray(HEADER.pack(MAGIC, VERSION, rows, self.dimension))
+        for j in range(self.dimension + 1):
+            data += self._columns[j * self.rows + start:j * self.rows + start + rows]
+        return bytes(data)
+
+    def column(self, j: SupportsIndex) -> vector:
+        """Coordinate j of all points as a vector view."""
+        if j < 0:
+            j += self.dimension
+        if not 0 <= j < self.dimension:
+            raise IndexError("dataset column index out of range")
+        return vector.frombuffer(self._columns[j * self.rows:(j + 1) * self.rows])
+
+    def __getitem__(self, i: SupportsIndex) -> vector:
+        """Point i as a strided vector view."""
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("dataset index out of range")
+        return vector.frombuffer(self._columns[i:i + self.dimension * self.rows:self.rows])
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the dimension and all values, computed on first use."""
+        if self._fingerprint is None:
+            object.__setattr__(self, '_fingerprint', self._digest(self._columns))
+        return self._fingerprint
+
+    @property
+    def points_key(self) -> "PointsKey":
+        """Key of the coordinates without the function values, it lives as long as the dataset."""
+        if self._points_key is None:
+            object.__setattr__(self, '_points_key', PointsKey(self._digest(self._columns[:self.dimension * self.rows])))
+        return self._points_key
+
+    def _digest(self, columns: memoryview) -> str:
+        digest = hashlib.blake2b(HEADER.pack(MAGIC, VERSION, self.rows, self.dimension), digest_size=16)
+        digest.update(columns)
+        return digest.hexdigest()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Dataset):
+            return NotImplemented
+        return self is other or self.fingerprint == other.fingerprint
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self[i]
+
+
+class PointsKey:
+    """Key of the caches of tables that depend only on the points. Keys of equal points are equal."""
+
+    __slots__ = ('fingerprint', '__weakref__')
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PointsKey):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint)
@@ -1,13 +1,56 @@
-from ast import Index
 from typing import Generic, MutableSequence, Union, overload, SupportsIndex, TypeVar
+from array import array
 from math import sqrt
-import copy
+from sys import float_info
+import os
 
 
 T = TypeVar('T', int, float)
 
+MULTIPLY_ROW_BLOCK = 64
+
+BACKENDS = ("python", "numpy")
+BACKEND_ENVIRONMENT_VARIABLE = "LINALG_BACKEND"
+
+_backend = "python"
+_np = None
+
+
+def set_backend(name: str) -> None:
+    """
+    Selects the storage and computation backend of vector and matrix.\n
+    "python" stores values in array('d') / lists and uses pure Python loops,
+    "numpy" stores values in ndarrays and uses vectorized NumPy/LAPACK routines.
+    The backend must be selected before vectors and matrices are created.
+
+    """
+    global _backend, _np
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS} not {name!r}")
+    if name == "numpy":
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("The numpy backend requires the numpy package to be installed") from None
+        _np = numpy
+    else:
+        _np = None
+    _backend = name
+
+
+def get_backend() -> str:
+    return _backend
+
 
 class vector(MutableSequence[T], Generic[T]):
+    """
+    Dense vector of floating point numbers.\n
+    Values are stored in a compact array('d') buffer. Arithmetic operators return new vectors,
+    in-place operators (+=, -=, *=, axpy) reuse the existing buffer.
+
+    """
+
+    __slots__ = ('_values',)
 
     @overload
     def __init__(self):
@@ -23,45 +66,151 @@ class vector(MutableSequence[T], Generic[T]):
 
     def __init__(self, arg: Union[list[T], int] = None) -> None:
         if isinstance(arg, list):
-            if all(isinstance(val, (int, float)) for val in arg):
-                self._values = arg.copy()
+            if _np is not None:
+                values = _np.array(arg)
+                if values.dtype.kind not in "biuf":
+                    raise TypeError("list items must be integer or floating point")
+                self._values = values.astype(float)
             else:
-                raise TypeError("list items must be integer or floating point")
+                try:
+                    self._values = array('d', arg)
+                except TypeError:
+                    raise TypeError("list items must be integer or floating point") from None
         elif arg is not None and isinstance(arg, int):
-            self._values = [0] * arg
+            self._values = _zeros(arg)
         else:
-            self._values = []
-        self.length = len(self._values)
+            self._values = _zeros(0)
+
+    @classmethod
+    def fromarray(cls, values: array) -> "vector[T]":
+        """
+        Wraps an existing array('d') (or float64 ndarray for the numpy backend) without copying and without validation.\n
+        The vector takes ownership of the buffer, so the caller must not keep using it.
+
+        """
+        new_vector = cls.__new__(cls)
+        new_vector._values = values
+        return new_vector
+
+    @classmethod
+    def frombuffer(cls, buffer) -> "vector[T]":
+        """
+        Wraps a float64 buffer (a memoryview of a matrix, a memory-mapped file, shared memory) without copying.\n
+        The vector is a view of fixed length, writes go to the buffer unless it is read-only.
+
+        """
+        values = buffer.buffer() if isinstance(buffer, vector) else memoryview(buffer)
+        if values.format != 'd':
+            values = values.cast('B').cast('d')
+        if _np is not None:
+            return cls.fromarray(_np.asarray(values))
+        return cls.fromarray(values)
+
+    @property
+    def length(self) -> int:
+        return len(self._values)
 
     def __getitem__(self, i: SupportsIndex) -> T:
         return self._values[i]
 
     def __setitem__(self, i: SupportsIndex, value: T):
-        if not isinstance(value, (int, float)):
-            raise TypeError("Value must be an integer or float")
-        self._values[i] = value
+        if _np is not None:
+            if not isinstance(value, (int, float)):
+                raise TypeError("Value must be an integer or float")
+            if not self._values.flags.writeable:
+                raise TypeError("cannot modify read-only memory")
+        try:
+            self._values[i] = value
+        except TypeError:
+            # views (memoryview storage) accept only float items
+            if not isinstance(value, (int, float)):
+                raise TypeError("Value must be an integer or float") from None
+            self._values[i] = float(value)
 
     def __delitem__(self, i: SupportsIndex):
-        del self._values[i]
+        if _np is not None:
+            self._values = _np.delete(self._values, i)
+        else:
+            del self._values[i]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def buffer(self) -> memoryview:
+        """The float64 values as a memoryview without copying, writes through it change the vector."""
+        return memoryview(self._values)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        # the buffer protocol for Python classes needs Python 3.12, buffer() works on every version
+        return memoryview(self._values)
 
     def __add__(self, other: "vector[T]") -> "vector[T]":
-        if self.length == other.length:
-            return vector([self._values[i] + other[i] for i in range(self.length)])
+        if len(self._values) == len(other):
+            if _np is not None:
+                return vector.fromarray(self._values + _storage(other))
+            return vector.fromarray(array('d', [a + b for a, b in zip(self._values, other)]))
         raise IndexError(f'expected vector with length {self.length}')
 
     def __sub__(self, other: "vector[T]") -> "vector[T]":
-        if self.length == other.length:
-            return vector([self._values[i] - other[i] for i in range(self.length)])
+        if len(self._values) == len(other):
+            if _np is not None:
+                return vector.fromarray(self._values - _storage(other))
+            return vector.fromarray(array('d', [a - b for a, b in zip(self._values, other)]))
         raise IndexError(f'expected vector with length {self.length}')
 
     def __neg__(self) -> "vector[T]":
-        return vector([-val for val in self._values])
+        if _np is not None:
+            return vector.fromarray(-self._values)
+        return vector.fromarray(array('d', [-val for val in self._values]))
 
     def __rmul__(self, factor: T) -> "vector[T]":
         if isinstance(factor, (int, float)):
-            return vector([value * factor for value in self._values])
+            if _np is not None:
+                return vector.fromarray(self._values * factor)
+            return vector.fromarray(array('d', [value * factor for value in self._values]))
         raise TypeError("factor must be an integer or a float")
 
+    def __iadd__(self, other: "vector[T]") -> "vector[T]":
+        return self.axpy(1.0, other)
+
+    def __isub__(self, other: "vector[T]") -> "vector[T]":
+        return self.axpy(-1.0, other)
+
+    def __imul__(self, factor: T) -> "vector[T]":
+        if not isinstance(factor, (int, float)):
+            raise TypeError("factor must be an integer or a float")
+        values = self._values
+        if _np is not None:
+            values *= factor
+            return self
+        for i in range(len(values)):
+            values[i] *= factor
+        return self
+
+    def axpy(self, factor: T, other: "vector[T]") -> "vector[T]":
+        """In-place self += factor * other without allocating a new vector."""
+        values = self._values
+        if len(values) != len(other):
+            raise IndexError(f'expected vector with length {len(values)}')
+        if _np is not None:
+            values += factor * _storage(other)
+            return self
+        for i, value in enumerate(other):
+            values[i] += factor * value
+        return self
+
+    def assign(self, other: "vector[T]") -> "vector[T]":
+        """Copies the values of other into this vector, reusing the buffer when lengths match."""
+        values = self._values
+        if len(values) == len(other):
+            source = _storage(other)
+            if _np is None and not isinstance(source, array):
+                source = array('d', source)
+            values[:] = source
+        else:
+            self._values = _copy(_storage(other))
+        return self
+
     def __eq__(self, other: "vector[T]") -> bool:
         if isinstance(other, vector) and self.length == other.length:
             for i in range(self.length):
@@ -72,43 +221,67 @@ class vector(MutableSequence[T], Generic[T]):
             return False
 
     def __str__(self) -> str:
-        return f'{self._values}'
+        return f'{self._values.tolist()}'
+
+    def __repr__(self) -> str:
+        return f'vector({self._values.tolist()})'
 
     def __float__(self) -> float:
-        if self.length == 1:
+        if len(self._values) == 1:
             return float(self._values[0])
         raise ValueError('float() argument must be a vector with one element')
 
     def __list__(self) -> list:
-        return self._values.copy()
+        return self._values.tolist()
 
     def __len__(self) -> int:
-        return self.length
+        return len(self._values)
 
     def append(self, value: T) -> None:
         if isinstance(value, (int, float)):
-            self._values.append(value)
-            self.length += 1
+            if _np is not None:
+                self._values = _np.append(self._values, value)
+            else:
+                self._values.append(value)
         else:
             raise TypeError(f"value to be added must be int or float not {type(value)}")
 
     def copy(self) -> "vector[T]":
-        return vector(self._values)
+        return vector.fromarray(_copy(self._values))
+
+    def tobytes(self) -> bytes:
+        """The float64 values as bytes, equal vectors give equal bytes."""
+        return self._values.tobytes()
 
     def norm(self) -> float:
+        if _np is not None:
+            return float(_np.linalg.norm(self._values))
         result = 0
-        for i in range(self.length):
-            result += self._values[i] ** 2
+        for value in self._values:
+            result += value ** 2
         return sqrt(result)
 
     def insert(self, index: SupportsIndex, value: T):
         if isinstance(value, (int, float)):
-            self._values.insert(index, value)
+            if _np is not None:
+                self._values = _np.insert(self._values, index, value)
+            else:
+                self._values.insert(index, value)
         else:
             raise TypeError(f"value to be inserted must be an integer or float not {type(value)}")
 
 
 class matrix(MutableSequence[T], Generic[T]):
+    """
+    Dense matrix of floating point numbers.\n
+    The python backend keeps the values in one flat row-major array('d'). A matrix can also be a view
+    into the storage of another matrix (see row(), col() and m[a:b, c:d]): such a view keeps an offset
+    of its first element and the row stride of the parent, so no values are copied.
+    The numpy backend keeps a 2-D ndarray, views are ndarray views.
+
+    """
+
+    __slots__ = ('_values', '_offset', '_stride', 'rows', 'cols')
 
     @overload
     def __init__(self, rows: SupportsIndex, cols: SupportsIndex):
@@ -120,48 +293,177 @@ class matrix(MutableSequence[T], Generic[T]):
 
     def __init__(self, *args: Union[list[list[T]], list[SupportsIndex, SupportsIndex]]):
         if len(args) == 1 and isinstance(args[0], list):
-            self._values = copy.deepcopy(args[0])
-            self.rows = len(self._values)
-            self.cols = len(self._values[0])
+            rows = len(args[0])
+            cols = len(args[0][0])
+            if any(len(row) != cols for row in args[0]):
+                raise ValueError("All rows must have the same length")
+            if _np is not None:
+                values = _np.array(args[0], dtype=float)
+            else:
+                values = array('d')
+                for row in args[0]:
+                    values.extend(row)
 
         elif len(args) == 2 and all(isinstance(x, SupportsIndex) for x in args):
-            self._values = [[0] * args[1] for _ in range(args[0])]
-            self.rows = args[0]
-            self.cols = args[1]
+            rows, cols = args
+            if _np is not None:
+                values = _np.zeros((rows, cols))
+            else:
+                values = array('d', bytes(8 * rows * cols))
         else:
             raise ValueError("Invalid values passed")
+        self._values = values
+        self._offset = 0
+        self._stride = cols
+        self.rows = rows
+        self.cols = cols
+
+    @classmethod
+    def fromarray(cls, values: array, rows: SupportsIndex, cols: SupportsIndex) -> "matrix":
+        """
+        Wraps a flat row-major array('d') (or a float64 ndarray for the numpy backend) without copying and
+        without validation. The matrix takes ownership of the buffer.
+
+        """
+        new_matrix = cls.__new__(cls)
+        if _np is not None:
+            values = values.reshape(rows, cols)
+        new_matrix._values = values
+        new_matrix._offset = 0
+        new_matrix._stride = cols
+        new_matrix.rows = rows
+        new_matrix.cols = cols
+        return new_matrix
+
+    def _position(self, i: SupportsIndex, j: SupportsIndex) -> int:
+        """Position of the element (i, j) in the flat storage of the python backend."""
+        if i < 0:
+            i += self.rows
+        if j < 0:
+            j += self.cols
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError("matrix index out of range")
+        return self._offset + i * self._stride + j
 
-    def __getitem__(self, pos: Union[tuple[SupportsIndex, SupportsIndex], SupportsIndex]) -> T:
+    def _rows(self) -> list:
+        """Rows as a list of views (memoryview or ndarray) into the storage."""
+        if _np is not None:
+            return list(self._values)
+        storage = memoryview(self._values)
+        offset, stride, cols = self._offset, self._stride, self.cols
+        return [storage[offset + i * stride:offset + i * stride + cols] for i in range(self.rows)]
+
+    def _flat(self) -> array:
+        """Contiguous row-major copy of the values (python backend)."""
+        if self._offset == 0 and self._stride == self.cols and len(self._values) == self.rows * self.cols:
+            return array('d', self._values)
+        values = array('d')
+        for row in self._rows():
+            values.frombytes(row.tobytes())
+        return values
+
+    def row(self, i: SupportsIndex) -> vector[T]:
+        """Row i as a vector of fixed length that shares storage with the matrix."""
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError("matrix row index out of range")
+        if _np is not None:
+            return vector.fromarray(self._values[i])
+        start = self._offset + i * self._stride
+        return vector.fromarray(memoryview(self._values)[start:start + self.cols])
+
+    def col(self, j: SupportsIndex) -> vector[T]:
+        """Column j as a strided vector of fixed length that shares storage with the matrix."""
+        if j < 0:
+            j += self.cols
+        if not 0 <= j < self.cols:
+            raise IndexError("matrix column index out of range")
+        if _np is not None:
+            return vector.fromarray(self._values[:, j])
+        start = self._offset + j
+        return vector.fromarray(memoryview(self._values)[start:start + self.rows * self._stride:self._stride])
+
+    def _submatrix(self, rows: slice, cols: slice) -> "matrix":
+        row_start, row_stop, row_step = rows.indices(self.rows)
+        col_start, col_stop, col_step = cols.indices(self.cols)
+        if row_step != 1 or col_step != 1:
+            raise ValueError("matrix slices must have step 1")
+        view = matrix.__new__(matrix)
+        view.rows = max(0, row_stop - row_start)
+        view.cols = max(0, col_stop - col_start)
+        if _np is not None:
+            view._values = self._values[rows, cols]
+            view._offset = 0
+            view._stride = view.cols
+        else:
+            view._values = self._values
+            view._offset = self._offset + row_start * self._stride + col_start
+            view._stride = self._stride
+        return view
+
+    def __getitem__(self, pos: Union[tuple[SupportsIndex, SupportsIndex], tuple[slice, slice], SupportsIndex]) -> T:
+        """m[i, j] is an element, m[i] is a row view (see row()), m[a:b, c:d] is a submatrix view."""
         if isinstance(pos, tuple):
-            return self._values[pos[0]][pos[1]]
+            i, j = pos
+            if isinstance(i, slice) and isinstance(j, slice):
+                return self._submatrix(i, j)
+            if _np is not None:
+                return self._values[i, j]
+            return self._values[self._position(i, j)]
         elif isinstance(pos, SupportsIndex):
-            return self._values[pos]
+            return self.row(pos)
         else:
             raise TypeError("index must be tuple of int or int")
 
-    def __setitem__(self, index: Union[tuple[SupportsIndex, SupportsIndex], SupportsIndex], value: T):
-        if isinstance(value, (int, float)):
-            if isinstance(index, tuple) and all(isinstance(i, SupportsIndex) for i in index):
-                self._values[index[0]][index[1]] = value
-            elif isinstance(index, SupportsIndex):
+    def __setitem__(self, index: Union[tuple[SupportsIndex, SupportsIndex], SupportsIndex], value: Union[T, list[T]]):
+        if isinstance(index, tuple) and all(isinstance(i, SupportsIndex) for i in index):
+            if not isinstance(value, (int, float)):
+                raise TypeError(f"value must be an integer or float not {type(value)}")
+            if _np is not None:
                 self._values[index] = value
             else:
-                raise TypeError(f"index must be tuple[SupportIndex, SupportIndex] not {type(index)}")
-        else: 
-            raise TypeError(f"value must be an integer or float not {type(value)}")
+                self._values[self._position(*index)] = float(value)
+        elif isinstance(index, SupportsIndex):
+            if isinstance(value, (int, float)) or len(value) != self.cols:
+                raise TypeError(f"row must be a sequence of {self.cols} numbers")
+            self.row(index).assign(value)
+        else:
+            raise TypeError(f"index must be tuple[SupportIndex, SupportIndex] not {type(index)}")
 
     def __delitem__(self, args: tuple[str, SupportsIndex]):
-        if args[0] == "row":
-            del self._values[args[1]]
-            self.rows -= 1
+        if _np is not None:
+            axis = {"row": 0, "col": 1}.get(args[0])
+            if axis is not None:
+                self._values = _np.delete(self._values, args[1], axis=axis)
+                self.rows, self.cols = self._values.shape
+                self._stride = self.cols
+        elif args[0] == "row":
+            rows = self._rows()
+            del rows[args[1]]
+            self._rebuild(rows, self.cols)
         elif args[0] == "col":
-            for i in range(self.rows):
-                del self._values[i][args[1]]
-            self.cols -= 1
+            j = args[1] + self.cols if args[1] < 0 else args[1]
+            self._rebuild([list(row[:j]) + list(row[j + 1:]) for row in self._rows()], self.cols - 1)
+
+    def _rebuild(self, rows: list, cols: int) -> None:
+        """Replaces the storage with a new contiguous array built from rows (python backend)."""
+        values = array('d')
+        for row in rows:
+            values.extend(row)
+        self._values = values
+        self._offset = 0
+        self._stride = cols
+        self.rows = len(rows)
+        self.cols = cols
 
     def __len__(self) -> int:
         return self.rows
 
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
     @overload
     def multiply(self, other: "matrix") -> "matrix":
         ...
@@ -175,114 +477,792 @@ class matrix(MutableSequence[T], Generic[T]):
             if self.cols != other.length:
                 raise IndexError(
                     f"The multiplier vector must have dimension ({self.cols}, ), but has ({other.length, })")
+            elif _np is not None:
+                return vector.fromarray(self._values @ other._values)
             else:
-                new_vector = vector(self.rows)
-                for i in range(new_vector.length):
-                    for j in range(self.cols):
-                        new_vector[i] += self._values[i][j] * other[j]
-                return new_vector
+                new_values = array('d', bytes(8 * self.rows))
+                for i, row in enumerate(self._rows()):
+                    total = 0
+                    for value, factor in zip(row, other):
+                        total += value * factor
+                    new_values[i] = total
+                return vector.fromarray(new_values)
         elif isinstance(other, matrix):
             if self.cols != other.rows:
                 raise IndexError(
                     f"The multiplier matrix must have dimension ({self.cols}, n), but has ({self.rows, self.cols})")
+            elif _np is not None:
+                return matrix.fromarray(self._values @ other._values, self.rows, other.cols)
             else:
-                new_matrix = matrix(self.rows, other.cols)
-                for i in range(new_matrix.rows):
-                    for j in range(new_matrix.cols):
-                        for k in range(self.cols):
-                            new_matrix[i, j] += self._values[i][k] * \
-                                other[k, j]
-                return new_matrix
+                return matrix.fromarray(self._multiply_rows(other), self.rows, other.cols)
         else:
             raise TypeError(
                 f"The multiplier must be vector or matrix not {type(other)}")
 
+    def _multiply_rows(self, other: "matrix") -> array:
+        """
+        Row-blocked product kernel. For every block of MULTIPLY_ROW_BLOCK rows of self,
+        each row k of other is read once and accumulated into all result rows of the block.
+
+        """
+        rows = self._rows()
+        other_rows = other._rows()
+        cols = other.cols
+        result = array('d', bytes(8 * self.rows * cols))
+        result_rows = matrix.fromarray(result, self.rows, cols)._rows()
+        for start in range(0, self.rows, MULTIPLY_ROW_BLOCK):
+            block = rows[start:start + MULTIPLY_ROW_BLOCK]
+            block_result = result_rows[start:start + MULTIPLY_ROW_BLOCK]
+            for k, other_row in enumerate(other_rows):
+                for row, result_row in zip(block, block_result):
+                    factor = row[k]
+                    if factor:
+                        for j, value in enumerate(other_row):
+                            result_row[j] += factor * value
+        return result
+
+    def tmultiply(self, other: vector[T]) -> vector[T]:
+        """Product of the transposed matrix and a vector without building the transposed matrix."""
+        if not isinstance(other, vector):
+            raise TypeError(f"The multiplier must be vector not {type(other)}")
+        if self.rows != other.length:
+            raise IndexError(
+                f"The multiplier vector must have dimension ({self.rows}, ), but has ({other.length, })")
+        if _np is not None:
+            return vector.fromarray(other._values @ self._values)
+        new_values = array('d', bytes(8 * self.cols))
+        for row, factor in zip(self._rows(), other):
+            if factor:
+                for j, value in enumerate(row):
+                    new_values[j] += value * factor
+        return vector.fromarray(new_values)
+
+    def gram(self) -> "matrix":
+        """
+        Gram matrix A^T A computed directly from the rows of A.
+        Only the upper triangle is accumulated, the lower one is filled by symmetry.
+
+        """
+        n = self.cols
+        if _np is not None:
+            return matrix.fromarray(self._values.T @ self._values, n, n)
+        gram_matrix = matrix(n, n)
+        gram_rows = gram_matrix._rows()
+        for row in self._rows():
+            for a in range(n):
+                factor = row[a]
+                if factor:
+                    gram_row = gram_rows[a]
+                    for b in range(a, n):
+                        gram_row[b] += factor * row[b]
+        for a in range(n):
+            for b in range(a):
+                gram_rows[a][b] = gram_rows[b][a]
+        return gram_matrix
+
+    def __imul__(self, factor: T) -> "matrix":
+        if not isinstance(factor, (int, float)):
+            raise TypeError("factor must be an integer or a float")
+        if _np is not None:
+            self._values *= factor
+            return self
+        for row in self._rows():
+            for j in range(len(row)):
+                row[j] *= factor
+        return self
+
+    def scale_rows(self, factors: vector[T]) -> "matrix":
+        """In-place product diag(factors) A: row i is multiplied by factors[i]."""
+        if len(factors) != self.rows:
+            raise IndexError(f"expected vector with length {self.rows}")
+        if _np is not None:
+            self._values *= _storage(factors)[:, None]
+            return self
+        for row, factor in zip(self._rows(), factors):
+            for j in range(len(row)):
+                row[j] *= factor
+        return self
+
+    def __iadd__(self, other: Union["matrix", "bandmatrix"]) -> "matrix":
+        """In-place sum with a matrix of the same shape, a band matrix is added as its dense copy."""
+        if isinstance(other, bandmatrix):
+            other = other.todense()
+        if not isinstance(other, matrix):
+            raise TypeError(f"The term must be matrix not {type(other)}")
+        if other.rows != self.rows or other.cols != self.cols:
+            raise IndexError(f"expected matrix with dimension ({self.rows}, {self.cols})")
+        if _np is not None:
+            self._values += other._values
+            return self
+        for row, other_row in zip(self._rows(), other._rows()):
+            for j, value in enumerate(other_row):
+                row[j] += value
+        return self
+
     def transpose(self) -> "matrix":
-        t_matrix = matrix(self.cols, self.rows)
-        for i in range(t_matrix.rows):
-            for j in range(t_matrix.cols):
-                t_matrix[i, j] = self[j, i]
-        return t_matrix
+        if _np is not None:
+            return matrix.fromarray(self._values.T.copy(), self.cols, self.rows)
+        values = array('d')
+        for j in range(self.cols):
+            values.frombytes(self.col(j)._values.tobytes())
+        return matrix.fromarray(values, self.cols, self.rows)
+
+    def lu(self) -> "LUDecomposition":
+        """LU factorization with partial pivoting"""
+        return LUDecomposition(self)
+
+    def cholesky(self) -> "CholeskyDecomposition":
+        """Cholesky factorization of a symmetric positive definite matrix"""
+        return CholeskyDecomposition(self)
+
+    def qr(self, workspace: "matrix" = None) -> "QRDecomposition":
+        """Householder QR factorization. workspace is an optional preallocated matrix of the same shape."""
+        return QRDecomposition(self, workspace)
 
     def inverse(self) -> 'matrix':
         """Inverse matrix by Gauss method"""
         if self.rows != self.cols:
             raise ValueError("Not a square matrix")
-        adh_matrix = self.copy()
-        add_values = [0] * adh_matrix.rows
-        for i in range(adh_matrix.rows):
-            add_values[i] = 1
-            adh_matrix.insert(1, adh_matrix.cols, add_values)
-            add_values[i] = 0
+        if _np is not None:
+            try:
+                return matrix.fromarray(_np.linalg.inv(self._values), self.rows, self.cols)
+            except _np.linalg.LinAlgError:
+                raise ValueError("Singular matrix") from None
+        n = self.rows
+        # augmented matrix [A | E], the inverse is returned as a view of its right half
+        adh_matrix = matrix(n, 2 * n)
+        adh_rows = adh_matrix._rows()
+        for i, row in enumerate(self._rows()):
+            adh_rows[i][:n] = row
+            adh_rows[i][n + i] = 1.0
 
         # forward trace
-        for k in range(self.rows):
+        for k in range(n):
             # 1) Swap k-row with one of the underlying if m[k, k] = 0
             nonzero_row = pick_nonzero_row(adh_matrix, k)
-            
+
             if adh_matrix.rows == nonzero_row:
                 raise ValueError("Singular matrix")
 
             if nonzero_row != k:
-                adh_matrix[k], adh_matrix[nonzero_row] = adh_matrix[nonzero_row], adh_matrix[k]
+                swapped_row = array('d', adh_rows[k])
+                adh_rows[k][:] = adh_rows[nonzero_row]
+                adh_rows[nonzero_row][:] = swapped_row
 
             # 2) Make diagonal element equals to 1
-            if adh_matrix[k, k] != 1:
-                divider = adh_matrix[k, k]
-                for col in range(k, adh_matrix.cols):
-                    adh_matrix[k, col] *= 1 / divider
+            row_k = adh_rows[k]
+            if row_k[k] != 1:
+                divider = row_k[k]
+                for col in range(k, 2 * n):
+                    row_k[col] *= 1 / divider
 
             # 3) Make all underlying elements in column equal to zero
-            for row in range(k+1, adh_matrix.rows):
-                multiplier = adh_matrix[row, k]
-                for col in range(adh_matrix.cols):
-                    adh_matrix[row, col] -= adh_matrix[k, col] * multiplier
+            for row in range(k+1, n):
+                row_values = adh_rows[row]
+                multiplier = row_values[k]
+                for col in range(2 * n):
+                    row_values[col] -= row_k[col] * multiplier
 
         # backward trace
-        for k in range(adh_matrix.rows - 1, 0, -1):
+        for k in range(n - 1, 0, -1):
+            row_k = adh_rows[k]
             for row in range(k - 1, -1, -1):
-                if adh_matrix[row, k]:
-                    multiplier = adh_matrix[row, k]
-                    for col in range(k, adh_matrix.cols):
-                        adh_matrix[row, col] -= adh_matrix[k, col] * multiplier
+                row_values = adh_rows[row]
+                if row_values[k]:
+                    multiplier = row_values[k]
+                    for col in range(k, 2 * n):
+                        row_values[col] -= row_k[col] * multiplier
 
-        for _ in range(self.cols):
-            del adh_matrix['col', 0]
-        return adh_matrix
+        return adh_matrix[:, n:]
 
     def __str__(self) -> str:
-        result_str = "["
-        for i in range(self.rows - 1):
-            result_str += f"{self._values[i]}\n "
-        result_str += f"{self._values[i+1]}]"
-        return result_str
-    
+        return "[" + "\n ".join(f"{row}" for row in self.__list__()) + "]"
+
     def __list__(self) -> list:
-        return copy.deepcopy(self._values)
+        if _np is not None:
+            return self._values.tolist()
+        return [row.tolist() for row in self._rows()]
 
     def copy(self) -> 'matrix':
-        return matrix(self._values)
+        """Contiguous copy of the matrix, a copy of a view does not share storage with its parent."""
+        if _np is not None:
+            return matrix.fromarray(self._values.copy(), self.rows, self.cols)
+        return matrix.fromarray(self._flat(), self.rows, self.cols)
 
     def insert(self, dimension: SupportsIndex, index: SupportsIndex, values: list[T]):
         if dimension == 0:
             if len(values) == self.cols:
-                self._values.insert(index, values)
-                self.rows = len(self._values)
+                if _np is not None:
+                    self._values = _np.insert(self._values, index, values, axis=0)
+                    self.rows = self._values.shape[0]
+                    return
+                rows = self._rows()
+                rows.insert(index, values)
+                self._rebuild(rows, self.cols)
             else:
                 raise ValueError(
                     "The size of the row to be inserted is greater than the size of the matrix rows")
         elif dimension == 1:
             if len(values) == self.rows:
-                for row in range(self.rows):
-                    self._values[row].insert(index, values[row])
-                self.cols = len(self._values[0])
+                if _np is not None:
+                    self._values = _np.insert(self._values, index, values, axis=1)
+                    self.cols = self._stride = self._values.shape[1]
+                    return
+                rows = [row.tolist() for row in self._rows()]
+                for row, value in zip(rows, values):
+                    row.insert(index, value)
+                self._rebuild(rows, self.cols + 1)
             else:
                 raise ValueError(
                     "The size of column to be inserted is greater than the size of the matrix columns")
 
 
+class LUDecomposition:
+    """
+    LU factorization PA = LU with partial pivoting.\n
+    L (unit lower triangular) and U are stored together in one n x n table,
+    the row permutation is stored as a list of row indices.
+
+    """
+
+    __slots__ = ('_lu', '_perm', 'size')
+
+    def __init__(self, m: matrix) -> None:
+        if m.rows != m.cols:
+            raise ValueError("Not a square matrix")
+        n = m.rows
+        lu = [[float(value) for value in m[i]] for i in range(n)]
+        perm = list(range(n))
+        for k in range(n):
+            pivot_row = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if not lu[pivot_row][k]:
+                raise ValueError("Singular matrix")
+            if pivot_row != k:
+                lu[k], lu[pivot_row] = lu[pivot_row], lu[k]
+                perm[k], perm[pivot_row] = perm[pivot_row], perm[k]
+            row_k = lu[k]
+            pivot = row_k[k]
+            for i in range(k + 1, n):
+                row_i = lu[i]
+                multiplier = row_i[k] / pivot
+                row_i[k] = multiplier
+                if multiplier:
+                    for j in range(k + 1, n):
+                        row_i[j] -= multiplier * row_k[j]
+        self._lu = lu
+        self._perm = perm
+        self.size = n
+
+    def _solve_vector(self, b) -> vector:
+        lu = self._lu
+        n = self.size
+        x = array('d', [b[p] for p in self._perm])
+        # forward substitution with unit lower triangular L
+        for i in range(1, n):
+            row = lu[i]
+            total = x[i]
+            for j in range(i):
+                total -= row[j] * x[j]
+            x[i] = total
+        # backward substitution with U
+        for i in range(n - 1, -1, -1):
+            row = lu[i]
+            total = x[i]
+            for j in range(i + 1, n):
+                total -= row[j] * x[j]
+            x[i] = total / row[i]
+        return _wrap(x)
+
+    def solve(self, b: Union[vector, matrix]) -> Union[vector, matrix]:
+        """Solves Ax = b. b can be a vector or a matrix of several right-hand sides (columns)."""
+        return _solve(self, b)
+
+
+class CholeskyDecomposition:
+    """
+    Cholesky factorization A = LL^T of a symmetric positive definite matrix.\n
+    Only the lower triangle of A is read.
+
+    """
+
+    __slots__ = ('_l', 'size')
+
+    def __init__(self, m: matrix) -> None:
+        if m.rows != m.cols:
+            raise ValueError("Not a square matrix")
+        n = m.rows
+        l = [[0.0] * n for _ in range(n)]
+        for j in range(n):
+            row_j = l[j]
+            diagonal = m[j, j] - sum(value * value for value in row_j[:j])
+            if diagonal <= 0:
+                raise ValueError("Matrix is not positive definite")
+            diagonal = sqrt(diagonal)
+            row_j[j] = diagonal
+            for i in range(j + 1, n):
+                row_i = l[i]
+                total = m[i, j]
+                for k in range(j):
+                    total -= row_i[k] * row_j[k]
+                row_i[j] = total / diagonal
+        self._l = l
+        self.size = n
+
+    def _solve_vector(self, b) -> vector:
+        l = self._l
+        n = self.size
+        x = array('d', b)
+        # forward substitution with L
+        for i in range(n):
+            row = l[i]
+            total = x[i]
+            for j in range(i):
+                total -= row[j] * x[j]
+            x[i] = total / row[i]
+        # backward substitution with L^T
+        for i in range(n - 1, -1, -1):
+            total = x[i]
+            for j in range(i + 1, n):
+                total -= l[j][i] * x[j]
+            x[i] = total / l[i][i]
+        return _wrap(x)
+
+    def solve(self, b: Union[vector, matrix]) -> Union[vector, matrix]:
+        """Solves Ax = b. b can be a vector or a matrix of several right-hand sides (columns)."""
+        return _solve(self, b)
+
+
+class QRDecomposition:
+    """
+    Householder QR factorization A = QR of a matrix with rows >= cols.\n
+    R is kept in the upper triangle of the working copy of A, the Householder vectors below the diagonal.
+    The working copy can be a preallocated workspace matrix that is reused between factorizations.
+
+    """
+
+    __slots__ = ('_qr', '_v0', '_beta', 'rows', 'cols')
+
+    def __init__(self, m: matrix, workspace: matrix = None) -> None:
+        rows, cols = m.rows, m.cols
+        if rows < cols:
+            raise ValueError("The number of rows must not be less than the number of columns")
+        if workspace is None:
+            workspace = matrix(rows, cols)
+        elif workspace.rows != rows or workspace.cols != cols:
+            raise ValueError(f"workspace must have dimension ({rows}, {cols}), but has ({workspace.rows}, {workspace.cols})")
+        a = workspace._rows()
+        if m is not workspace:
+            for work_row, row in zip(a, m._rows()):
+                work_row[:] = row
+        v0 = array('d', bytes(8 * cols))
+        beta = array('d', bytes(8 * cols))
+        for k in range(cols):
+            norm_x = 0
+            for i in range(k, rows):
+                norm_x += a[i][k] ** 2
+            norm_x = sqrt(norm_x)
+            if not norm_x:
+                continue
+            alpha = -norm_x if a[k][k] >= 0 else norm_x
+            first = a[k][k] - alpha
+            beta[k] = 1 / (norm_x * (norm_x + abs(a[k][k])))
+            v0[k] = first
+            # apply the reflection I - beta v v^T to the remaining columns
+            for j in range(k + 1, cols):
+                total = first * a[k][j]
+                for i in range(k + 1, rows):
+                    total += a[i][k] * a[i][j]
+                total *= beta[k]
+                a[k][j] -= total * first
+                for i in range(k + 1, rows):
+                    a[i][j] -= total * a[i][k]
+            a[k][k] = alpha
+        self._qr = a
+        self._v0 = v0
+        self._beta = beta
+        self.rows = rows
+        self.cols = cols
+
+    def solve(self, b: vector[T]) -> vector[T]:
+        """Least squares solution x minimizing ||Ax - b||."""
+        if b.length != self.rows:
+            raise IndexError(f"The right-hand side must have dimension ({self.rows}, ), but has ({b.length}, )")
+        a, v0, beta = self._qr, self._v0, self._beta
+        y = array('d', b)
+        # y = Q^T b
+        for k in range(self.cols):
+            if not beta[k]:
+                continue
+            total = v0[k] * y[k]
+            for i in range(k + 1, self.rows):
+                total += a[i][k] * y[i]
+            total *= beta[k]
+            y[k] -= total * v0[k]
+            for i in range(k + 1, self.rows):
+                y[i] -= total * a[i][k]
+        # backward substitution with R, diagonal entries at rounding level mean linearly dependent columns
+        tolerance = max(self.rows, self.cols) * float_info.epsilon * max((abs(a[i][i]) for i in range(self.cols)), default=0)
+        x = array('d', bytes(8 * self.cols))
+        for i in range(self.cols - 1, -1, -1):
+            row = a[i]
+            if abs(row[i]) <= tolerance:
+                raise ValueError("Rank deficient matrix")
+            total = y[i]
+            for j in range(i + 1, self.cols):
+                total -= row[j] * x[j]
+            x[i] = total / row[i]
+        return _wrap(x)
+
+
+def lstsq(a: Union[matrix, "sparsematrix"], b: vector[T], workspace: matrix = None) -> vector[T]:
+    """
+    Least squares solution x minimizing ||Ax - b|| by Householder QR.
+    It does not form A^T A, so the condition number is not squared.
+    workspace is an optional preallocated matrix of the shape of A, it is overwritten.
+    With the NumPy backend the dense A is solved by numpy.linalg.lstsq, which allocates its own
+    LAPACK work arrays on every call: the workspace only receives a sparse A and is checked for its shape.
+
+    """
+    if isinstance(a, sparsematrix):
+        # the rows are scattered straight into the workspace, no dense copy of A is allocated
+        a = a.scatter(matrix(a.rows, a.cols) if workspace is None else workspace)
+        workspace = a
+    if _np is not None:
+        if a.rows < a.cols:
+            raise ValueError("The number of rows must not be less than the number of columns")
+        if workspace is not None and (workspace.rows != a.rows or workspace.cols != a.cols):
+            raise ValueError(f"workspace must have dimension ({a.rows}, {a.cols}), but has ({workspace.rows}, {workspace.cols})")
+        solution, _, rank, _ = _np.linalg.lstsq(a._values, _storage(b), rcond=None)
+        if rank < a.cols:
+            raise ValueError("Rank deficient matrix")
+        return vector.fromarray(solution)
+    return QRDecomposition(a, workspace).solve(b)
+
+
+class sparsematrix:
+    """
+    Sparse matrix in compressed sparse row (CSR) format.\n
+    Rows are appended one at a time as (column indices, values) of their non-zero entries.
+
+    """
+
+    __slots__ = ('rows', 'cols', '_indptr', '_indices', '_data')
+
+    def __init__(self, cols: SupportsIndex) -> None:
+        self.rows = 0
+        self.cols = cols
+        self._indptr = array('q', [0])
+        self._indices = array('q')
+        self._data = array('d')
+
+    def append(self, indices: list[int], values: Union[list[T], vector[T]]) -> None:
+        """Appends a row given by the column indices and values of its non-zero entries."""
+        if len(indices) != len(values):
+            raise ValueError("The number of indices must be equal to the number of values")
+        for index in indices:
+            if not 0 <= index < self.cols:
+                raise IndexError(f"column index must be in range [0, {self.cols}), but {index}")
+        self._indices.extend(indices)
+        self._data.extend(values)
+        self._indptr.append(len(self._indices))
+        self.rows += 1
+
+    def row(self, i: SupportsIndex) -> tuple[array, array]:
+        """Returns column indices and values of the non-zero entries of the row."""
+        start, end = self._indptr[i], self._indptr[i + 1]
+        return self._indices[start:end], self._data[start:end]
+
+    def __getitem__(self, pos: tuple[SupportsIndex, SupportsIndex]) -> float:
+        i, j = pos
+        start, end = self._indptr[i], self._indptr[i + 1]
+        for k in range(start, end):
+            if self._indices[k] == j:
+                return self._data[k]
+        return 0.0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __list__(self) -> list:
+        return self.todense().__list__()
+
+    def copy(self) -> "sparsematrix":
+        new_matrix = sparsematrix(self.cols)
+        new_matrix.rows = self.rows
+        new_matrix._indptr = array('q', self._indptr)
+        new_matrix._indices = array('q', self._indices)
+        new_matrix._data = array('d', self._data)
+        return new_matrix
+
+    def todense(self) -> matrix:
+        return self.scatter(matrix(self.rows, self.cols))
+
+    def scatter(self, out: matrix) -> matrix:
+        """Writes the values into the dense matrix out of the same shape and returns it, nothing is allocated."""
+        if out.rows != self.rows or out.cols != self.cols:
+            raise ValueError(f"out must have dimension ({self.rows}, {self.cols}), but has ({out.rows}, {out.cols})")
+        indptr, indices, data = self._indptr, self._indices, self._data
+        zeros = 0.0 if _np is not None else array('d', bytes(8 * self.cols))
+        for i, row in enumerate(out._rows()):
+            row[:] = zeros
+            for k in range(indptr[i], indptr[i + 1]):
+                row[indices[k]] = data[k]
+        return out
+
+    def multiply(self, other: vector[T]) -> vector[T]:
+        if not isinstance(other, vector):
+            raise TypeError(f"The multiplier must be vector not {type(other)}")
+        if self.cols != other.length:
+            raise IndexError(
+                f"The multiplier vector must have dimension ({self.cols}, ), but has ({other.length, })")
+        indptr, indices, data = self._indptr, self._indices, self._data
+        new_values = array('d', bytes(8 * self.rows))
+        for i in range(self.rows):
+            total = 0
+            for k in range(indptr[i], indptr[i + 1]):
+                total += data[k] * other[indices[k]]
+            new_values[i] = total
+        return _wrap(new_values)
+
+    def tmultiply(self, other: vector[T]) -> vector[T]:
+        """Product of the transposed matrix and a vector without building the transposed matrix."""
+        if not isinstance(other, vector):
+            raise TypeError(f"The multiplier must be vector not {type(other)}")
+        if self.rows != other.length:
+            raise IndexError(
+                f"The multiplier vector must have dimension ({self.rows}, ), but has ({other.length, })")
+        indptr, indices, data = self._indptr, self._indices, self._data
+        new_values = array('d', bytes(8 * self.cols))
+        for i, factor in enumerate(other):
+            if factor:
+                for k in range(indptr[i], indptr[i + 1]):
+                    new_values[indices[k]] += data[k] * factor
+        return _wrap(new_values)
+
+    def __imul__(self, factor: T) -> "sparsematrix":
+        if not isinstance(factor, (int, float)):
+            raise TypeError("factor must be an integer or a float")
+        data = self._data
+        for k in range(len(data)):
+            data[k] *= factor
+        return self
+
+    def scale_rows(self, factors: vector[T]) -> "sparsematrix":
+        """In-place product diag(factors) A: row i is multiplied by factors[i]."""
+        if len(factors) != self.rows:
+            raise IndexError(f"expected vector with length {self.rows}")
+        indptr, data = self._indptr, self._data
+        for i, factor in enumerate(factors):
+            for k in range(indptr[i], indptr[i + 1]):
+                data[k] *= factor
+        return self
+
+    def bandwidth(self) -> int:
+        """The largest distance between column indices of non-zero entries in one row."""
+        indptr, indices = self._indptr, self._indices
+        width = 0
+        for i in range(self.rows):
+            start, end = indptr[i], indptr[i + 1]
+            if end > start:
+                row_indices = indices[start:end]
+                width = max(width, max(row_indices) - min(row_indices))
+        return width
+
+    def gram(self) -> "bandmatrix":
+        """
+        Gram matrix A^T A assembled directly into symmetric band storage.
+        Its bandwidth is the largest column distance within one row of A.
+
+        """
+        indptr, indices, data = self._indptr, self._indices, self._data
+        gram_matrix = bandmatrix(self.cols, self.bandwidth())
+        band = gram_matrix._values
+        width = gram_matrix.bandwidth
+        for i in range(self.rows):
+            start, end = indptr[i], indptr[i + 1]
+            for a in range(start, end):
+                index_a, value_a = indices[a], data[a]
+                band_row = band[index_a]
+                for b in range(start, end):
+                    index_b = indices[b]
+                    if index_b <= index_a:
+                        band_row[index_b - index_a + width] += value_a * data[b]
+        return gram_matrix
+
+
+class bandmatrix:
+    """
+    Symmetric band matrix. Only the diagonal and bandwidth subdiagonals are stored:
+    row i keeps the entries A[i, i - bandwidth], ..., A[i, i].
+
+    """
+
+    __slots__ = ('rows', 'cols', 'bandwidth', '_values')
+
+    def __init__(self, n: SupportsIndex, bandwidth: SupportsIndex) -> None:
+        self.rows = n
+        self.cols = n
+        self.bandwidth = bandwidth
+        self._values = [[0.0] * (bandwidth + 1) for _ in range(n)]
+
+    def __getitem__(self, pos: tuple[SupportsIndex, SupportsIndex]) -> float:
+        i, j = pos
+        if j > i:
+            i, j = j, i
+        if i - j > self.bandwidth:
+            return 0.0
+        return self._values[i][j - i + self.bandwidth]
+
+    def __setitem__(self, pos: tuple[SupportsIndex, SupportsIndex], value: T) -> None:
+        i, j = pos
+        if j > i:
+            i, j = j, i
+        if i - j > self.bandwidth:
+            raise IndexError(f"element ({i}, {j}) lies outside the band of width {self.bandwidth}")
+        self._values[i][j - i + self.bandwidth] = value
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iadd__(self, other: "bandmatrix") -> "bandmatrix":
+        """In-place sum with a band matrix of the same size and a bandwidth not larger than this one."""
+        if not isinstance(other, bandmatrix):
+            raise TypeError(f"The term must be bandmatrix not {type(other)}")
+        if other.rows != self.rows:
+            raise IndexError(f"expected band matrix with dimension ({self.rows}, {self.cols})")
+        if other.bandwidth > self.bandwidth:
+            raise ValueError(f"The bandwidth of the term {other.bandwidth} exceeds {self.bandwidth}")
+        shift = self.bandwidth - other.bandwidth
+        for row, other_row in zip(self._values, other._values):
+            for k, value in enumerate(other_row):
+                row[k + shift] += value
+        return self
+
+    def todense(self) -> matrix:
+        dense = matrix(self.rows, self.cols)
+        for i in range(self.rows):
+            for j in range(max(0, i - self.bandwidth), i + 1):
+                dense[i, j] = dense[j, i] = self[i, j]
+        return dense
+
+    def cholesky(self) -> "BandCholeskyDecomposition":
+        """Cholesky factorization in band storage, O(n * bandwidth^2)"""
+        return BandCholeskyDecomposition(self)
+
+    def lu(self) -> LUDecomposition:
+        """LU factorization with partial pivoting of the dense copy of the matrix"""
+        return self.todense().lu()
+
+
+class BandCholeskyDecomposition:
+    """
+    Cholesky factorization A = LL^T of a symmetric positive definite band matrix.\n
+    L has the same bandwidth as A and is kept in the same band storage.
+
+    """
+
+    __slots__ = ('_l', 'bandwidth', 'size')
+
+    def __init__(self, m: bandmatrix) -> None:
+        n, width = m.rows, m.bandwidth
+        a = m._values
+        l = [[0.0] * (width + 1) for _ in range(n)]
+        for j in range(n):
+            row_j = l[j]
+            first = max(0, j - width)
+            diagonal = a[j][width]
+            for k in range(first, j):
+                value = row_j[k - j + width]
+                diagonal -= value * value
+            if diagonal <= 0:
+                raise ValueError("Matrix is not positive definite")
+            diagonal = sqrt(diagonal)
+            row_j[width] = diagonal
+            for i in range(j + 1, min(n, j + width + 1)):
+                row_i = l[i]
+                total = a[i][j - i + width]
+                for k in range(max(0, i - width), j):
+                    total -= row_i[k - i + width] * row_j[k - j + width]
+                row_i[j - i + width] = total / diagonal
+        self._l = l
+        self.bandwidth = width
+        self.size = n
+
+    def _solve_vector(self, b) -> vector:
+        l, width, n = self._l, self.bandwidth, self.size
+        x = array('d', b)
+        # forward substitution with L
+        for i in range(n):
+            row = l[i]
+            total = x[i]
+            for k in range(max(0, i - width), i):
+                total -= row[k - i + width] * x[k]
+            x[i] = total / row[width]
+        # backward substitution with L^T
+        for i in range(n - 1, -1, -1):
+            total = x[i]
+            for k in range(i + 1, min(n, i + width + 1)):
+                total -= l[k][i - k + width] * x[k]
+            x[i] = total / l[i][width]
+        return _wrap(x)
+
+    def solve(self, b: Union[vector, matrix]) -> Union[vector, matrix]:
+        """Solves Ax = b. b can be a vector or a matrix of several right-hand sides (columns)."""
+        return _solve(self, b)
+
+
+def _solve(factorization: Union[LUDecomposition, CholeskyDecomposition, BandCholeskyDecomposition],
+           b: Union[vector, matrix]) -> Union[vector, matrix]:
+    if isinstance(b, vector):
+        if b.length != factorization.size:
+            raise IndexError(f"The right-hand side must have dimension ({factorization.size}, ), but has ({b.length}, )")
+        return factorization._solve_vector(b)
+    elif isinstance(b, matrix):
+        if b.rows != factorization.size:
+            raise IndexError(f"The right-hand side must have dimension ({factorization.size}, n), but has ({b.rows}, {b.cols})")
+        result = matrix(b.rows, b.cols)
+        for j in range(b.cols):
+            column = factorization._solve_vector([b[i, j] for i in range(b.rows)])
+            for i in range(b.rows):
+                result[i, j] = column[i]
+        return result
+    else:
+        raise TypeError(f"The right-hand side must be vector or matrix not {type(b)}")
+
+
+def _zeros(n: int):
+    if _np is not None:
+        return _np.zeros(n)
+    return array('d', bytes(8 * n))
+
+
+def _copy(values):
+    if _np is not None:
+        return _np.array(values, dtype=float)
+    if isinstance(values, memoryview):
+        return array('d', values.tobytes())
+    return array('d', values)
+
+
+def _wrap(values: array) -> vector:
+    """Wraps the array('d') result of a pure Python kernel into a vector of the current backend."""
+    if _np is not None:
+        return vector.fromarray(_np.array(values, dtype=float))
+    return vector.fromarray(values)
+
+
+def _storage(values):
+    """Returns the underlying buffer of a vector, other sequences are returned as is."""
+    if isinstance(values, vector):
+        return values._values
+    return values
+
+
 def pick_nonzero_row(m: "matrix", k: SupportsIndex):
     j = k
     while j < m.rows and not m[j, k]:
         j += 1
     return j
+
+
+set_backend(os.environ.get(BACKEND_ENVIRONMENT_VARIABLE, "python"))
@@ -25,10 +25,11 @@ class ConjugateGradientMethod(Optimizer):
         lambda1 = a + GOLDEN_SECTION_RATIO_1 * (b - a)
         lambda2 = a + GOLDEN_SECTION_RATIO_2 * (b - a)
 
+        probe = parameters.copy()
         funcValue1 = objective.value(
-            function.bind(parameters + lambda1 * gradient))
+            function.bind(probe.assign(parameters).axpy(lambda1, gradient), copy=False))
         funcValue2 = objective.value(
-            function.bind(parameters + lambda2 * gradient))
+            function.bind(probe.assign(parameters).axpy(lambda2, gradient), copy=False))
 
         while b-a > GOLDEN_SECTION_MIN:
             if funcValue1 < funcValue2:
@@ -37,14 +38,14 @@ class ConjugateGradientMethod(Optimizer):
                 lambda1 = a + GOLDEN_SECTION_RATIO_1 * (b - a)
                 funcValue2 = funcValue1
                 funcValue1 = objective.value(
-                    function.bind(parameters + lambda1 * gradient))
+                    function.bind(probe.assign(parameters).axpy(lambda1, gradient), copy=False))
             else:
                 a = lambda1
                 lambda1 = lambda2
                 lambda2 = a + GOLDEN_SECTION_RATIO_2 * (b - a)
                 funcValue1 = funcValue2
                 funcValue2 = objective.value(
-                    function.bind(parameters + lambda2 * gradient))
+                    function.bind(probe.assign(parameters).axpy(lambda2, gradient), copy=False))
         return (a + b) / 2
 
     @classmethod
@@ -62,21 +63,22 @@ class ConjugateGradientMethod(Optimizer):
             raise TypeError(
                 "Unable to use this functional. The functional must implement the abstract class DifferentiableFunctional")
         result_parameters = initial_parameters.copy()
+        parameters = initial_parameters.copy()
         while True:
-            grad0 = objective.gradient(function.bind(initial_parameters))
+            grad0 = objective.gradient(function.bind(initial_parameters, copy=False))
             s0 = -grad0
             k = 0
             while True:
-                parameters = result_parameters.copy()
+                parameters.assign(result_parameters)
                 lamb = self.goldenSectionMethod(objective, function, parameters, s0)
-                result_parameters = parameters + lamb * s0
-                grad1 = objective.gradient(function.bind(result_parameters))
+                result_parameters.axpy(lamb, s0)
+                value, grad1 = objective.value_and_gradient(function.bind(result_parameters, copy=False))
                 omega = (grad1.norm() / grad0.norm()) ** 2
-                s1 = -grad1 + omega * s0
-                s0 = s1.copy()
-                grad0 = grad1.copy()
+                s0 *= omega
+                s0 -= grad1
+                grad0 = grad1
                 k += 1
-                if objective.value(function) < FUNCIONAL_MIN_VALUE or \
+                if value < FUNCIONAL_MIN_VALUE or \
                     (result_parameters - parameters).norm() < NORM_MIN_VALUE or \
                         k > K_MAX_ITERATIONS:
                     break
@@ -86,4 +88,5 @@ class ConjugateGradientMethod(Optimizer):
                                      minimum_parameters, maximum_parameters)
             else:
                 break
-        return result_parameters
+        # the function is bound to result_parameters without a copy, the caller gets its own vector
+        return result_parameters.copy()
@@ -1,16 +1,32 @@
+from typing import Union
 from functionals.functional import Functional, LeastSquaresFunctional
 from functions.abcfunction import Function
-from mathtypes.linalg import vector
+from mathtypes.linalg import vector, matrix, bandmatrix, sparsematrix, lstsq
 from optimizers.abcoptimizer import Optimizer
 
+SOLVERS = ("normal", "qr")
+
 
 class GaussNewtonMethod(Optimizer):
     """
     Gauss Newton algorithm.\n
-    The minimizing functional must implement the calculation of the risiduals and jacobian.
+    The minimizing functional must implement the calculation of the risiduals and jacobian.\n
+    The step is found by solving the normal equations (solver="normal", default)
+    or by Householder QR least squares (solver="qr"), which is slower but does not square the condition number.
+    iterations is the number of steps, the number of parameters by default; reweighted functionals (IRLS)
+    need more of them.
     
     """
-    
+
+    def __init__(self, solver: str = "normal", iterations: int = None) -> None:
+        if solver not in SOLVERS:
+            raise ValueError(f"solver must be one of {SOLVERS} not {solver!r}")
+        if iterations is not None and iterations < 1:
+            raise ValueError(f"iterations must be positive, but {iterations}")
+        self.solver = solver
+        self.iterations = iterations
+        self._workspace = None
+
     @classmethod
     def checkBorder(cls, parameters: vector, minimum_parameters: vector, maximum_parameters: vector):
         """Out of bounds is checked, if the value is out of bounds, then it is changed to the boundary value."""
@@ -20,6 +36,21 @@ class GaussNewtonMethod(Optimizer):
             elif parameters[i] > maximum_parameters[i]:
                 parameters[i] = maximum_parameters[i]
 
+    @classmethod
+    def solveNormalEquations(cls, normal_matrix: Union[matrix, bandmatrix], right_side: vector) -> vector:
+        """Solves (J^T J) x = J^T r by Cholesky factorization, LU with pivoting is used if J^T J is not positive definite."""
+        try:
+            factorization = normal_matrix.cholesky()
+        except ValueError:
+            factorization = normal_matrix.lu()
+        return factorization.solve(right_side)
+
+    def solveLeastSquares(self, jacobian: Union[matrix, sparsematrix], residuals: vector) -> vector:
+        """Solves J x = r in the least squares sense by QR, reusing the workspace between iterations."""
+        if self._workspace is None or self._workspace.rows != jacobian.rows or self._workspace.cols != jacobian.cols:
+            self._workspace = matrix(jacobian.rows, jacobian.cols)
+        return lstsq(jacobian, residuals, self._workspace)
+
     def minimize(self, objective: Functional, function: Function, initial_parameters: vector,
                  minimum_parameters: vector = None, maximum_parameters: vector = None) -> vector:
         if not isinstance(objective, LeastSquaresFunctional):
@@ -27,17 +58,17 @@ class GaussNewtonMethod(Optimizer):
                 "Unable to use this functional. The functional must implement the abstract class LeastSquaresFunctional")
         parameters = initial_parameters.copy()
         result_parameters = initial_parameters.copy()
-        y1 = objective.value(function.bind(parameters))
-        for _ in range(result_parameters.length):
-            binded_function = function.bind(parameters)
-            jacobian = objective.jacobian(binded_function)
-            jac_transposed = jacobian.transpose()
-            residuals = objective.residual(binded_function)
-            parameters -= jac_transposed.multiply(jacobian).inverse().multiply(
-                jac_transposed).multiply(residuals)
+        y1 = objective.value(function.bind(parameters, copy=False))
+        for _ in range(self.iterations or result_parameters.length):
+            binded_function = function.bind(parameters, copy=False)
+            if self.solver == "qr":
+                parameters -= self.solveLeastSquares(
+                    objective.jacobian(binded_function), objective.residual(binded_function))
+            else:
+                parameters -= self.solveNormalEquations(*objective.normal_equations(binded_function))
             if minimum_parameters and maximum_parameters:
                 self.checkBorder(parameters, minimum_parameters, maximum_parameters)
-            y2 = objective.value(function.bind(parameters))
+            y2 = objective.value(function.bind(parameters, copy=False))
             if y1 > y2:
                 result_parameters = parameters.copy()
                 y1 = y2
@@ -0,0 +1,136 @@
+from functionals.functional import Functional
+from functionals.linf import LInf
+from functions.abcfunction import DifferentiableFunction, Function, LinearInParameters
+from functions.bound import BoundFunction
+from mathtypes.linalg import vector, sparsematrix
+from optimizers.abcoptimizer import Optimizer
+
+SIMPLEX_TOLERANCE = 1e-9
+DEGENERATE_PIVOTS = 50
+
+
+class MinimaxMethod(Optimizer):
+    """
+    Exact minimization of the LInf functional (Chebyshev fitting) by linear programming.\n
+    The function must be linear in its parameters (LinearInParameters: linear function, polynomial, splines),
+    then the values are G p + c with the gradients G at the points, and min_p max_i |f_i - value_i| is the
+    linear program min t subject to -t <= f_i - value_i <= t. It is solved by the dense simplex method on its dual
+    max sum (f_i - c_i)(u_i - v_i) subject to sum g_i (u_i - v_i) = 0, sum (u_i + v_i) = 1, u, v >= 0,
+    which has only n + 1 rows for n parameters: a basis is a reference set of n + 1 points, as in the Remez exchange.
+    The bounds lo <= p <= hi are constraints of the program: they add the columns -e_j with the cost -hi_j
+    and e_j with the cost lo_j to the dual, so the result is the minimax optimum within the bounds.
+    The parameters and the minimax error are the simplex multipliers of the optimal basis.
+    The largest reduced cost enters the basis; after DEGENERATE_PIVOTS pivots without progress
+    the smallest index is taken (Bland's rule), which excludes cycling.
+
+    """
+
+    def minimize(self, objective: Functional, function: Function, initial_parameters: vector,
+                 minimum_parameters: vector = None, maximum_parameters: vector = None) -> vector:
+        if not isinstance(objective, LInf):
+            raise TypeError("Unable to use this functional. The minimax method minimizes the LInf functional")
+        parent = function.function if isinstance(function, BoundFunction) else function
+        if not isinstance(function, DifferentiableFunction) or not isinstance(parent, LinearInParameters):
+            raise TypeError("Unable to use this function. The function must be linear in its parameters (LinearInParameters)")
+        for bound in (minimum_parameters, maximum_parameters):
+            if bound is not None and bound.length != initial_parameters.length:
+                raise ValueError(f"The bounds must have length {initial_parameters.length}, but {bound.length}")
+        if minimum_parameters is not None and maximum_parameters is not None and \
+                any(low > high for low, high in zip(minimum_parameters, maximum_parameters)):
+            raise ValueError("The minimum parameters must not exceed the maximum parameters")
+        function = function.bind(initial_parameters)
+        gradients = function.gradient_batch(objective.x)
+        if isinstance(gradients, sparsematrix):
+            gradients = gradients.todense()
+        # the values are G p + c, c is zero for the functions linear in parameters
+        offsets = function.value_batch(objective.x) - gradients.multiply(initial_parameters)
+        targets = [f_value - offset for f_value, offset in zip(objective.f, offsets)]
+        multipliers = self.solveDual(gradients, targets, minimum_parameters, maximum_parameters)
+        return vector(multipliers[:-1])
+
+    @classmethod
+    def solveDual(cls, gradients, targets: list[float], minimum_parameters: vector = None,
+                  maximum_parameters: vector = None) -> list[float]:
+        """
+        Solves the dual linear program for the points with gradients (rows) and target values,
+        the parameters are kept within the bounds that are given.
+        Returns the simplex multipliers: the parameters followed by the minimax error.
+
+        """
+        points, n = gradients.rows, gradients.cols
+        # a bound of parameter j is a column with a single entry in row j: -1 for the maximum, 1 for the minimum
+        bounds = [(j, -1.0, -maximum_parameters[j]) for j in range(n) if maximum_parameters is not None] + \
+                 [(j, 1.0, minimum_parameters[j]) for j in range(n) if minimum_parameters is not None]
+        size = 2 * points + len(bounds)
+        # columns: u_i, v_i, the bounds, n + 1 artificial variables and the right side
+        rows = [vector(list(gradients.col(j)) + [-value for value in gradients.col(j)] +
+                       [entry if row == j else 0.0 for row, entry, _ in bounds] + [0.0] * (n + 1) + [0.0])
+                for j in range(n)]
+        rows.append(vector([1.0] * (2 * points) + [0.0] * len(bounds) + [0.0] * (n + 1) + [1.0]))
+        for k, row in enumerate(rows):
+            row[size + k] = 1.0
+        basis = [size + k for k in range(n + 1)]
+
+        # phase 1: the sum of the artificial variables is minimized to find a feasible basis
+        costs = vector(size + n + 2)
+        for row in rows:
+            costs.axpy(-1.0, row)
+        for k in range(n + 1):
+            costs[size + k] = 0.0
+        cls.simplex(rows, costs, basis, size + n + 1)
+        # artificial variables left in the basis at zero level are replaced where the row allows it
+        for k in range(n + 1):
+            if basis[k] >= size:
+                column = next((j for j in range(size) if abs(rows[k][j]) > SIMPLEX_TOLERANCE), None)
+                if column is not None:
+                    cls.pivot(rows, costs, basis, k, column)
+
+        # phase 2: max sum target_i (u_i - v_i) as min of the negated objective, artificial variables never enter
+        objective = [-value for value in targets] + list(targets) + [-cost for _, _, cost in bounds]
+        costs = vector(objective + [0.0] * (n + 2))
+        for k, row in enumerate(rows):
+            if basis[k] < size and objective[basis[k]]:
+                costs.axpy(-objective[basis[k]], row)
+        cls.simplex(rows, costs, basis, size)
+
+        # the columns of the artificial variables hold the inverse of the basis matrix
+        multipliers = [0.0] * (n + 1)
+        for k, row in enumerate(rows):
+            if basis[k] < size:
+                for j in range(n + 1):
+                    multipliers[j] -= objective[basis[k]] * row[size + j]
+        return multipliers
+
+    @classmethod
+    def simplex(cls, rows: list[vector], costs: vector, basis: list[int], columns: int) -> None:
+        """Pivots until no reduced cost among the first columns is negative."""
+        degenerate = 0
+        while True:
+            if degenerate < DEGENERATE_PIVOTS:
+                entering = min(range(columns), key=costs.__getitem__)
+                if costs[entering] >= -SIMPLEX_TOLERANCE:
+                    return
+            else:
+                entering = next((j for j in range(columns) if costs[j] < -SIMPLEX_TOLERANCE), None)
+                if entering is None:
+                    return
+            leaving, ratio = None, None
+            for k, row in enumerate(rows):
+                if row[entering] > SIMPLEX_TOLERANCE:
+                    candidate = row[-1] / row[entering]
+                    if leaving is None or candidate < ratio or (candidate == ratio and basis[k] < basis[leaving]):
+                        leaving, ratio = k, candidate
+            if leaving is None:
+                raise RuntimeError("The linear program is unbounded")
+            degenerate = degenerate + 1 if ratio <= SIMPLEX_TOLERANCE else 0
+            cls.pivot(rows, costs, basis, leaving, entering)
+
+    @classmethod
+    def pivot(cls, rows: list[vector], costs: vector, basis: list[int], leaving: int, entering: int) -> None:
+        pivot_row = rows[leaving]
+        pivot_row *= 1 / pivot_row[entering]
+        for k, row in enumerate(rows):
+            if k != leaving and row[entering]:
+                row.axpy(-row[entering], pivot_row)
+        costs.axpy(-costs[entering], pivot_row)
+        basis[leaving] = entering
@@ -29,7 +29,7 @@ class SimulatedAnnealing(Optimizer):
                  minimum_parameters: vector, maximum_parameters: vector) -> vector:
         parameters = initial_parameters.copy()
         result_parameters = initial_parameters.copy()
-        y1 = objective.value(function.bind(initial_parameters))
+        y1 = objective.value(function.bind(initial_parameters, copy=False))
         temperature = INIT_TEMPERATURE
         decrease_function = self.decreaseTemperature(temperature)
         k = 0
@@ -37,7 +37,7 @@ class SimulatedAnnealing(Optimizer):
             random_index = randint(0, parameters.length - 1)
             parameters[random_index] = uniform(0, 1) * (maximum_parameters[random_index] -
                                                         minimum_parameters[random_index]) + minimum_parameters[random_index]
-            y2 = objective.value(function.bind(parameters))
+            y2 = objective.value(function.bind(parameters, copy=False))
             if y1 > y2:
                 result_parameters = parameters.copy()
                 y1 = y2
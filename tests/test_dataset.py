@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from functionals import l1, l2, linf
+from functions import linear_function
+from mathtypes.dataset import Dataset
+from mathtypes.linalg import vector
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.x = [vector([1.5, 1]), vector([-1, 3]), vector([2, 2])]
+        self.f = vector([4, 1, 6])
+        self.dataset = Dataset(self.x, self.f)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_init(self) -> None:
+        with self.assertRaises(ValueError):
+            Dataset([], vector())
+        with self.assertRaises(ValueError):
+            Dataset([vector([1, 2])], vector([1, 3]))
+        with self.assertRaises(ValueError):
+            Dataset([vector([1, 2]), vector([1])], vector([1, 3]))
+        with self.assertRaises(TypeError):
+            Dataset('a', vector())
+        with self.assertRaises(TypeError):
+            Dataset([vector([1, 2])], 1)
+
+    def test_access(self) -> None:
+        self.assertEqual(len(self.dataset), 3)
+        self.assertEqual(self.dataset.dimension, 2)
+        self.assertListEqual([list(point) for point in self.dataset], [list(point) for point in self.x])
+        self.assertListEqual(list(self.dataset[-1]), [2, 2])
+        self.assertListEqual(list(self.dataset.f), [4, 1, 6])
+        self.assertListEqual(list(self.dataset.column(1)), [1, 3, 2])
+        with self.assertRaises(IndexError):
+            self.dataset[3]
+
+    def test_fingerprint(self) -> None:
+        # equal data gives equal fingerprints, the fingerprint is computed once
+        copy = Dataset(self.x, self.f)
+        self.assertEqual(copy.fingerprint, self.dataset.fingerprint)
+        self.assertIs(copy.fingerprint, copy.fingerprint)
+        self.assertEqual(copy, self.dataset)
+        self.assertEqual(hash(copy), hash(self.dataset))
+        self.assertNotEqual(Dataset(self.x, vector([4, 1, 5])), self.dataset)
+        self.assertNotEqual(Dataset([vector([1.5, 1, -1]), vector([3, 2, 2])], vector([4, 1])).fingerprint,
+                            Dataset([vector([1.5, 1]), vector([-1, 3]), vector([2, 2])], vector([4, 1, 0])).fingerprint)
+
+        # the points key ignores the function values
+        self.assertEqual(Dataset(self.x, vector([4, 1, 5])).points_key, self.dataset.points_key)
+        self.assertEqual(hash(Dataset(self.x, vector([4, 1, 5])).points_key), hash(self.dataset.points_key))
+        self.assertIs(self.dataset.points_key, self.dataset.points_key)
+        self.assertNotEqual(Dataset(self.x[::-1], self.f).points_key, self.dataset.points_key)
+
+        # a dataset is immutable
+        with self.assertRaises(TypeError):
+            self.dataset.f[0] = 1
+        with self.assertRaises(TypeError):
+            self.dataset.column(0)[0] = 1
+        for name in ('rows', 'dimension', 'f', '_columns'):
+            with self.assertRaises(AttributeError):
+                setattr(self.dataset, name, None)
+            with self.assertRaises(AttributeError):
+                delattr(self.dataset, name)
+
+    def test_save_open(self) -> None:
+        path = os.path.join(self.directory.name, "points.bin")
+        self.dataset.save(path)
+        loaded = Dataset.open(path)
+        self.assertListEqual([list(point) for point in loaded], [list(point) for point in self.x])
+        self.assertListEqual(list(loaded.f), [4, 1, 6])
+        # a memory-mapped dataset is read-only
+        with self.assertRaises(TypeError):
+            loaded.f[0] = 1
+
+        with self.assertRaises(ValueError):
+            Dataset.frombuffer(b"NOPE" + bytes(28))
+
+    def test_fromcsv(self) -> None:
+        csv_path = os.path.join(self.directory.name, "points.csv")
+        with open(csv_path, "w") as file:
+            file.write("x1,x2,f\n1.5,1,4\n-1,3,1\n2,2,6\n")
+        loaded = Dataset.fromcsv(csv_path, os.path.join(self.directory.name, "points.bin"), skip_header=True)
+        self.assertListEqual([list(point) for point in loaded], [list(point) for point in self.x])
+        self.assertListEqual(list(loaded.f), [4, 1, 6])
+
+    def test_functionals(self) -> None:
+        # Функционалы принимают набор данных без копирования и дают те же значения
+        function = linear_function.LinearFunction().bind(vector([2, 0, 0]))
+        for functional in (l1.L1, l2.L2, linf.LInf):
+            self.assertEqual(functional(self.dataset).value(function), functional(self.x, self.f).value(function))
+        with self.assertRaises(ValueError):
+            l2.L2(self.dataset, self.f)
+
+        # Функционалы используют один набор данных по ссылке, список точек упаковывается в набор данных
+        functionals = [functional(self.dataset) for functional in (l1.L1, l2.L2, linf.LInf)]
+        self.assertTrue(all(functional.x is self.dataset for functional in functionals))
+        self.assertIsInstance(l2.L2(self.x, self.f).x, Dataset)
+        self.assertEqual(l2.L2(self.x, self.f).x, self.dataset)
+
+
+if __name__ == "__main__":
+    unittest.main()
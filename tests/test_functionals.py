@@ -1,6 +1,7 @@
 import unittest
-from functionals import l1, l2, linf
-from functions import linear_function, polynomial_function
+from functionals import cached, irls, l1, l2, linf, parallel, streaming
+from functions import linear_function, linear_spline, polynomial_function
+from mathtypes.dataset import Dataset
 from mathtypes.linalg import vector
 
 
@@ -43,14 +44,21 @@ class TestL1(unittest.TestCase):
             self.functional.value(self.pf.bind(vector([1, 0, 1])))
 
     def test_gradient(self) -> None:
-        # Вычисление градиента полиномиальной функции, которая не реализует DifferentiableFunction
-        with self.assertRaises(TypeError):
+        # Вычисление градиента полиномиальной функции при несовпадении области определения функции и пространства исходных точек
+        with self.assertRaises(ValueError):
             self.functional.gradient(self.pf.bind(vector([2, 1, 0])))
 
         # Вычисление градиента линейной функции, которая реализует DifferentiableFunction
         self.assertListEqual(list(self.functional.gradient(
             self.lf.bind(vector([1, -1, 0])))), [-2.5, -6, -3])
 
+    def test_value_and_gradient(self) -> None:
+        # Значение и градиент функционала вычисляются за один проход и совпадают с отдельными вызовами
+        function = self.lf.bind(vector([1, -1, 0]))
+        value, gradient = self.functional.value_and_gradient(function)
+        self.assertEqual(value, self.functional.value(function))
+        self.assertListEqual(list(gradient), list(self.functional.gradient(function)))
+
 
 class TestL2(unittest.TestCase):
 
@@ -91,13 +99,21 @@ class TestL2(unittest.TestCase):
             self.functional.value(self.pf.bind(vector([1, 0, 1])))
 
     def test_gradient(self) -> None:
-        # Вычисление градиента полиномиальной функции, которая не реализует DifferentiableFunction
-        with self.assertRaises(TypeError):
+        # Вычисление градиента полиномиальной функции при несовпадении области определения функции и пространства исходных точек
+        with self.assertRaises(ValueError):
             self.functional.gradient(self.pf.bind(vector([2, 1, 0])))
 
         # Вычисление градиента линейной функции, которая реализует DifferentiableFunction
-        self.assertListEqual(list(self.functional.gradient(self.lf.bind(vector(
-            [1, -1, 0])))), [-8.374602011578231, -20.851049906378453, -9.912794217786477])
+        gradient = self.functional.gradient(self.lf.bind(vector([1, -1, 0])))
+        for a, b in zip(gradient, [-8.374602011578231, -20.851049906378453, -9.912794217786477]):
+            self.assertAlmostEqual(a, b)
+
+    def test_value_and_gradient(self) -> None:
+        # Значение и градиент функционала вычисляются за один проход и совпадают с отдельными вызовами
+        function = self.lf.bind(vector([1, -1, 0]))
+        value, gradient = self.functional.value_and_gradient(function)
+        self.assertEqual(value, self.functional.value(function))
+        self.assertListEqual(list(gradient), list(self.functional.gradient(function)))
 
     def test_residual(self) -> None:
         # Вычисление остатков, когда функция равна искомой
@@ -109,12 +125,12 @@ class TestL2(unittest.TestCase):
             self.lf.bind(vector([-2, 1, 0])))), [6.0, -4, 8])
 
     def test_jacobian(self) -> None:
-        # Вычисления якобиана функции, которая не реализует DifferentiableFunction
-        with self.assertRaises(TypeError):
+        # Вычисления якобиана полиномиальной функции при несовпадении области определения функции и пространства исходных точек
+        with self.assertRaises(ValueError):
             self.functional.jacobian(self.pf.bind(vector([2, 1])))
 
         # Вычисления якобиана функции, которая реализует DifferentiableFunction
-        self.assertListEqual(list(self.functional.jacobian(self.lf.bind(vector([2, 1, 0])))),
+        self.assertListEqual(list(map(list, self.functional.jacobian(self.lf.bind(vector([2, 1, 0]))))),
                              [[-1.5, -1, -1], [1, -3, -1], [-2, -2, -1]])
 
 
@@ -157,5 +173,233 @@ class TestLInf(unittest.TestCase):
             self.functional.value(self.pf.bind(vector([1, 0, 1])))
 
 
+class TestIRLS(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lf = linear_function.LinearFunction()
+        self.x = [vector([1.5, 1]), vector([-1, 3]), vector([2, 2])]
+        self.f = vector([4, 1, 6])
+
+    def test_init(self) -> None:
+        # Неизвестная функция потерь
+        with self.assertRaises(ValueError):
+            irls.IRLS(self.x, self.f, loss="l2")
+
+        # Параметр функции Хьюбера должен быть положительным
+        with self.assertRaises(ValueError):
+            irls.IRLS(self.x, self.f, loss="huber", delta=0)
+
+    def test_value(self) -> None:
+        # Для loss="l1" значение совпадает с L1
+        function = self.lf.bind(vector([1, -1, 0]))
+        self.assertEqual(irls.IRLS(self.x, self.f).value(function), l1.L1(self.x, self.f).value(function))
+
+        # Функция Хьюбера квадратична при малых остатках и линейна при больших
+        functional = irls.IRLS(self.x, self.f, loss="huber", delta=2)
+        self.assertEqual(functional.value(self.lf.bind(vector([2, 1, 0.5]))), 3 * 0.5 ** 2 / 2)
+        self.assertEqual(functional.value(self.lf.bind(vector([2, 1, -3]))), 3 * 2 * (3 - 1))
+
+    def test_weighted_least_squares(self) -> None:
+        # Сумма квадратов взвешенных остатков равна значению L1
+        function = self.lf.bind(vector([1, -1, 0]))
+        functional = irls.IRLS(self.x, self.f)
+        self.assertAlmostEqual(sum(r ** 2 for r in functional.residual(function)), functional.value(function))
+
+        # Нормальные уравнения совпадают с построенными по взвешенным остаткам и якобиану
+        jacobian = functional.jacobian(function)
+        normal_matrix, right_side = functional.normal_equations(function)
+        self.assertListEqual(list(normal_matrix), list(jacobian.gram()))
+        self.assertListEqual(list(right_side), list(jacobian.tmultiply(functional.residual(function))))
+
+    def test_gradient(self) -> None:
+        # Градиент функции Хьюбера: остатки, ограниченные по модулю delta
+        function = self.lf.bind(vector([2, 1, -3]))
+        functional = irls.IRLS(self.x, self.f, loss="huber", delta=2)
+        value, gradient = functional.value_and_gradient(function)
+        self.assertEqual(value, functional.value(function))
+        self.assertListEqual(list(gradient), [-2 * (1.5 - 1 + 2), -2 * (1 + 3 + 2), -2 * 3])
+
+
+class TestCachedFunctional(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lf = linear_function.LinearFunction()
+        self.l2 = l2.L2([vector([1.5, 1]), vector(
+            [-1, 3]), vector([2, 2])], vector([4, 1, 6]))
+        self.functional = cached.CachedFunctional.create(self.l2, maxsize=2)
+
+    def test_create(self) -> None:
+        # Класс обертки соответствует возможностям исходного функционала
+        self.assertIsInstance(self.functional, cached.CachedLeastSquaresFunctional)
+        linf_functional = linf.LInf([vector([1, 2])], vector([1]))
+        self.assertNotIsInstance(cached.CachedFunctional.create(linf_functional),
+                                 cached.CachedDifferentiableFunctional)
+
+        # Размер кэша должен быть положительным
+        with self.assertRaises(ValueError):
+            cached.CachedFunctional(self.l2, maxsize=0)
+
+    def test_value(self) -> None:
+        # Повторное вычисление в той же точке берется из кэша
+        parameters = vector([2, 0, 0])
+        value = self.functional.value(self.lf.bind(parameters))
+        self.assertEqual(self.functional.value(self.lf.bind(parameters)), value)
+        self.assertEqual(value, self.l2.value(self.lf.bind(parameters)))
+        self.assertEqual((self.functional.hits, self.functional.misses), (1, 1))
+
+        # При переполнении вытесняется давно не использованная точка
+        self.functional.value(self.lf.bind(vector([1, 0, 0])))
+        self.functional.value(self.lf.bind(vector([0, 0, 0])))
+        self.functional.value(self.lf.bind(parameters))
+        self.assertEqual((self.functional.hits, self.functional.misses), (1, 4))
+
+    def test_value_and_gradient(self) -> None:
+        # Градиент кэшируется и возвращается копией
+        function = self.lf.bind(vector([1, -1, 0]))
+        value, gradient = self.functional.value_and_gradient(function)
+        gradient *= 0
+        for a, b in zip(self.functional.gradient(function), [-8.374602011578231, -20.851049906378453, -9.912794217786477]):
+            self.assertAlmostEqual(a, b)
+        self.assertEqual(self.functional.value(function), value)
+        self.assertEqual((self.functional.hits, self.functional.misses), (2, 1))
+
+        # Остатки и якобиан передаются исходному функционалу
+        self.assertListEqual(list(self.functional.residual(function)), list(self.l2.residual(function)))
+
+    def test_function_change(self) -> None:
+        # Кэш очищается при передаче другой функции с теми же параметрами
+        parameters = vector([2, 3])
+        spline = linear_spline.LinearSpline([1, 2])
+        functional = cached.CachedFunctional.create(l2.L2([vector([1]), vector([2])], vector([2, 3])))
+        self.assertNotEqual(functional.value(self.lf.bind(parameters)), 0)
+        self.assertEqual(functional.value(spline.bind(parameters)), 0)
+        self.assertEqual((functional.hits, functional.misses), (0, 2))
+
+class TestStreamingFunctional(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lf = linear_function.LinearFunction()
+        self.spline = linear_spline.LinearSpline([0, 1, 2, 3])
+        self.x = [vector([1.5, 1]), vector([-1, 3]), vector([2, 2]), vector([0, 1]), vector([3, -2])]
+        self.f = vector([4, 1, 6, 2, -1])
+        # Блоки точек: список, по которому можно пройти несколько раз
+        self.chunks = [(self.x[:2], vector([4, 1])), (self.x[2:], vector([6, 2, -1]))]
+
+    def test_init(self) -> None:
+        # Генератор можно пройти только один раз
+        with self.assertRaises(TypeError):
+            streaming.StreamingL2(iter(self.chunks))
+
+        # Размер мини-батча должен быть положительным
+        with self.assertRaises(ValueError):
+            streaming.StreamingL2(self.chunks, batch_size=0)
+
+        # Пустой поток блоков
+        with self.assertRaises(ValueError):
+            streaming.StreamingL2([]).value(self.lf.bind(vector([1, 1, 1])))
+
+        # Блок с несовпадающим количеством точек и значений
+        with self.assertRaises(ValueError):
+            streaming.StreamingL1([(self.x, vector([1]))]).value(self.lf.bind(vector([1, 1, 1])))
+
+    def test_matches_functionals(self) -> None:
+        # Значения и градиенты по блокам совпадают с вычисленными по всем точкам
+        function = self.lf.bind(vector([1, -1, 0.5]))
+        for full, stream in ((l1.L1(self.x, self.f), streaming.StreamingL1(self.chunks)),
+                             (l2.L2(self.x, self.f), streaming.StreamingL2(self.chunks))):
+            value, gradient = stream.value_and_gradient(function)
+            self.assertAlmostEqual(value, full.value(function))
+            self.assertAlmostEqual(stream.value(function), full.value(function))
+            for a, b in zip(gradient, full.gradient(function)):
+                self.assertAlmostEqual(a, b)
+        self.assertEqual(streaming.StreamingLInf(self.chunks).value(function),
+                         linf.LInf(self.x, self.f).value(function))
+
+    def test_normal_equations(self) -> None:
+        # J^T J и J^T r накапливаются по блокам, разреженный градиент дает ленточную матрицу
+        x = [vector([0.5]), vector([1]), vector([2.5]), vector([3])]
+        f = vector([1, 2, 0, 4])
+        chunks = lambda: iter([(x[:1], vector([1])), (x[1:], vector([2, 0, 4]))])
+        function = self.spline.bind(vector([1, 0, 2, 1]))
+        full = l2.L2(x, f)
+        for stream in (streaming.StreamingL2(chunks), streaming.StreamingL2(chunks, batch_size=2)):
+            normal_matrix, right_side = stream.normal_equations(function)
+            expected_matrix, expected_side = full.normal_equations(function)
+            self.assertListEqual(list(normal_matrix.todense()), list(expected_matrix.todense()))
+            self.assertListEqual(list(right_side), list(expected_side))
+            self.assertListEqual(list(stream.residual(function)), list(full.residual(function)))
+            self.assertListEqual(list(stream.jacobian(function).todense()), list(full.jacobian(function).todense()))
+
+    def test_batch(self) -> None:
+        # В режиме мини-батчей вычисление при новых параметрах использует следующие блоки потока по кругу,
+        # вычисления при тех же параметрах используют тот же батч
+        stream = streaming.StreamingL1(self.chunks, batch_size=1)
+        values = []
+        for parameters in ([1, -1, 0.5], [1, -1, 0.5], [2, 0, 1], [1, -1, 0.5]):
+            function = self.lf.bind(vector(parameters))
+            values.append(stream.value(function))
+            self.assertEqual(stream.value_and_gradient(function)[0], values[-1])
+        chunk = [l1.L1(*chunk) for chunk in self.chunks]
+        first = chunk[0].value(self.lf.bind(vector([1, -1, 0.5])))
+        second = chunk[1].value(self.lf.bind(vector([2, 0, 1])))
+        self.assertListEqual(values, [first, first, second, first])
+
+    def test_chunk_caches_discarded(self) -> None:
+        # Таблицы, которые функция кэширует для блоков-датасетов, удаляются после вычисления блока
+        chunks = [Dataset([vector([0.5]), vector([1])], vector([1, 2])), Dataset([vector([2.5])], vector([0]))]
+        stream = streaming.StreamingL2(chunks)
+        stream.value_and_gradient(self.spline.bind(vector([1, 0, 2, 1])))
+        self.assertEqual((len(self.spline._intervals), len(self.spline._designs)), (0, 0))
+
+
+class TestParallelFunctional(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lf = linear_function.LinearFunction()
+        self.pf = polynomial_function.PolynomialFunction()
+        self.x = [vector([1.5, 1]), vector([-1, 3]), vector([2, 2]), vector([0, 1]), vector([3, -2])]
+        self.f = vector([4, 1, 6, 2, -1])
+
+    def test_init(self) -> None:
+        # Количество процессов должно быть положительным
+        with self.assertRaises(ValueError):
+            parallel.ParallelL2(self.x, self.f, workers=0)
+
+        # Не совпадает количество точек и значений искомой функции в этих точках
+        with self.assertRaises(ValueError):
+            parallel.ParallelL2(self.x, vector([1, 3]))
+
+    def test_matches_functionals(self) -> None:
+        # Частичные суммы по частям выборки в процессах совпадают с вычислениями в одном процессе
+        function = self.lf.bind(vector([1, -1, 0.5]))
+        with parallel.ParallelL1(self.x, self.f, workers=2) as functional:
+            value, gradient = functional.value_and_gradient(function)
+            self.assertEqual(value, l1.L1(self.x, self.f).value(function))
+            self.assertListEqual(list(gradient), list(l1.L1(self.x, self.f).gradient(function)))
+        with parallel.ParallelLInf(self.x, self.f, workers=2) as functional:
+            self.assertEqual(functional.value(function), linf.LInf(self.x, self.f).value(function))
+        full = l2.L2(self.x, self.f)
+        with parallel.ParallelL2(self.x, self.f, workers=3) as functional:
+            value, gradient = functional.value_and_gradient(function)
+            self.assertAlmostEqual(value, full.value(function))
+            for a, b in zip(gradient, full.gradient(function)):
+                self.assertAlmostEqual(a, b)
+            normal_matrix, right_side = functional.normal_equations(function)
+            expected_matrix, expected_side = full.normal_equations(function)
+            self.assertListEqual(list(map(list, normal_matrix)), list(map(list, expected_matrix)))
+            self.assertListEqual(list(right_side), list(expected_side))
+            self.assertListEqual(list(functional.residual(function)), list(full.residual(function)))
+            self.assertListEqual(list(map(list, functional.jacobian(function))), list(map(list, full.jacobian(function))))
+
+            # Ошибка в процессе передается вызывающему
+            with self.assertRaises(ValueError):
+                functional.value(self.pf.bind(vector([1, 0, 1])))
+
+            # Функция заменяется на другую и обратно, процессы загружают каждую заново
+            other = linear_function.LinearFunction().bind(vector([2, 1, 0]))
+            self.assertEqual(functional.value(other), full.value(other))
+            self.assertAlmostEqual(functional.value(function), full.value(function))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,15 @@
+import copy
+import pickle
 import unittest
-from functions import linear_function, polynomial_function
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functionals import l2
+from functions import cubic_spline, linear_function, linear_spline, polynomial_function, tensor_spline
+from functions.abcfunction import DifferentiableFunction
+from functions.bound import BoundFunction
+from functions.frozen import FrozenLinearFunction
+from mathtypes.dataset import Dataset
 from mathtypes.linalg import vector
 
 
@@ -30,6 +40,25 @@ class TestLinearFunction(unittest.TestCase):
         self.function.bind(vector([-2]))
         self.assertListEqual(list(self.function.gradient(vector())), [1])
 
+    def test_bind_without_copy(self):
+        parameters = vector([1, -2, 1])
+        self.assertIs(self.function.bind(parameters, copy=False).parameters, parameters)
+        parameters[2] = 4
+        self.assertEqual(self.function.value(vector([2, 3])), 0)
+        self.assertIsNot(self.function.bind(parameters).parameters, parameters)
+
+    def test_batch(self):
+        self.function.bind(vector([1.5, -2, 0.25]))
+        points = [vector([0.1, 2]), vector([-3, 0.7]), vector([4, -1])]
+        dataset = Dataset(points, vector([0, 0, 0]))
+        for batch in (points, dataset):
+            self.assertEqual(list(self.function.value_batch(batch)), [self.function.value(point) for point in points])
+            gradients = self.function.gradient_batch(batch)
+            for i, point in enumerate(points):
+                self.assertEqual(gradients.row(i), self.function.gradient(point))
+        with self.assertRaises(IndexError):
+            self.function.value_batch([vector([1, 1, 1])])
+
 
 class TestPolynomialFunction(unittest.TestCase):
 
@@ -49,6 +78,304 @@ class TestPolynomialFunction(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.function.value(vector([1, 1]))
 
+    def test_gradient(self):
+        self.function.bind(vector([1, -2, 0, 3]))
+        self.assertListEqual(list(self.function.gradient(vector([2]))), [8, 4, 2, 1])
+        self.function.bind(vector([5]))
+        self.assertListEqual(list(self.function.gradient(vector([2]))), [1])
+
+    def test_gradient_batch(self):
+        self.function.bind(vector([0.5, -2, 0.1, 3]))
+        points = [vector([x]) for x in (-1.5, 0, 0.3, 2)]
+        dataset = Dataset(points, vector([0, 0, 0, 0]))
+        for batch in (points, dataset, dataset):
+            gradients = self.function.gradient_batch(batch)
+            for i, point in enumerate(points):
+                self.assertEqual(gradients.row(i), self.function.gradient(point))
+        # the table of powers is rebuilt when the degree changes
+        self.function.bind(vector([1, 1]))
+        self.assertEqual(self.function.gradient_batch(dataset).cols, 2)
+
+    def test_value_batch(self):
+        self.function.bind(vector([0.5, -2, 0.1, 3]))
+        points = [vector([x]) for x in (-1.5, 0, 0.3, 2)]
+        values = [self.function.value(point) for point in points]
+        self.assertEqual(list(self.function.value_batch(points)), values)
+        self.assertEqual(list(self.function.value_batch(Dataset(points, vector(values)))), values)
+        with self.assertRaises(ValueError):
+            self.function.value_batch([vector([1, 1])])
+
+
+class TestCubicSpline(unittest.TestCase):
+
+    def assertVectorAlmostEqual(self, first, second, places=12):
+        self.assertEqual(len(first), len(second))
+        for a, b in zip(first, second):
+            self.assertAlmostEqual(a, b, places=places)
+
+    def test_batch(self):
+        function = cubic_spline.CubicSpline([0, 1, 2, 3]).bind(vector([1, -1, 2, 0.5]))
+        points = [vector([x]) for x in (0, 0.4, 1.7, 2.2, 3)]
+        self.assertVectorAlmostEqual(function.value_batch(points), [function.value(point) for point in points])
+        gradients = function.gradient_batch(points)
+        for i, point in enumerate(points):
+            self.assertVectorAlmostEqual(gradients.row(i), function.gradient(point))
+
+    def test_reproduces_polynomials(self):
+        nodes = [-1, 0.5, 1, 2.5, 4]
+        points = [vector([x]) for x in (-1, -0.3, 0.7, 1.9, 3.3, 4)]
+        # the natural spline is exact for a straight line
+        function = cubic_spline.CubicSpline(nodes).bind(vector([2 * x - 1 for x in nodes]))
+        self.assertVectorAlmostEqual(function.derivative_parameters, [2] * len(nodes))
+        self.assertVectorAlmostEqual(function.value_batch(points), [2 * float(x) - 1 for x in points])
+        # the not-a-knot spline and the clamped spline with the true end slopes are exact for a cubic
+        cubic = lambda x: x ** 3 - 2 * x ** 2 + 0.5
+        for function in (cubic_spline.CubicSpline(nodes, "not-a-knot"),
+                         cubic_spline.CubicSpline(nodes, "clamped", (7, 32))):
+            function.bind(vector([cubic(x) for x in nodes]))
+            self.assertVectorAlmostEqual(function.derivative_parameters, [3 * x ** 2 - 4 * x for x in nodes])
+            self.assertVectorAlmostEqual(function.value_batch(points), [cubic(float(x)) for x in points])
+
+    def test_gradient_includes_slopes(self):
+        # the spline is linear in its parameters, so the gradient is the spline of a unit vector
+        nodes, point = [0, 1, 2, 3, 4], vector([1.3])
+        for boundary in ("natural", "clamped", "not-a-knot"):
+            function = cubic_spline.CubicSpline(nodes, boundary).bind(vector([1, -1, 2, 0.5, 1]))
+            gradient = function.gradient(point)
+            for j in range(len(nodes)):
+                unit = vector(len(nodes))
+                unit[j] = 1
+                self.assertAlmostEqual(gradient[j], cubic_spline.CubicSpline(nodes, boundary).bind(unit).value(point))
+
+    def test_bind_without_copy(self):
+        # binding reuses the caller's parameters and the preallocated buffer of the slopes
+        function = cubic_spline.CubicSpline([0, 1, 2, 3])
+        slopes = function.derivative_parameters
+        parameters = vector([1, -1, 2, 0.5])
+        function.bind(parameters, copy=False)
+        self.assertIs(function.parameters, parameters)
+        self.assertIs(function.derivative_parameters, slopes)
+        expected = list(cubic_spline.CubicSpline([0, 1, 2, 3]).bind(parameters).derivative_parameters)
+        self.assertEqual(list(slopes), expected)
+
+    def test_pickle_without_slope_matrix(self):
+        # the slope matrix is derived from the nodes, it is not pickled and is computed again on demand
+        function = cubic_spline.CubicSpline([0, 1, 2, 3])
+        slope_matrix = function.slopeMatrix()
+        restored = pickle.loads(pickle.dumps(function))
+        self.assertIsNone(restored._slope_matrix)
+        self.assertIs(function.slopeMatrix(), slope_matrix)
+        self.assertEqual(list(map(list, restored.slopeMatrix())), list(map(list, slope_matrix)))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            cubic_spline.CubicSpline([0, 1, 2], "periodic")
+        with self.assertRaises(ValueError):
+            cubic_spline.CubicSpline([0, 1, 2], "not-a-knot")
+        with self.assertRaises(ValueError):
+            cubic_spline.CubicSpline([0, 1, 2]).bind(vector([1, 2]))
+
+    def test_interval_number(self):
+        function = cubic_spline.CubicSpline([0, 1, 2.5, 3])
+        # points outside the nodes fall into the edge intervals, a node closes its interval
+        for point, index in ((-1, 0), (0, 0), (0.5, 0), (1, 0), (1.2, 1), (2.5, 1), (2.7, 2), (3, 2), (10, 2)):
+            self.assertEqual(function.getIntervalNumber(point), index)
+
+    def test_intervals_cached_per_dataset(self):
+        function = cubic_spline.CubicSpline([0, 1, 2, 3])
+        points = [vector([x]) for x in (0.5, 2.5, 1.5)]
+        dataset = Dataset(points, vector([0, 0, 0]))
+        intervals = function.intervals(dataset)
+        self.assertEqual(list(intervals), [0, 2, 1])
+        function.bind(vector([1, 2, 3, 4]))
+        self.assertIs(function.intervals(dataset), intervals)
+        # the caches are keyed by the points: datasets with the same points share them, other points do not
+        self.assertIs(function.intervals(Dataset(points, vector([0, 0, 0]))), intervals)
+        self.assertIs(function.intervals(Dataset(points, vector([0, 0, 1]))), intervals)
+        self.assertIsNot(function.intervals(Dataset(points[::-1], vector([0, 0, 0]))), intervals)
+
+    def test_design_cached_per_dataset(self):
+        function = cubic_spline.CubicSpline([0, 1, 2, 3])
+        points = [vector([x]) for x in (0.2, 2.5, 1.5, 3)]
+        dataset = Dataset(points, vector([0, 0, 0, 0]))
+        design = function.design(dataset)
+        for parameters in (vector([1, -1, 2, 0.5]), vector([0, 3, 1, -2])):
+            function.bind(parameters)
+            self.assertIs(function.design(dataset), design)
+            self.assertVectorAlmostEqual(function.value_batch(dataset), [function.value(point) for point in points])
+        # the jacobian is negated in place by the functionals, so the cached matrices must not be changed
+        gradients = function.gradient_batch(dataset)
+        gradients *= -1
+        self.assertVectorAlmostEqual(function.gradient_batch(dataset).row(0), function.gradient(points[0]))
+
+
+class TestLinearSpline(unittest.TestCase):
+
+    def test_value(self):
+        function = linear_spline.LinearSpline([0, 1, 3]).bind(vector([1, 3, -1]))
+        self.assertEqual(function.value(vector([0.5])), 2)
+        self.assertEqual(function.value(vector([2])), 1)
+        points = [vector([0.5]), vector([2])]
+        self.assertEqual(list(function.value_batch(Dataset(points, vector([0, 0])))), [2, 1])
+
+
+class TestTensorSpline(unittest.TestCase):
+
+    def test_interval_number(self):
+        uniform = tensor_spline.GridAxis([0, 0.1, 0.2, 0.3, 0.4])
+        non_uniform = tensor_spline.GridAxis([0, 0.1, 0.25, 0.3, 0.4])
+        self.assertTrue(uniform.uniform)
+        self.assertFalse(non_uniform.uniform)
+        for axis in (uniform, non_uniform):
+            for point in (-1, 0, 0.05, 0.1, 0.1 + 1e-12, 0.2, 0.27, 0.3, 0.35, 0.4, 2):
+                self.assertEqual(axis.getIntervalNumber(point), bisect_left(axis.nodes, point, 1, 4) - 1)
+
+    def test_bilinear(self):
+        # the bilinear spline is exact for a + b*x + c*y + d*x*y
+        axes = [[0, 1, 3], [-1, 0, 0.5, 2]]
+        f = lambda x, y: 1 + 2 * x - y + 0.5 * x * y
+        function = tensor_spline.TensorSpline(axes).bind(vector([f(x, y) for x in axes[0] for y in axes[1]]))
+        points = [vector([0.3, -0.4]), vector([2.5, 1.5]), vector([1, 0.5]), vector([3, 2])]
+        for point, value in zip(points, function.value_batch(points)):
+            self.assertAlmostEqual(function.value(point), f(*point))
+            self.assertAlmostEqual(value, f(*point))
+        indices, values = function.sparseGradient(points[0])
+        self.assertEqual(indices, [0, 1, 4, 5])
+        self.assertAlmostEqual(sum(values), 1)
+
+    def test_cubic(self):
+        # the local cubic spline is exact for linear functions, a value depends on at most 4^n nodes
+        axes = [[0, 0.5, 1, 1.5, 2], [0, 1, 2, 4], [0, 1]]
+        f = lambda x, y, z: 3 * x - 2 * y + z - 1
+        function = tensor_spline.TensorSpline(axes, "cubic")
+        function.bind(vector([f(x, y, z) for x in axes[0] for y in axes[1] for z in axes[2]]))
+        for point in (vector([0.7, 1.5, 0.2]), vector([0.1, 3.9, 1]), vector([2, 0, 0])):
+            self.assertAlmostEqual(function.value(point), f(*point))
+            self.assertLessEqual(len(function.sparseGradient(point)[0]), 4 * 4 * 2)
+        gradients = function.gradient_batch(Dataset([vector([0.7, 1.5, 0.2])], vector([0])))
+        self.assertEqual(list(gradients.todense().row(0)), list(function.gradient(vector([0.7, 1.5, 0.2]))))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            tensor_spline.TensorSpline([[0, 1]], "quintic")
+        with self.assertRaises(ValueError):
+            tensor_spline.TensorSpline([[0, 1], [1, 0]])
+        function = tensor_spline.TensorSpline([[0, 1], [0, 1]])
+        with self.assertRaises(ValueError):
+            function.bind(vector([1, 2, 3]))
+        with self.assertRaises(ValueError):
+            function.bind(vector([1, 2, 3, 4])).value(vector([0.5]))
+
+
+class TestFreeze(unittest.TestCase):
+
+    def test_frozen_values(self):
+        points = [-1.5, -1, 0.2, 1, 2.7, 4, 5.5]
+        nodes = [-1, 0.5, 1, 2.5, 4]
+        parameters = vector([1, -2, 0.5, 3, 1])
+        for function in (polynomial_function.PolynomialFunction(), linear_spline.LinearSpline(nodes),
+                         cubic_spline.CubicSpline(nodes), cubic_spline.CubicSpline(nodes, "not-a-knot"),
+                         cubic_spline.CubicSpline(nodes, "clamped", (1, -1))):
+            frozen = function.freeze(parameters)
+            function.bind(parameters)
+            for x in points:
+                self.assertAlmostEqual(frozen(x), function.value(vector([x])), places=12)
+            self.assertEqual(list(frozen.evaluate(array('d', points))), [frozen(x) for x in points])
+
+    def test_frozen_linear_function(self):
+        function = linear_function.LinearFunction()
+        frozen = function.freeze(vector([1.5, -2, 0.25]))
+        points = [vector([0.1, 2]), vector([-3, 0.7])]
+        function.bind(vector([1.5, -2, 0.25]))
+        for point in points:
+            self.assertEqual(frozen(point), function.value(point))
+            self.assertEqual(frozen(tuple(point)), function.value(point))
+        self.assertEqual(list(frozen.evaluate(Dataset(points, vector([0, 0])))), [frozen(point) for point in points])
+        with self.assertRaises(IndexError):
+            frozen((1, 2, 3))
+
+    def test_immutable(self):
+        frozen = cubic_spline.CubicSpline([0, 1, 2]).freeze(vector([1, 2, 0]))
+        with self.assertRaises(AttributeError):
+            frozen.degree = 1
+        with self.assertRaises(AttributeError):
+            frozen.cache = {}
+        with self.assertRaises(TypeError):
+            tensor_spline.TensorSpline([[0, 1], [0, 1]]).freeze(vector([1, 2, 3, 4]))
+
+    def test_pickle_copy(self):
+        # a frozen evaluator is sent to other processes and copied, the copy stays immutable
+        points = [-0.5, 0.2, 1.5, 3]
+        for frozen in (cubic_spline.CubicSpline([0, 1, 2]).freeze(vector([1, 2, 0])),
+                       polynomial_function.PolynomialFunction().freeze(vector([1, -2, 0.5])),
+                       linear_function.LinearFunction().freeze(vector([1.5, -2, 0.25]))):
+            for other in (pickle.loads(pickle.dumps(frozen)), copy.copy(frozen), copy.deepcopy(frozen)):
+                self.assertIs(type(other), type(frozen))
+                if isinstance(frozen, FrozenLinearFunction):
+                    self.assertEqual(other((0.1, 2)), frozen((0.1, 2)))
+                else:
+                    self.assertEqual(list(other.evaluate(points)), list(frozen.evaluate(points)))
+                with self.assertRaises(AttributeError):
+                    other.coefficients = None
+
+
+class TestBoundFunction(unittest.TestCase):
+
+    def test_parent_is_not_changed(self):
+        function = linear_function.LinearFunction().bind(vector([1, 2, 3]))
+        bound = function.bind(vector([1.5, -2, 0.25]), immutable=True)
+        self.assertIsInstance(bound, BoundFunction)
+        self.assertIsInstance(bound, DifferentiableFunction)
+        self.assertEqual(list(function.parameters), [1, 2, 3])
+        point = vector([0.1, 2])
+        self.assertEqual(bound.value(point), linear_function.LinearFunction().bind(vector([1.5, -2, 0.25])).value(point))
+        self.assertEqual(list(bound.gradient(point)), [0.1, 2, 1])
+        self.assertEqual(list(bound.value_batch([point])), [bound.value(point)])
+        with self.assertRaises(AttributeError):
+            bound.parameters = vector([1, 1, 1])
+        with self.assertRaises(AttributeError):
+            bound.__dict__
+        # private attributes of the parent are not changed through a bound function either
+        with self.assertRaises(AttributeError):
+            bound._cache = {}
+        self.assertFalse(hasattr(function, '_cache'))
+
+    def test_shares_tables(self):
+        function = cubic_spline.CubicSpline([0, 1, 2, 3])
+        points = [vector([x]) for x in (0.2, 2.5, 1.5, 3)]
+        dataset = Dataset(points, vector([0, 0, 0, 0]))
+        first = function.bind(vector([1, -1, 2, 0.5]), immutable=True)
+        second = first.bind(vector([0, 3, 1, -2]))
+        self.assertIs(first.design(dataset), function.design(dataset))
+        self.assertIs(second.slopeMatrix(), function.slopeMatrix())
+        for parameters, bound in ((vector([1, -1, 2, 0.5]), first), (vector([0, 3, 1, -2]), second)):
+            function.bind(parameters)
+            self.assertEqual(list(bound.derivative_parameters), list(function.derivative_parameters))
+            self.assertEqual(list(bound.value_batch(dataset)), list(function.value_batch(dataset)))
+            self.assertEqual(bound.gradient_batch(dataset).row(1), function.gradient_batch(dataset).row(1))
+
+    def test_pickle(self):
+        # a bound function is pickled and copied with its parent, the derivatives at the nodes are kept
+        bound = cubic_spline.CubicSpline([0, 1, 2, 3]).bind(vector([1, -1, 2, 0.5]), immutable=True)
+        points = [vector([x]) for x in (0.2, 2.5, 1.5, 3)]
+        for other in (pickle.loads(pickle.dumps(bound)), copy.copy(bound)):
+            self.assertIsInstance(other, BoundFunction)
+            self.assertEqual(list(other.parameters), [1, -1, 2, 0.5])
+            self.assertEqual(list(other.derivative_parameters), list(bound.derivative_parameters))
+            self.assertEqual(list(other.value_batch(points)), list(bound.value_batch(points)))
+        other.cache_discard(Dataset(points, vector([0, 0, 0, 0])))
+
+    def test_concurrent_evaluation(self):
+        x = [vector([xi / 10]) for xi in range(31)]
+        functional = l2.L2(x, vector([float(point) ** 2 for point in x]))
+        function = cubic_spline.CubicSpline([0, 0.5, 1, 2, 3])
+        candidates = [vector([k, -k, 2 * k, 1, k / 2]) for k in range(16)]
+        expected = [functional.value(function.bind(parameters)) for parameters in candidates]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            values = list(executor.map(
+                lambda parameters: functional.value(function.bind(parameters, immutable=True)), candidates))
+        self.assertEqual(values, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
 import unittest
-from mathtypes.linalg import matrix, vector
+from importlib.util import find_spec
+from mathtypes import linalg
+from mathtypes.linalg import matrix, vector, sparsematrix, bandmatrix, lstsq
 
 
 class TestVector(unittest.TestCase):
@@ -68,6 +70,53 @@ class TestVector(unittest.TestCase):
 
         self.assertListEqual(list(4 * a), [4, 8, -4])
 
+    def test_inplace(self):
+        a = vector([1, 2, -1])
+        b = vector([2, 0, 1])
+        a_id = id(a)
+        a += b
+        a -= vector([1, 1, 1])
+        a *= 2
+        self.assertEqual(id(a), a_id)
+        self.assertListEqual(list(a), [4, 2, -2])
+
+        a.axpy(0.5, b)
+        self.assertListEqual(list(a), [5, 2, -1.5])
+
+        with self.assertRaises(IndexError):
+            a.axpy(1, vector([1]))
+
+        with self.assertRaises(TypeError):
+            a *= "a"
+
+    def test_assign(self):
+        a = vector([1, 2])
+        a.assign(vector([3, 4]))
+        self.assertListEqual(list(a), [3, 4])
+
+        a.assign(vector([5]))
+        self.assertListEqual(list(a), [5])
+
+    def test_buffer(self):
+        # the values are exported without copying on every supported Python version
+        a = vector([1, 2])
+        view = a.buffer()
+        self.assertEqual((view.format, view.nbytes), ('d', 16))
+        view[0] = 5
+        self.assertListEqual(list(a), [5, 2])
+        b = vector.frombuffer(a)
+        b[1] = -1
+        self.assertListEqual(list(a), [5, -1])
+        self.assertEqual(bytes(a.buffer()), a.tobytes())
+
+    def test_eq_repr(self):
+        # only vectors compare equal to vectors, matrix rows are shown as vectors
+        self.assertEqual(vector([1, 2]), vector([1.0, 2.0]))
+        self.assertNotEqual(vector([1, 2]), [1, 2])
+        self.assertNotEqual([1, 2], vector([1, 2]))
+        self.assertEqual(repr(vector([1, 2.5])), 'vector([1.0, 2.5])')
+        self.assertEqual(repr(list(matrix([[1, 2], [3, 4]]))), '[vector([1.0, 2.0]), vector([3.0, 4.0])]')
+
 
 class TestMatrix(unittest.TestCase):
 
@@ -87,10 +136,10 @@ class TestMatrix(unittest.TestCase):
         values2 = [1, -2, 4]
         self.A.insert(0, 0, values2)
         self.assertListEqual(
-            list(self.A), [[1, -2, 4], [1, 3, 2], [3, -2, -0.5], [1, 0, 1]])
+            list(map(list, self.A)), [[1, -2, 4], [1, 3, 2], [3, -2, -0.5], [1, 0, 1]])
 
         self.A.insert(1, self.A.cols, values1)
-        self.assertListEqual(list(self.A),
+        self.assertListEqual(list(map(list, self.A)),
                              [[1, -2, 4, 1], [1, 3, 2, -2], [3, -2, -0.5, 4], [1, 0, 1, 11]])
 
     def test_multiply_vector(self):
@@ -111,11 +160,87 @@ class TestMatrix(unittest.TestCase):
             self.A.multiply(b)
 
         b = matrix([[1, 1], [-1, 2], [-1, 1]])
-        self.assertListEqual(list(self.A.multiply(b)), [
+        self.assertListEqual(list(map(list, self.A.multiply(b))), [
                              [-4, 9], [5.5, -1.5], [0, 2]])
 
+    def test_qr(self):
+        with self.assertRaises(ValueError):
+            matrix([[1, 2, 3], [4, 5, 6]]).qr()
+
+        with self.assertRaisesRegex(ValueError, "Rank deficient matrix"):
+            matrix([[1, 2], [2, 4], [3, 6]]).qr().solve(vector([1, 2, 3]))
+
+        # the system is consistent, so the least squares solution is exact
+        A = matrix([[1, 1], [1, 2], [1, 3], [1, 4]])
+        x = A.qr().solve(vector([3, 5, 7, 9]))
+        for value, expected in zip(x, [1, 2]):
+            self.assertAlmostEqual(value, expected)
+
+        # the least squares solution satisfies the normal equations
+        b = vector([1, 3, 2, 5])
+        workspace = matrix(4, 2)
+        x = lstsq(A, b, workspace)
+        expected = A.gram().cholesky().solve(A.tmultiply(b))
+        for value, expected_value in zip(x, expected):
+            self.assertAlmostEqual(value, expected_value)
+        self.assertListEqual(list(map(list, A)), [[1, 1], [1, 2], [1, 3], [1, 4]])
+
+        with self.assertRaises(ValueError):
+            lstsq(A, b, matrix(2, 2))
+
+    def test_views(self):
+        row = self.A.row(1)
+        col = self.A[:, :].col(2)
+        self.assertListEqual(list(row), [3, -2, -0.5])
+        self.assertListEqual(list(col), [2, -0.5, 1])
+        self.assertAlmostEqual(col.norm(), 2.2912878474779)
+
+        # views share storage with the matrix
+        row[0] = 7
+        self.assertEqual(self.A[1, 0], 7)
+        self.A[2, 2] = 4
+        self.assertEqual(col[2], 4)
+
+        sub = self.A[1:3, 0:2]
+        self.assertListEqual(list(map(list, sub)), [[7, -2], [1, 0]])
+        sub[0, 1] = 5
+        self.assertEqual(self.A[1, 1], 5)
+        self.assertListEqual(list(sub.multiply(vector([1, 1]))), [12, 1])
+        self.assertListEqual(list(self.A.multiply(self.A.col(0))), list(self.A.multiply(vector([1, 7, 1]))))
+
+        # a copy of a view is independent
+        copied = sub.copy()
+        copied[0, 0] = 0
+        self.assertEqual(self.A[1, 0], 7)
+
+        with self.assertRaises(IndexError):
+            self.A.row(3)
+        with self.assertRaises(IndexError):
+            self.A[0, 3]
+        with self.assertRaises(ValueError):
+            self.A[::2, :]
+
+    def test_set_row(self):
+        self.A[0] = [0, 0, 1]
+        self.assertListEqual(list(self.A[0]), [0, 0, 1])
+        with self.assertRaises(TypeError):
+            self.A[0] = [1, 2]
+
+    def test_tmultiply(self):
+        with self.assertRaises(IndexError):
+            self.A.tmultiply(vector([1, 1]))
+
+        b = vector([1, 1, -1])
+        self.assertListEqual(list(self.A.tmultiply(b)),
+                             list(self.A.transpose().multiply(b)))
+
+    def test_gram(self):
+        J = matrix([[1, 2], [3, -1], [0, 4]])
+        self.assertListEqual(list(J.gram()), list(J.transpose().multiply(J)))
+        self.assertListEqual(list(map(list, J.gram())), [[10, -1], [-1, 21]])
+
     def test_transpose(self):
-        self.assertListEqual(list(self.A.transpose()), [
+        self.assertListEqual(list(map(list, self.A.transpose())), [
                              [1, 3, 1], [3, -2, 0], [2, -0.5, 1]])
 
     def test_inverse(self):
@@ -128,5 +253,148 @@ class TestMatrix(unittest.TestCase):
             A.inverse()
 
         A[2, 2] = 3
-        self.assertListEqual(list(A.inverse()), [
+        self.assertListEqual(list(map(list, A.inverse())), [
                              [0.75, 0.0, -0.25], [0.375, 0.5, -0.625], [0.25, 0.0, 0.25]])
+
+    def test_lu(self):
+        with self.assertRaisesRegex(ValueError, "Not a square matrix"):
+            matrix([[1, 9], [0, 1], [1, 1]]).lu()
+
+        with self.assertRaisesRegex(ValueError, "Singular matrix"):
+            matrix([[1, 0, 1], [-2, 2, 3], [-1, 0, -1]]).lu()
+
+        # a zero on the diagonal requires a row swap
+        A = matrix([[0, 2, 1], [1, 1, 0], [2, 0, 3]])
+        x = A.lu().solve(vector([5, 3, 5]))
+        for value, expected in zip(x, [1, 2, 1]):
+            self.assertAlmostEqual(value, expected)
+
+        X = A.lu().solve(matrix([[5, 2], [3, 1], [5, 0]]))
+        for row, expected in zip(list(X), [[1, 0], [2, 1], [1, 0]]):
+            for value, expected_value in zip(row, expected):
+                self.assertAlmostEqual(value, expected_value)
+
+        with self.assertRaises(IndexError):
+            A.lu().solve(vector([1, 2]))
+
+    def test_cholesky(self):
+        with self.assertRaisesRegex(ValueError, "not positive definite"):
+            matrix([[1, 2], [2, 1]]).cholesky()
+
+        A = matrix([[4, 2, 0], [2, 5, 2], [0, 2, 5]])
+        x = A.cholesky().solve(vector([8, 16, 14]))
+        for value, expected in zip(x, [1, 2, 2]):
+            self.assertAlmostEqual(value, expected)
+
+
+class TestSparseMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.A = sparsematrix(4)
+        self.A.append([0, 1], [1, 2])
+        self.A.append([1, 2], [-1, 3])
+        self.A.append([2, 3], [0.5, 1])
+        self.A.append([0, 1], [2, 1])
+
+    def test_append(self):
+        with self.assertRaises(ValueError):
+            self.A.append([0, 1], [1])
+        with self.assertRaises(IndexError):
+            self.A.append([4], [1])
+        self.assertEqual(self.A[1, 2], 3)
+        self.assertEqual(self.A[1, 3], 0)
+        self.assertListEqual(list(map(list, self.A.todense())),
+                             [[1, 2, 0, 0], [0, -1, 3, 0], [0, 0, 0.5, 1], [2, 1, 0, 0]])
+
+    def test_multiply(self):
+        b = vector([1, -1, 2, 1])
+        self.assertListEqual(list(self.A.multiply(b)), list(self.A.todense().multiply(b)))
+        self.assertListEqual(list(self.A.tmultiply(b)), list(self.A.todense().tmultiply(b)))
+
+    def test_gram(self):
+        gram = self.A.gram()
+        self.assertEqual(gram.bandwidth, 1)
+        self.assertListEqual(list(gram.todense()), list(self.A.todense().gram()))
+
+    def test_band_cholesky(self):
+        A = bandmatrix(4, 1)
+        for i in range(4):
+            A[i, i] = 4
+        for i in range(3):
+            A[i + 1, i] = 1
+        with self.assertRaises(IndexError):
+            A[3, 0] = 1
+        x = A.cholesky().solve(vector([5, 6, 6, 5]))
+        for value in x:
+            self.assertAlmostEqual(value, 1)
+
+        A[0, 0] = -1
+        with self.assertRaisesRegex(ValueError, "not positive definite"):
+            A.cholesky()
+
+    def test_lstsq(self):
+        # the rows are scattered into the workspace, which is reused on the next call
+        b = vector([1, -1, 2, 1])
+        workspace = matrix(4, 4)
+        workspace[0, 3] = 7
+        x = lstsq(self.A, b, workspace)
+        expected = lstsq(self.A.todense(), b)
+        for value, expected_value in zip(x, expected):
+            self.assertAlmostEqual(value, expected_value)
+        for value, expected_value in zip(lstsq(self.A, b, workspace), expected):
+            self.assertAlmostEqual(value, expected_value)
+        with self.assertRaises(ValueError):
+            lstsq(self.A, b, matrix(3, 4))
+
+    def test_scale_rows(self):
+        dense = self.A.todense()
+        factors = vector([2, -1, 0, 0.5])
+        self.assertListEqual(list(self.A.copy().scale_rows(factors).todense()), list(dense.scale_rows(factors)))
+        self.assertListEqual(list(dense.row(1)), [-x for x in self.A.todense().row(1)])
+        with self.assertRaises(IndexError):
+            self.A.scale_rows(vector([1]))
+
+    def test_iadd(self):
+        # band matrices of different bandwidths are summed into the wider band
+        A = bandmatrix(3, 1)
+        B = bandmatrix(3, 0)
+        for i in range(3):
+            A[i, i] = 2.0
+            B[i, i] = 1.0
+        A[1, 0] = -1.0
+        A += B
+        self.assertListEqual(list(map(list, A.todense())), [[3.0, -1.0, 0.0], [-1.0, 3.0, 0.0], [0.0, 0.0, 3.0]])
+        with self.assertRaises(ValueError):
+            B += A
+
+        # a band matrix is added to a dense one as its dense copy
+        M = matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        M += A
+        self.assertListEqual(list(map(list, M)), [[4.0, 1.0, 3.0], [3.0, 8.0, 6.0], [7.0, 8.0, 12.0]])
+        with self.assertRaises(IndexError):
+            M += matrix(2, 2)
+
+
+class TestBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = linalg.get_backend()
+
+    def tearDown(self):
+        linalg.set_backend(self.backend)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            linalg.set_backend("fortran")
+        self.assertEqual(linalg.get_backend(), self.backend)
+
+    @unittest.skipUnless(find_spec("numpy"), "numpy is not installed")
+    def test_numpy_backend(self):
+        linalg.set_backend("numpy")
+        A = matrix([[1, 3, 2], [3, -2, -0.5], [1, 0, 1]])
+        b = vector([1, 1, -1])
+        self.assertListEqual(list(A.multiply(b)), [2, 1.5, 0])
+        self.assertListEqual(list(A.tmultiply(b)), [3, 1, 0.5])
+        self.assertListEqual(list(map(list, A.transpose())), [[1, 3, 1], [3, -2, 0], [2, -0.5, 1]])
+        self.assertListEqual(list(b + 2 * b), [3, 3, -3])
+        self.assertAlmostEqual(vector([3, 4]).norm(), 5)
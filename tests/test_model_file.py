@@ -0,0 +1,65 @@
+import os
+import pickle
+import tempfile
+import unittest
+from functions import cubic_spline, linear_function, linear_spline, polynomial_function, tensor_spline
+from functions.model_file import ModelFile
+from mathtypes.linalg import vector
+
+
+class TestModelFile(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "models.bin")
+        nodes = [-1, 0.5, 1, 2.5]
+        self.models = [
+            (cubic_spline.CubicSpline(nodes), vector([1, -2, 0.5, 3])),
+            (linear_function.LinearFunction(), vector([1.5, -2, 0.25])),
+            (linear_spline.LinearSpline(nodes), vector([0, 1, 4, -1])),
+            (polynomial_function.PolynomialFunction(), vector([0.5, -1, 2])),
+            (cubic_spline.CubicSpline(nodes, "not-a-knot"), vector([2, 0, 1, 1])),
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_create_and_open(self) -> None:
+        models = ModelFile.create(self.path, self.models)
+        reopened = ModelFile.open(self.path)
+        self.assertEqual(len(reopened), len(self.models))
+        for i, (function, parameters) in enumerate(self.models):
+            frozen = function.freeze(parameters)
+            self.assertEqual(list(reopened.parameters(i)), list(parameters))
+            point = (0.3, -0.7) if isinstance(function, linear_function.LinearFunction) else 1.7
+            self.assertEqual(reopened[i](point), frozen(point))
+            self.assertEqual(models[i](point), frozen(point))
+        self.assertEqual(reopened[-1](0.2), self.models[-1][0].freeze(self.models[-1][1])(0.2))
+        with self.assertRaises(IndexError):
+            reopened[len(self.models)]
+        # the file is mapped read-only
+        with self.assertRaises(TypeError):
+            reopened.parameters(0)[0] = 1
+
+    def test_pickle(self) -> None:
+        # evaluators over views into the mapped file are pickled with copies of the coefficients
+        ModelFile.create(self.path, self.models)
+        reopened = ModelFile.open(self.path)
+        for i, (function, _) in enumerate(self.models):
+            point = (0.3, -0.7) if isinstance(function, linear_function.LinearFunction) else 1.7
+            self.assertEqual(pickle.loads(pickle.dumps(reopened[i]))(point), reopened[i](point))
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(TypeError):
+            ModelFile.create(self.path, [(tensor_spline.TensorSpline([[0, 1], [0, 1]]), vector([1, 2, 3, 4]))])
+        with self.assertRaises(ValueError):
+            ModelFile.frombuffer(b"FADS" + bytes(32))
+        ModelFile.create(self.path, self.models)
+        with open(self.path, "rb") as file:
+            truncated = file.read()[:-8]
+        with self.assertRaises(ValueError):
+            ModelFile.frombuffer(truncated)[-1]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,26 @@
 import unittest
-from math import isclose
-from optimizers import conjugate_gradient, gauss, simulated_annealing
-from functionals import l2, linf
-from functions import linear_function
+from math import exp, isclose
+from optimizers import conjugate_gradient, gauss, minimax, simulated_annealing
+from functionals import cached, irls, l2, linf, parallel, streaming
+from functions import linear_function, polynomial_function, linear_spline, cubic_spline, tensor_spline
+from functions.abcfunction import DifferentiableFunction, Function
 from mathtypes.linalg import vector
 
 
+class ExponentialFunction(Function, DifferentiableFunction):
+    """exp(a * x), нелинейна по параметру a."""
+
+    def bind(self, parameters: vector, copy: bool = True, immutable: bool = False) -> Function:
+        self.parameters = parameters.copy() if copy else parameters
+        return self
+
+    def value(self, point: vector) -> float:
+        return exp(self.parameters[0] * point[0])
+
+    def gradient(self, point: vector) -> vector:
+        return vector([point[0] * self.value(point)])
+
+
 class TestConjugateGradientMethod(unittest.TestCase):
     def setUp(self) -> None:
         self.optimizer = conjugate_gradient.ConjugateGradientMethod()
@@ -32,6 +47,16 @@ class TestConjugateGradientMethod(unittest.TestCase):
             self.optimizer.minimize(l_inf, function, initial_parameters, self.minimum_parameters,
                 self.maximum_parameters)
 
+    def test_result_not_aliased(self) -> None:
+        # Изменение возвращенного вектора не меняет параметры функции и начальные параметры
+        function = linear_function.LinearFunction()
+        initial_parameters = vector([0, 0, 0, 0])
+        result_parameters = self.optimizer.minimize(self.l2, function, initial_parameters)
+        parameters = list(function.parameters)
+        result_parameters *= 0
+        self.assertListEqual(list(function.parameters), parameters)
+        self.assertListEqual(list(initial_parameters), [0, 0, 0, 0])
+
 class TestGaussNewtonMethod(unittest.TestCase):
     def setUp(self) -> None:
         self.optimizer = gauss.GaussNewtonMethod()
@@ -58,6 +83,165 @@ class TestGaussNewtonMethod(unittest.TestCase):
             self.optimizer.minimize(l_inf, function, initial_parameters, self.minimum_parameters,
                 self.maximum_parameters)
 
+    def test_minimize_qr(self) -> None:
+        # Шаг метода находится через QR-разложение якобиана
+        optimizer = gauss.GaussNewtonMethod(solver="qr")
+        function = linear_function.LinearFunction()
+        true_parameters = vector([3, 2, 1, 1])
+        result_parameters = optimizer.minimize(self.l2, function, vector([0, 0, 0, 0]))
+        self.assertEqual(all(isclose(result_parameters[i] - true_parameters[i], 0, abs_tol=1e-4) for i in range(result_parameters.length)), True)
+
+        with self.assertRaises(ValueError):
+            gauss.GaussNewtonMethod(solver="svd")
+
+    def test_minimize_cached(self) -> None:
+        # Функционал обернут в LRU-кэш, значения в уже посещенных точках не вычисляются повторно
+        objective = cached.CachedFunctional.create(self.l2)
+        function = linear_function.LinearFunction()
+        true_parameters = vector([3, 2, 1, 1])
+        result_parameters = self.optimizer.minimize(objective, function, vector([0, 0, 0, 0]))
+        self.assertEqual(all(isclose(result_parameters[i] - true_parameters[i], 0, abs_tol=1e-4) for i in range(result_parameters.length)), True)
+        self.assertGreater(objective.hits, 0)
+
+    def test_minimize_streaming(self) -> None:
+        # Точки поступают блоками, нормальные уравнения накапливаются по блокам
+        chunks = lambda: ((self.x[k:k + 2], vector(list(self.f)[k:k + 2])) for k in range(0, len(self.x), 2))
+        function = linear_function.LinearFunction()
+        true_parameters = vector([3, 2, 1, 1])
+        for solver in gauss.SOLVERS:
+            optimizer = gauss.GaussNewtonMethod(solver)
+            result_parameters = optimizer.minimize(streaming.StreamingL2(chunks), function, vector([0, 0, 0, 0]))
+            self.assertEqual(all(isclose(result_parameters[i] - true_parameters[i], 0, abs_tol=1e-4) for i in range(result_parameters.length)), True)
+
+    def test_minimize_streaming_batch(self) -> None:
+        # В режиме мини-батчей невязка и якобиан одного шага вычисляются по одному и тому же батчу
+        x = self.x + [vector([1, 0, 0]), vector([0, 1, 0]), vector([0, 0, 1]), vector([1, 1, 2])]
+        f = vector([3 * a + 2 * b + c + 1 for a, b, c in x])
+        chunks = [(x[:4], vector(list(f)[:4])), (x[4:], vector(list(f)[4:]))]
+        function = linear_function.LinearFunction()
+        true_parameters = vector([3, 2, 1, 1])
+        for solver in gauss.SOLVERS:
+            optimizer = gauss.GaussNewtonMethod(solver)
+            result_parameters = optimizer.minimize(streaming.StreamingL2(chunks, batch_size=1), function, vector([0, 0, 0, 0]))
+            self.assertEqual(all(isclose(result_parameters[i] - true_parameters[i], 0, abs_tol=1e-4) for i in range(result_parameters.length)), True)
+
+    def test_minimize_parallel(self) -> None:
+        # Функционал вычисляется процессами по частям выборки, ленточные матрицы частей складываются
+        x = [vector([-1]), vector([1]), vector([2]), vector([3])]
+        f = vector([3, 10, 11, -1])
+        with parallel.ParallelL2(x, f, workers=2) as objective:
+            result_parameters = self.optimizer.minimize(objective, linear_spline.LinearSpline(x), vector([1, 3, -1, -1]))
+        self.assertEqual(all(isclose(result_parameters[i] - f[i], 0, abs_tol=1e-4) for i in range(f.length)), True)
+
+    def test_minimize_irls(self) -> None:
+        # Взвешенный метод наименьших квадратов для L1 не реагирует на выбросы
+        x = [vector([float(i)]) for i in range(10)]
+        f = vector([2 * i + 1.0 for i in range(10)])
+        f[5], f[8] = 40, -10
+        optimizer = gauss.GaussNewtonMethod(iterations=30)
+        result_parameters = optimizer.minimize(irls.IRLS(x, f), linear_function.LinearFunction(), vector([0, 0]))
+        self.assertEqual(all(isclose(result_parameters[i] - value, 0, abs_tol=1e-4) for i, value in enumerate([2, 1])), True)
+
+        with self.assertRaises(ValueError):
+            gauss.GaussNewtonMethod(iterations=0)
+
+    def test_minimize_sparse_jacobian(self) -> None:
+        # Линейный сплайн имеет разреженный градиент, нормальные уравнения решаются в ленточном виде.
+        x = [vector([-1]), vector([1]), vector([2]), vector([3])]
+        f = vector([3, 10, 11, -1])
+        function = linear_spline.LinearSpline(x)
+        result_parameters = self.optimizer.minimize(l2.L2(x, f), function, vector([1, 3, -1, -1]))
+        self.assertEqual(all(isclose(result_parameters[i] - f[i], 0, abs_tol=1e-4) for i in range(f.length)), True)
+
+    def test_minimize_cubic_spline(self) -> None:
+        # Производные кубического сплайна зависят от всех параметров, якобиан плотный.
+        x = [vector([-1]), vector([1]), vector([2]), vector([3])]
+        f = vector([3, 10, 11, -1])
+        for boundary in ("natural", "clamped", "not-a-knot"):
+            function = cubic_spline.CubicSpline(x, boundary)
+            result_parameters = self.optimizer.minimize(l2.L2(x, f), function, vector([1, 3, -1, -1]))
+            self.assertEqual(all(isclose(result_parameters[i] - f[i], 0, abs_tol=1e-4) for i in range(f.length)), True)
+
+    def test_minimize_tensor_spline(self) -> None:
+        # Тензорный сплайн на двумерной сетке имеет разреженный градиент
+        axes = [[0, 1, 2], [0, 1, 2, 3]]
+        surface = lambda x, y: x * y - 2 * x + y
+        x = [vector([xi + 0.5, yi + 0.25]) for xi in range(2) for yi in range(3)] + \
+            [vector([xi, yi]) for xi in axes[0] for yi in axes[1]]
+        f = vector([surface(*point) for point in x])
+        for kind in ("linear", "cubic"):
+            function = tensor_spline.TensorSpline(axes, kind)
+            result_parameters = self.optimizer.minimize(l2.L2(x, f), function, vector(function.size))
+            self.assertTrue(all(isclose(function.bind(result_parameters).value(point), surface(*point), abs_tol=1e-4)
+                                for point in x))
+
+    def test_minimize_polynomial(self) -> None:
+        # Полином реализует DifferentiableFunction, его коэффициенты находятся за несколько итераций
+        x = [vector([-2]), vector([-1]), vector([0]), vector([1]), vector([3])]
+        true_parameters = vector([0.5, -2, 1])
+        f = vector([polynomial_function.PolynomialFunction().bind(true_parameters).value(xi) for xi in x])
+        result_parameters = self.optimizer.minimize(l2.L2(x, f), polynomial_function.PolynomialFunction(), vector([0, 0, 0]))
+        self.assertEqual(all(isclose(result_parameters[i] - true_parameters[i], 0, abs_tol=1e-4) for i in range(true_parameters.length)), True)
+
+class TestMinimaxMethod(unittest.TestCase):
+    def setUp(self) -> None:
+        self.optimizer = minimax.MinimaxMethod()
+        self.x = [vector([i / 100]) for i in range(101)]
+        self.f = vector([(i / 100) ** 2 for i in range(101)])
+
+    def test_minimize(self) -> None:
+        # Наилучшее равномерное приближение x^2 прямой на [0, 1]: x - 1/8 с погрешностью 1/8
+        result_parameters = self.optimizer.minimize(linf.LInf(self.x, self.f),
+            polynomial_function.PolynomialFunction(), vector([0, 0]))
+        self.assertEqual(all(isclose(result_parameters[i] - value, 0, abs_tol=1e-9) for i, value in enumerate([1, -0.125])), True)
+
+        # Функционал не LInf
+        with self.assertRaises(TypeError):
+            self.optimizer.minimize(l2.L2(self.x, self.f), polynomial_function.PolynomialFunction(), vector([0, 0]))
+
+        # Функция нелинейна по параметрам
+        with self.assertRaises(TypeError):
+            self.optimizer.minimize(linf.LInf(self.x, self.f), ExponentialFunction(), vector([1]))
+
+    def test_minimize_bounds(self) -> None:
+        # Ограничения на параметры входят в линейную программу: при наклоне не больше 0.5
+        # наилучшее приближение x^2 на [0, 1] равно 0.5x + 0.21875 с погрешностью 0.28125
+        objective = linf.LInf(self.x, self.f)
+        function = polynomial_function.PolynomialFunction()
+        result_parameters = self.optimizer.minimize(objective, function, vector([0, 0]), vector([-5, -5]), vector([0.5, 5]))
+        self.assertEqual(all(isclose(result_parameters[i] - value, 0, abs_tol=1e-9) for i, value in enumerate([0.5, 0.21875])), True)
+        self.assertAlmostEqual(objective.value(function.bind(result_parameters)), 0.28125)
+
+        # Одна из границ может не задаваться
+        result_parameters = self.optimizer.minimize(objective, function, vector([0, 0]), None, vector([5, -0.5]))
+        self.assertEqual(all(isclose(result_parameters[i] - value, 0, abs_tol=1e-9) for i, value in enumerate([1, -0.5])), True)
+
+        # Нижняя граница больше верхней
+        with self.assertRaises(ValueError):
+            self.optimizer.minimize(objective, function, vector([0, 0]), vector([1, 0]), vector([0, 1]))
+
+    def test_minimize_splines(self) -> None:
+        # Погрешность равномерного приближения сплайнами не больше, чем у любых других параметров
+        objective = linf.LInf(self.x, self.f)
+        for function in (linear_spline.LinearSpline([0, 0.3, 0.7, 1]), cubic_spline.CubicSpline([0, 0.5, 1])):
+            result_parameters = self.optimizer.minimize(objective, function, vector(len(function.nodes)))
+            error = objective.value(function.bind(result_parameters))
+            for delta in (1e-3, -1e-3):
+                for i in range(result_parameters.length):
+                    parameters = result_parameters.copy()
+                    parameters[i] += delta
+                    self.assertGreaterEqual(objective.value(function.bind(parameters)), error - 1e-12)
+
+        # Линейная n-мерная функция, ошибки в точках равны по модулю для n + 1 точек
+        x = [vector([1.5, 1]), vector([-1, 3]), vector([2, 2]), vector([0, 1]), vector([3, -2])]
+        f = vector([4, 1, 6, 2, -1])
+        function = linear_function.LinearFunction()
+        result_parameters = self.optimizer.minimize(linf.LInf(x, f), function, vector(3))
+        error = linf.LInf(x, f).value(function.bind(result_parameters))
+        residuals = [abs(f[i] - function.value(point)) for i, point in enumerate(x)]
+        self.assertGreaterEqual(sum(isclose(residual, error) for residual in residuals), 3)
+
+
 class TestSimulatedAnnealing(unittest.TestCase):
     def setUp(self) -> None:
         self.optimizer = simulated_annealing.SimulatedAnnealing()